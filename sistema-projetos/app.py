@@ -3,19 +3,43 @@ import sys
 import webbrowser
 import threading
 from datetime import datetime, timedelta
-from flask import Flask, render_template, jsonify, request, send_file
+from flask import Flask, render_template, jsonify, request, send_file, Response, g
 import pandas as pd
-import plotly
-import plotly.graph_objects as go
-from plotly.utils import PlotlyJSONEncoder
 import json
+import re
+import hashlib
+import csv
+import io
+import unicodedata
+from urllib.parse import quote
 from database import DatabaseManager
+from query_cache import QueryCache
+from data_version import DataVersionProbe
+from precompute import PrecomputeScheduler
+from events import EventBroadcaster
+from local_replica import LocalReplica
+from mans_store import MansStore
+from bi_indexes import IndexPack
+from keyset_pagination import decode_page_cursor, encode_page_cursor, keyset_condition, page_cursor_values
+from sql_filters import SEM_EQUIPE, SEM_PRODUTO, STATUS_INDEFINIDO, SqlFilters
+from time_buckets import GRANULARIDADE_PADRAO, bucket_labels, bucket_sql, fill_buckets, parse_granularidade
+from kpi_engine import (EPIC_KPI_COLUMNS, compute_dashboard_kpis, compute_mans_backlog, compute_mans_tendencia,
+                        compute_mans_equipe_mes, compute_mans_top_equipes, compute_mans_periodo)
+from gantt_builder import (GANTT_LOD_MAX_EPICOS, GANTT_ORDER_COLUMNS, GANTT_WEBGL_MIN_ROWS, build_gantt_items,
+                           build_gantt_figure, build_gantt_window_figure, build_gantt_team_summary,
+                           build_gantt_team_figure, clip_gantt_window, gantt_date_range, gantt_trace_type,
+                           TIPO_REGISTRO_STYLE)
 import tempfile
 import logging
 import getpass
 import socket
 import platform
 
+try:
+    import orjson  # Serialização JSON rápida (opcional)
+except ImportError:
+    orjson = None
+
 # Configurar logging para capturar tudo
 logging.basicConfig(level=logging.DEBUG, 
                    format='%(asctime)s - %(levelname)s - %(message)s')
@@ -79,6 +103,28 @@ def inject_user_info():
 # Inicializar o gerenciador de banco
 db_manager = DatabaseManager()
 
+# Cache compartilhado de resultados das consultas (TTL + LRU)
+query_cache = QueryCache()
+FILTERS_CACHE_TTL = 1800  # Listas de filtros (equipes/produtos/status) mudam pouco
+EXPORT_FETCH_BATCH_SIZE = 2000  # Linhas lidas do cursor por lote nas exportações CSV
+PAGE_SIZE_DEFAULT = 25          # Registros por página nas APIs paginadas
+PAGE_SIZE_MAX = 500
+GANTT_WINDOW_MAX_ROWS = 500     # Linhas por requisição no Gantt em janelas
+
+# Versão dos dados (marcas d'água das tabelas BI): ETags das APIs e invalidação do cache
+data_versions = DataVersionProbe(db_manager)
+
+# Réplica local opcional (BI_REPLICA=on): leituras das rotas sem ida ao SQL Server
+local_replica = LocalReplica(db_manager)
+
+# MANs em memória, sincronizadas de forma incremental por Updated (dashboards e insights de MANs)
+mans_store = MansStore(db_manager)
+
+# Pacote de índices das tabelas BI (BI_INDEXES=on): reaplicado após cada carga do ETL
+index_pack = IndexPack(db_manager)
+API_ETAG_EXCLUDED_PREFIXES = ('/api/cache/', '/api/events')  # Diagnóstico/administração e SSE
+ERROR_BODY_PATTERN = re.compile(rb'^\{\s*"error"')
+
 # Lista global para armazenar logs
 app_logs = []
 
@@ -99,6 +145,222 @@ def inject_user_info():
     """Injeta informações do usuário em todos os templates"""
     return {'current_user': get_user_info()}        
 
+def apply_index_pack(tabelas, versoes):
+    """Após carga do ETL: recriar os índices do pacote nas tabelas alteradas (tabelas recriadas os perdem)"""
+    if not index_pack.enabled:
+        return
+    try:
+        criados, removidos = index_pack.apply(tabelas)
+        if criados or removidos:
+            log_message(f"Índices BI: {len(criados)} criados, {len(removidos)} removidos")
+    except Exception as e:
+        index_pack.last_error = str(e)
+        log_message(f"Erro ao aplicar índices BI: {str(e)}")
+
+def sync_local_replica(tabelas, versoes):
+    """Após carga do ETL: copiar para a réplica local as tabelas alteradas (antes de invalidar o cache)"""
+    if not local_replica.enabled:
+        return
+    try:
+        local_replica.sync(tabelas)
+    except Exception as e:
+        log_message(f"Erro ao sincronizar réplica local: {str(e)}")
+
+def on_data_changed(tabelas, versoes):
+    """Após carga do ETL: descartar do cache apenas as consultas das tabelas alteradas"""
+    for tabela in tabelas:
+        removidas = query_cache.invalidate(tabela)
+        log_message(f"Dados alterados em {tabela} (versão {versoes.get(tabela)}): {removidas} entradas do cache removidas")
+
+data_versions.subscribe(apply_index_pack)
+data_versions.subscribe(sync_local_replica)
+data_versions.subscribe(on_data_changed)
+
+def sync_mans_store(tabelas, versoes):
+    """Após carga do ETL em BI_Jira_US: trazer só as MANs alteradas desde a última sincronização"""
+    if 'BI_Jira_US' not in tabelas or not mans_store.ready:
+        return
+    try:
+        linhas = mans_store.sync()
+        log_message(f"MANs sincronizadas: {linhas} linhas lidas do servidor")
+    except Exception as e:
+        log_message(f"Erro na sincronização incremental de MANs: {str(e)}")
+
+data_versions.subscribe(sync_mans_store)
+
+def api_etag(version):
+    """ETag da requisição: versão dos dados + rota + filtros normalizados + dia atual
+
+    O dia entra na chave porque várias consultas comparam datas com GETDATE().
+    """
+    filtros = sorted(
+        (key, value.strip()) for key, value in request.args.items(multi=True) if value.strip()
+    )
+    text = json.dumps([version, request.path, filtros, datetime.now().strftime('%Y-%m-%d')])
+    return hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+@app.before_request
+def api_conditional_get():
+    """GET condicional nas APIs: 304 sem executar a rota quando os dados não mudaram"""
+    if request.method != 'GET' or not request.path.startswith('/api/'):
+        return None
+    if request.path.startswith(API_ETAG_EXCLUDED_PREFIXES):
+        return None
+    
+    version = data_versions.version()
+    if version is None:
+        return None  # Sem sondagem (banco indisponível): resposta normal, sem ETag
+    
+    g.api_etag = api_etag(version)
+    if request.if_none_match.contains(g.api_etag):
+        response = Response(status=304)
+        response.set_etag(g.api_etag)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return None
+
+@app.after_request
+def add_api_etag(response):
+    """ETag nas respostas JSON de sucesso das APIs (no-cache: o navegador sempre revalida)"""
+    etag = g.get('api_etag')
+    if etag and response.status_code == 200 and response.mimetype == 'application/json':
+        # Respostas de erro não são reaproveitadas
+        if not ERROR_BODY_PATTERN.match(response.get_data()[:64]):
+            response.set_etag(etag)
+            response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def cached_read_sql(query, conn, params=None, ttl=None):
+    """pd.read_sql passando pelo cache compartilhado de resultados (e pela réplica local, se ativa)"""
+    return query_cache.read_sql(
+        query, conn, params=params, ttl=ttl,
+        loader=local_replica.loader(lambda query, conn, params: pd.read_sql(query, conn, params=params))
+    )
+
+def cached_fetch_columns(query, conn, table, params=None, ttl=None):
+    """Leitura tipada em lotes (db_manager.fetch_columns) passando pelo cache (e pela réplica local)"""
+    return query_cache.read_sql(
+        query, conn, params=params, ttl=ttl, variant='typed',
+        loader=local_replica.loader(
+            lambda query, conn, params: db_manager.fetch_columns(conn, query, params, table=table)
+        )
+    )
+
+def typed_frame_records(df):
+    """Registros JSON de um DataFrame tipado (categóricos/inteiros anuláveis -> Python, nulos -> '')"""
+    df = df.astype(object)
+    return df.where(df.notna(), '').to_dict('records')
+
+
+def count_rows(count_query, params=None):
+    """Executar um SELECT COUNT(*) e retornar o total"""
+    with db_manager.connection(lazy=True) as conn:
+        cursor = conn.cursor()
+        try:
+            cursor.execute(count_query, *(params or []))
+            return cursor.fetchone()[0]
+        finally:
+            cursor.close()
+
+def stream_csv_response(query, params, filename, date_columns=None, date_format='%d/%m/%Y %H:%M',
+                        batch_size=EXPORT_FETCH_BATCH_SIZE):
+    """Resposta CSV gerada em lotes direto do cursor, sem DataFrame nem arquivo temporário
+
+    Mantém o formato das exportações: separador ';' e UTF-8 com BOM (Excel).
+    date_columns: lista de colunas ou função nome -> bool; valores de data
+    dessas colunas saem formatados com date_format.
+    """
+    def generate():
+        # BOM enviado antes da consulta: o download começa imediatamente
+        yield '\ufeff'.encode('utf-8')
+        
+        with db_manager.connection(lazy=True) as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query, *params)
+                columns = [column[0] for column in cursor.description]
+                if callable(date_columns):
+                    date_indexes = [i for i, col in enumerate(columns) if date_columns(col)]
+                else:
+                    date_indexes = [i for i, col in enumerate(columns) if col in (date_columns or ())]
+                
+                buffer = io.StringIO()
+                writer = csv.writer(buffer, delimiter=';', lineterminator=os.linesep)
+                writer.writerow(columns)
+                
+                total = 0
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        values = list(row)
+                        for i in date_indexes:
+                            if hasattr(values[i], 'strftime'):
+                                values[i] = values[i].strftime(date_format)
+                        writer.writerow(values)
+                    total += len(rows)
+                    
+                    yield buffer.getvalue().encode('utf-8')
+                    buffer.seek(0)
+                    buffer.truncate(0)
+                
+                yield buffer.getvalue().encode('utf-8')
+                log_message(f"Exportação concluída: {total} registros em {filename}")
+            except Exception as e:
+                log_message(f"Erro durante a exportação de {filename}: {str(e)}")
+                raise
+            finally:
+                cursor.close()
+    
+    # Mesmo cabeçalho do send_file (nomes com acentos via filename*)
+    try:
+        filename.encode('ascii')
+        names = {'filename': filename}
+    except UnicodeEncodeError:
+        simple = unicodedata.normalize('NFKD', filename).encode('ascii', 'ignore').decode('ascii')
+        names = {'filename': simple, 'filename*': f"UTF-8''{quote(filename, safe='!#$&+-.^_`|~')}"}
+    
+    response = Response(generate(), mimetype='text/csv')
+    response.headers.set('Content-Disposition', 'attachment', **names)
+    return response
+
+def get_page_size(default=PAGE_SIZE_DEFAULT):
+    """Tamanho de página da requisição limitado a PAGE_SIZE_MAX"""
+    try:
+        page_size = int(request.args.get('page_size', default))
+    except (TypeError, ValueError):
+        page_size = default
+    return max(1, min(page_size, PAGE_SIZE_MAX))
+
+def read_sql_group(queries):
+    """Executar consultas independentes em paralelo, cada uma em uma conexão do pool
+    
+    queries: dict nome -> (query, params). Retorna dict nome -> DataFrame.
+    Resultados já em cache são devolvidos sem ocupar conexão.
+    """
+    results = {}
+    tasks = {}
+    for name, (query, params) in queries.items():
+        key = query_cache.make_key(query, params)
+        df = query_cache.get(key)
+        if df is not None:
+            results[name] = df
+        else:
+            tasks[name] = (lambda conn, query=query, params=params: cached_read_sql(query, conn, params=params))
+    
+    if tasks:
+        results.update(db_manager.run_query_group(tasks))
+    return results
+
+def fast_jsonify(payload, status=200):
+    """Resposta JSON serializada de uma vez (orjson se disponível), para payloads grandes"""
+    if orjson is not None:
+        body = orjson.dumps(payload, option=orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+    else:
+        body = json.dumps(payload, ensure_ascii=False, default=str, separators=(',', ':')).encode('utf-8')
+    return Response(body, status=status, mimetype='application/json')
+
 def convert_numpy_types(obj):
     """Converter tipos numpy para tipos Python nativos para serialização JSON"""
     if isinstance(obj, dict):
@@ -136,90 +398,34 @@ def index():
     default_equipes = []
     
     try:
-        success, message = db_manager.test_connection()
-        if not success:
-            default_stats['error'] = f"Erro de conexão: {message}"
-            return render_template('dashboard.html', stats=default_stats, equipes=default_equipes)
-        
-        conn = db_manager.get_connection()
-        
-        # Estatísticas dos épicos
-        query_stats = """
-        SELECT 
-            COUNT(*) as total_epicos,
-            SUM(CASE WHEN EpicStatus = 'Done' THEN 1 ELSE 0 END) as epicos_concluidos,
-            SUM(CASE WHEN EpicStatus IN ('In Progress', 'Development', 'In Review') THEN 1 ELSE 0 END) as epicos_em_andamento,
-            SUM(CASE WHEN EpicDueDate < GETDATE() AND EpicStatus NOT IN ('Done', 'Closed') THEN 1 ELSE 0 END) as epicos_atrasados,
-            AVG(CAST(ISNULL(TasksPercentualMedia, 0) as float)) as percentual_medio
+        # Conjunto de épicos usado por todos os indicadores (uma única leitura)
+        query_epicos = f"""
+        SELECT {', '.join(EPIC_KPI_COLUMNS)}
         FROM BI_Jira_Epico_Datas_Grafico
         WHERE EpicInicioPlanejado IS NOT NULL
         And TipoRegistroCalculo = 'Planejado Time'
         """
         
-        df_stats = pd.read_sql(query_stats, conn)
-        if not df_stats.empty:
-            stats = convert_numpy_types(df_stats.iloc[0].to_dict())
-            for key in default_stats:
-                if key not in stats or stats[key] is None:
-                    stats[key] = default_stats[key]
-        else:
-            stats = default_stats
-        
-        # Adicionar contagens de alertas específicos
-        # Épicos que vencem nos próximos 7 dias
-        query_proximo = """
-        SELECT COUNT(*) as count_proximo
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE EpicInicioPlanejado IS NOT NULL
-        And TipoRegistroCalculo = 'Planejado Time'
-        AND EpicDueDate BETWEEN GETDATE() AND DATEADD(day, 7, GETDATE())
-        AND EpicStatus NOT IN ('Done', 'Closed')
-        """
+        # Contagem de subtasks
+        query_subtasks = "SELECT COUNT(*) as total_subtasks FROM BI_Jira_SubTasks_Datas_Grafico"
         
-        df_proximo = pd.read_sql(query_proximo, conn)
-        if not df_proximo.empty:
-            stats['epicos_proximo_prazo'] = convert_numpy_types(df_proximo.iloc[0]['count_proximo'])
+        # Consultas independentes: executadas em paralelo
+        results = read_sql_group({
+            'epicos': (query_epicos, None),
+            'subtasks': (query_subtasks, None)
+        })
         
-        # Épicos com baixo progresso
-        query_baixo = """
-        SELECT COUNT(*) as count_baixo
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE EpicInicioPlanejado IS NOT NULL
-        And TipoRegistroCalculo = 'Planejado Time'
-        AND CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) < 30
-        AND EpicInicioPlanejado < DATEADD(day, -15, GETDATE())
-        AND EpicStatus NOT IN ('Done', 'Closed')
-        """
+        kpis = compute_dashboard_kpis(results['epicos'])
         
-        df_baixo = pd.read_sql(query_baixo, conn)
-        if not df_baixo.empty:
-            stats['epicos_baixo_progresso'] = convert_numpy_types(df_baixo.iloc[0]['count_baixo'])
+        stats = dict(default_stats)
+        stats.update(convert_numpy_types(kpis['stats']))
         
-        # Contagem de subtasks
-        query_subtasks = "SELECT COUNT(*) as total_subtasks FROM BI_Jira_SubTasks_Datas_Grafico"
-        df_subtasks = pd.read_sql(query_subtasks, conn)
+        df_subtasks = results['subtasks']
         if not df_subtasks.empty:
             stats['total_subtasks'] = convert_numpy_types(df_subtasks.iloc[0]['total_subtasks'])
         
-        # Épicos por equipe
-        query_equipes = """
-        SELECT 
-            ISNULL(EpicEquipe, 'Sem Equipe') as EpicEquipe,
-            COUNT(*) as quantidade,
-            AVG(CAST(ISNULL(TasksPercentualMedia, 0) as float)) as percentual_medio,
-            SUM(CASE WHEN EpicStatus = 'Done' THEN 1 ELSE 0 END) as concluidos,
-            SUM(CASE WHEN EpicDueDate < GETDATE() AND EpicStatus NOT IN ('Done', 'Closed') THEN 1 ELSE 0 END) as atrasados
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE EpicInicioPlanejado IS NOT NULL
-        And TipoRegistroCalculo = 'Planejado Time'
-        GROUP BY EpicEquipe
-        ORDER BY quantidade DESC
-        """
-        
-        df_equipes = pd.read_sql(query_equipes, conn)
-        equipes = convert_numpy_types(df_equipes.to_dict('records')) if not df_equipes.empty else default_equipes
+        equipes = convert_numpy_types(kpis['equipes']) if kpis['equipes'] else default_equipes
         
-        conn.close()
         return render_template('dashboard.html', stats=stats, equipes=equipes)
     
     except Exception as e:
@@ -231,196 +437,79 @@ def index():
 def dashboard_data():
     """API para dados do dashboard com filtros e contagens de alertas"""
     try:
-        conn = db_manager.get_connection()
-        
         # Obter parâmetros dos filtros
         equipe_filter = request.args.get('equipe', '').strip()
         produto_filter = request.args.get('produto', '').strip()
         status_filter = request.args.get('status', '').strip()
         periodo_filter = request.args.get('periodo', 'ano_atual')
-        
-        
-        # Construir filtros de data baseado no período
-      #  today = datetime.now()
-      #  if periodo_filter == 'ano_atual':
-      #      data_inicio = f"{today.year}-01-01"
-      #      data_fim = f"{today.year}-12-31"
-      #  elif periodo_filter == '6_meses':
-      #      data_inicio = (today - timedelta(days=180)).strftime('%Y-%m-%d')
-      #      data_fim = today.strftime('%Y-%m-%d')
-      #  elif periodo_filter == '3_meses':
-      #      data_inicio = (today - timedelta(days=90)).strftime('%Y-%m-%d')
-      #      data_fim = today.strftime('%Y-%m-%d')
-      #  elif periodo_filter == 'mes_atual':
-      #      data_inicio = f"{today.year}-{today.month:02d}-01"
-      #      data_fim = today.strftime('%Y-%m-%d')
-      #  else:  # todos
-      #      data_inicio = None
-      #      data_fim = None
+        granularidade = parse_granularidade(request.args.get('granularidade'))
         
         data_inicio, data_fim = calculate_period_dates(periodo_filter)
          
-        # Query base com filtros
-        where_conditions = ["EpicInicioPlanejado IS NOT NULL"]
-        params = []
-        
-        if equipe_filter:
-            where_conditions.append("ISNULL(EpicEquipe, '') = ?")
-            params.append(equipe_filter)
-        
-        if produto_filter:
-            where_conditions.append("ISNULL(EpicProduto, '') = ?")
-            params.append(produto_filter)
-        
-        if status_filter:
-            where_conditions.append("ISNULL(EpicStatus, '') = ?")
-            params.append(status_filter)
-        
-        if data_inicio and data_fim:
-            where_conditions.append("""(
-                (EpicDueDate >= ? AND EpicDueDate <= ?) OR
-                (EpicInicioPlanejado >= ? AND EpicInicioPlanejado <= ?) OR
-                (EpicInicioPlanejado < ? AND EpicDueDate > ?)
-            )""")
-            params.extend([data_inicio, data_fim, data_inicio, data_fim, data_inicio, data_fim])
-        
-        where_clause = " AND ".join(where_conditions)
-        
-        # Estatísticas filtradas
-        query_stats = f"""
-        SELECT 
-            COUNT(*) as total_epicos,
-            SUM(CASE WHEN EpicStatus = 'Done' THEN 1 ELSE 0 END) as epicos_concluidos,
-            SUM(CASE WHEN EpicStatus IN ('In Progress', 'Development', 'In Review') THEN 1 ELSE 0 END) as epicos_em_andamento,
-            SUM(CASE WHEN EpicDueDate < GETDATE() AND EpicStatus NOT IN ('Done', 'Closed') THEN 1 ELSE 0 END) as epicos_atrasados,
-            AVG(CAST(ISNULL(TasksPercentualMedia, 0) as float)) as percentual_medio
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE {where_clause}
-        """
-        
-        df_stats = pd.read_sql(query_stats, conn, params=params)
-        stats = convert_numpy_types(df_stats.iloc[0].to_dict()) if not df_stats.empty else {}
-        
-        # Adicionar contagens específicas para alertas
-        # Épicos que vencem nos próximos 7 dias
-        query_proximo_prazo = f"""
-        SELECT COUNT(*) as count_proximo_prazo
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE {where_clause}
-        AND EpicDueDate BETWEEN GETDATE() AND DATEADD(day, 7, GETDATE())
-        AND EpicStatus NOT IN ('Done', 'Closed')
-        """
-        
-        df_proximo = pd.read_sql(query_proximo_prazo, conn, params=params)
-        stats['epicos_proximo_prazo'] = convert_numpy_types(df_proximo.iloc[0]['count_proximo_prazo']) if not df_proximo.empty else 0
-        
-        # Épicos com baixo progresso
-        query_baixo_progresso = f"""
-        SELECT COUNT(*) as count_baixo_progresso
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE {where_clause}
-        AND CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) < 30
-        AND EpicInicioPlanejado < DATEADD(day, -15, GETDATE())
-        AND EpicStatus NOT IN ('Done', 'Closed')
-        """
-        
-        df_baixo = pd.read_sql(query_baixo_progresso, conn, params=params)
-        stats['epicos_baixo_progresso'] = convert_numpy_types(df_baixo.iloc[0]['count_baixo_progresso']) if not df_baixo.empty else 0
-        
-        # Dados por equipe filtrados
-        query_equipes = f"""
-        SELECT 
-            ISNULL(EpicEquipe, 'Sem Equipe') as EpicEquipe,
-            COUNT(*) as quantidade,
-            AVG(CAST(ISNULL(TasksPercentualMedia, 0) as float)) as percentual_medio,
-            SUM(CASE WHEN EpicStatus = 'Done' THEN 1 ELSE 0 END) as concluidos,
-            SUM(CASE WHEN EpicDueDate < GETDATE() AND EpicStatus NOT IN ('Done', 'Closed') THEN 1 ELSE 0 END) as atrasados
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE {where_clause}
-        GROUP BY EpicEquipe
-        ORDER BY quantidade DESC
-        """
-        
-        df_equipes = pd.read_sql(query_equipes, conn, params=params)
-        equipes = convert_numpy_types(df_equipes.to_dict('records')) if not df_equipes.empty else []
-        
-        # Buscar dados para distribuição de status
-        query_status_dist = f"""
-        SELECT 
-            ISNULL(EpicStatus, 'Indefinido') as status,
-            COUNT(*) as quantidade
+        # Query base com filtros (predicados sargáveis)
+        filters = SqlFilters(["EpicInicioPlanejado IS NOT NULL"])
+        filters.equals('EpicEquipe', equipe_filter, null_label=SEM_EQUIPE)
+        filters.equals('EpicProduto', produto_filter, null_label=SEM_PRODUTO)
+        filters.equals('EpicStatus', status_filter, null_label=STATUS_INDEFINIDO)
+        filters.overlaps('EpicInicioPlanejado', 'EpicDueDate', data_inicio, data_fim)
+        
+        where_clause = filters.sql()
+        params = filters.params
+        
+        # Conjunto de épicos filtrado, apenas com as colunas usadas pelos indicadores:
+        # uma única leitura substitui as consultas separadas de cada widget
+        query_epicos = f"""
+        SELECT {', '.join(EPIC_KPI_COLUMNS)}
         FROM BI_Jira_Epico_Datas_Grafico
         WHERE {where_clause}
-        GROUP BY EpicStatus
-        ORDER BY quantidade DESC
         """
+        query_params = params
         
-        df_status_dist = pd.read_sql(query_status_dist, conn, params=params)
-        status_distribution = convert_numpy_types(df_status_dist.to_dict('records')) if not df_status_dist.empty else []
-        
-        # Estatísticas para o período atual 
-        epicos_atual = stats.get('total_epicos', 0)
-
-        # Buscar total do período anterior (ex: mês anterior)
+        # Período anterior (mês anterior) vem na mesma leitura, marcado por NoFiltro = 0
+        periodo_anterior = None
         if periodo_filter == 'mes_atual':
-            mes_anterior_inicio = (today.replace(day=1) - timedelta(days=1)).replace(day=1)
-            mes_anterior_fim = today.replace(day=1) - timedelta(days=1)
+            mes_atual_inicio = datetime.now().replace(day=1)
+            mes_anterior_inicio = (mes_atual_inicio - timedelta(days=1)).replace(day=1)
+            # Datas sem horário: mantêm a chave do cache estável durante o mês
+            mes_anterior_inicio = mes_anterior_inicio.strftime('%Y-%m-%d')
+            mes_atual_inicio = mes_atual_inicio.strftime('%Y-%m-%d')
+            periodo_anterior = (pd.Timestamp(mes_anterior_inicio), pd.Timestamp(mes_atual_inicio))
             
-            query_anterior = """
-            SELECT COUNT(*) as total_epicos
+            query_epicos = f"""
+            SELECT {', '.join(EPIC_KPI_COLUMNS)},
+                CASE WHEN {where_clause} THEN 1 ELSE 0 END as NoFiltro
             FROM BI_Jira_Epico_Datas_Grafico
             WHERE EpicInicioPlanejado IS NOT NULL
-            AND EpicInicioPlanejado >= ?
-            AND EpicInicioPlanejado <= ?
+            AND (({where_clause}) OR (EpicInicioPlanejado >= ? AND EpicInicioPlanejado < ?))
             """
-            df_ant = pd.read_sql(query_anterior, conn, params=[mes_anterior_inicio, mes_anterior_fim])
-            
-            if not df_ant.empty:
-                epicos_anterior = convert_numpy_types(df_ant.iloc[0]['total_epicos'])
-                if epicos_anterior > 0:
-                    tendencia = round(((epicos_atual - epicos_anterior) / epicos_anterior) * 100, 1)
-                    stats['tendencia_epicos'] = tendencia
-                else:
-                    stats['tendencia_epicos'] = None
-
-        # Query do Timeline
-        log_message("Buscando dados do timeline...")
+            query_params = params + params + [mes_anterior_inicio, mes_atual_inicio]
         
-        query_timeline = f"""
-        SELECT 
-            FORMAT(EpicInicioPlanejado, 'yyyy-MM') as Mes,
-            COUNT(*) as Total,
-            SUM(CASE WHEN EpicStatus IN ('Done', 'Closed', 'Concluído') THEN 1 ELSE 0 END) as Realizados
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE {where_clause}
-        GROUP BY FORMAT(EpicInicioPlanejado, 'yyyy-MM')
-        ORDER BY FORMAT(EpicInicioPlanejado, 'yyyy-MM')
-        """
-
-        log_message(f"Query timeline: {query_timeline}")
-        log_message(f"Params timeline: {params}")
+        with db_manager.connection(lazy=True) as conn:
+            df_epicos = cached_read_sql(query_epicos, conn, params=query_params)
         
-        df_timeline = pd.read_sql(query_timeline, conn, params=params)
+        log_message(f"Dashboard - {len(df_epicos)} épicos carregados em uma única consulta")
         
-        log_message(f"Timeline result: {len(df_timeline)} rows")
-        if not df_timeline.empty:
-            log_message(f"Timeline data: {df_timeline.head()}")
+        if periodo_anterior is not None:
+            inicio_planejado = pd.to_datetime(df_epicos['EpicInicioPlanejado'], errors='coerce')
+            epicos_anterior = int(((inicio_planejado >= periodo_anterior[0]) & (inicio_planejado < periodo_anterior[1])).sum())
+            df_epicos = df_epicos[df_epicos['NoFiltro'] == 1]
+        
+        kpis = compute_dashboard_kpis(df_epicos, granularidade=granularidade, inicio=data_inicio, fim=data_fim)
+        
+        stats = convert_numpy_types(kpis['stats'])
+        equipes = convert_numpy_types(kpis['equipes'])
+        status_distribution = kpis['status_distribution']
+        timeline_data = kpis['timeline']
+        
+        # Estatísticas para o período atual 
+        epicos_atual = stats.get('total_epicos', 0)
 
-        # Monta os arrays para o frontend
-        if not df_timeline.empty:
-            timeline_data = {
-                'meses': df_timeline['Mes'].tolist(),
-                'planejado': df_timeline['Total'].astype(int).tolist(),
-                'realizado': df_timeline['Realizados'].astype(int).tolist()
-            }
-            log_message(f"Timeline data criado: {timeline_data}")
-        else:
-            log_message("Timeline vazio - usando dados padrão")
-            timeline_data = {
-                'meses': [],
-                'planejado': [],
-                'realizado': []
-            }
+        if periodo_anterior is not None:
+            if epicos_anterior > 0:
+                tendencia = round(((epicos_atual - epicos_anterior) / epicos_anterior) * 100, 1)
+                stats['tendencia_epicos'] = tendencia
+            else:
+                stats['tendencia_epicos'] = None
         
         #  Adicionar informação do período para o frontend
         periodo_info = {
@@ -430,8 +519,6 @@ def dashboard_data():
             'descricao': get_periodo_description(periodo_filter)
         }
         
-        conn.close()
-        
         # Total de entregas (mesmo que total de épicos concluídos)
         stats['total_entregas'] = stats.get('epicos_concluidos', 0)
         
@@ -445,7 +532,8 @@ def dashboard_data():
                 'equipe': equipe_filter,
                 'produto': produto_filter,
                 'status': status_filter,
-                'periodo': periodo_filter
+                'periodo': periodo_filter,
+                'granularidade': granularidade
             }
         }
         
@@ -461,39 +549,38 @@ def dashboard_data():
 def dashboard_filters():
     """API para obter opções de filtros do dashboard"""
     try:
-        conn = db_manager.get_connection()
+        with db_manager.connection(lazy=True) as conn:
         
-        # Buscar equipes distintas
-        query_equipes = """
-        SELECT DISTINCT ISNULL(EpicEquipe, 'Sem Equipe') as equipe
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE EpicEquipe IS NOT NULL AND EpicEquipe != ''
-        ORDER BY equipe
-        """
-        df_equipes = pd.read_sql(query_equipes, conn)
-        equipes = df_equipes['equipe'].tolist() if not df_equipes.empty else []
+            # Buscar equipes distintas
+            query_equipes = """
+            SELECT DISTINCT ISNULL(EpicEquipe, 'Sem Equipe') as equipe
+            FROM BI_Jira_Epico_Datas_Grafico
+            WHERE EpicEquipe IS NOT NULL AND EpicEquipe != ''
+            ORDER BY equipe
+            """
+            df_equipes = cached_read_sql(query_equipes, conn, ttl=FILTERS_CACHE_TTL)
+            equipes = df_equipes['equipe'].tolist() if not df_equipes.empty else []
         
-        # Buscar produtos distintos
-        query_produtos = """
-        SELECT DISTINCT ISNULL(EpicProduto, 'Sem Produto') as produto
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE EpicProduto IS NOT NULL AND EpicProduto != ''
-        ORDER BY produto
-        """
-        df_produtos = pd.read_sql(query_produtos, conn)
-        produtos = df_produtos['produto'].tolist() if not df_produtos.empty else []
+            # Buscar produtos distintos
+            query_produtos = """
+            SELECT DISTINCT ISNULL(EpicProduto, 'Sem Produto') as produto
+            FROM BI_Jira_Epico_Datas_Grafico
+            WHERE EpicProduto IS NOT NULL AND EpicProduto != ''
+            ORDER BY produto
+            """
+            df_produtos = cached_read_sql(query_produtos, conn, ttl=FILTERS_CACHE_TTL)
+            produtos = df_produtos['produto'].tolist() if not df_produtos.empty else []
         
-        # Buscar status distintos
-        query_status = """
-        SELECT DISTINCT ISNULL(EpicStatus, 'Indefinido') as status
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE EpicStatus IS NOT NULL AND EpicStatus != ''
-        ORDER BY status
-        """
-        df_status = pd.read_sql(query_status, conn)
-        status = df_status['status'].tolist() if not df_status.empty else []
+            # Buscar status distintos
+            query_status = """
+            SELECT DISTINCT ISNULL(EpicStatus, 'Indefinido') as status
+            FROM BI_Jira_Epico_Datas_Grafico
+            WHERE EpicStatus IS NOT NULL AND EpicStatus != ''
+            ORDER BY status
+            """
+            df_status = cached_read_sql(query_status, conn, ttl=FILTERS_CACHE_TTL)
+            status = df_status['status'].tolist() if not df_status.empty else []
         
-        conn.close()
         
         return jsonify({
             'equipes': equipes,
@@ -754,72 +841,71 @@ def alertas_detalhes():
     """API para obter detalhes dos alertas"""
     try:
         tipo_alerta = request.args.get('tipo', '')
-        conn = db_manager.get_connection()
-        
-        if tipo_alerta == 'atrasados':
-            # Épicos atrasados
-            query = """
-            SELECT 
-                EpicNumber,
-                EpicSummary,
-                EpicEquipe,
-                EpicStatus,
-                EpicDueDate,
-                DATEDIFF(day, EpicDueDate, GETDATE()) as DiasAtraso,
-                CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) as PercentualConcluido
-            FROM BI_Jira_Epico_Datas_Grafico
-            WHERE EpicDueDate < GETDATE() 
-            And TipoRegistroCalculo = 'Planejado Time'
-            AND EpicStatus NOT IN ('Done', 'Closed')
-            AND EpicInicioPlanejado IS NOT NULL
-            ORDER BY EpicDueDate
-            """
+        with db_manager.connection(lazy=True) as conn:
+        
+            if tipo_alerta == 'atrasados':
+                # Épicos atrasados
+                query = """
+                SELECT 
+                    EpicNumber,
+                    EpicSummary,
+                    EpicEquipe,
+                    EpicStatus,
+                    EpicDueDate,
+                    DATEDIFF(day, EpicDueDate, GETDATE()) as DiasAtraso,
+                    CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) as PercentualConcluido
+                FROM BI_Jira_Epico_Datas_Grafico
+                WHERE EpicDueDate < GETDATE() 
+                And TipoRegistroCalculo = 'Planejado Time'
+                AND EpicStatus NOT IN ('Done', 'Closed')
+                AND EpicInicioPlanejado IS NOT NULL
+                ORDER BY EpicDueDate
+                """
             
-        elif tipo_alerta == 'proximo_prazo':
-            # Épicos que vencem nos próximos 7 dias
-            query = """
-            SELECT 
-                EpicNumber,
-                EpicSummary,
-                EpicEquipe,
-                EpicStatus,
-                EpicDueDate,
-                DATEDIFF(day, GETDATE(), EpicDueDate) as DiasRestantes,
-                CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) as PercentualConcluido
-            FROM BI_Jira_Epico_Datas_Grafico
-            WHERE EpicDueDate BETWEEN GETDATE() AND DATEADD(day, 7, GETDATE())
-            And TipoRegistroCalculo = 'Planejado Time'
-            AND EpicStatus NOT IN ('Done', 'Closed')
-            AND EpicInicioPlanejado IS NOT NULL
-            ORDER BY EpicDueDate
-            """
+            elif tipo_alerta == 'proximo_prazo':
+                # Épicos que vencem nos próximos 7 dias
+                query = """
+                SELECT 
+                    EpicNumber,
+                    EpicSummary,
+                    EpicEquipe,
+                    EpicStatus,
+                    EpicDueDate,
+                    DATEDIFF(day, GETDATE(), EpicDueDate) as DiasRestantes,
+                    CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) as PercentualConcluido
+                FROM BI_Jira_Epico_Datas_Grafico
+                WHERE EpicDueDate BETWEEN GETDATE() AND DATEADD(day, 7, GETDATE())
+                And TipoRegistroCalculo = 'Planejado Time'
+                AND EpicStatus NOT IN ('Done', 'Closed')
+                AND EpicInicioPlanejado IS NOT NULL
+                ORDER BY EpicDueDate
+                """
             
-        elif tipo_alerta == 'baixo_progresso':
-            # Épicos com baixo progresso (menos de 30% e iniciados há mais de 15 dias)
-            query = """
-            SELECT 
-                EpicNumber,
-                EpicSummary,
-                EpicEquipe,
-                EpicStatus,
-                EpicInicioPlanejado,
-                EpicDueDate,
-                CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) as PercentualConcluido,
-                DATEDIFF(day, EpicInicioPlanejado, GETDATE()) as DiasDecorridos
-            FROM BI_Jira_Epico_Datas_Grafico
-            WHERE CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) < 30
-            And TipoRegistroCalculo = 'Planejado Time'
-            AND EpicInicioPlanejado < DATEADD(day, -15, GETDATE())
-            AND EpicStatus NOT IN ('Done', 'Closed')
-            AND EpicInicioPlanejado IS NOT NULL
-            ORDER BY TasksPercentualMedia, EpicInicioPlanejado
-            """
+            elif tipo_alerta == 'baixo_progresso':
+                # Épicos com baixo progresso (menos de 30% e iniciados há mais de 15 dias)
+                query = """
+                SELECT 
+                    EpicNumber,
+                    EpicSummary,
+                    EpicEquipe,
+                    EpicStatus,
+                    EpicInicioPlanejado,
+                    EpicDueDate,
+                    CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) as PercentualConcluido,
+                    DATEDIFF(day, EpicInicioPlanejado, GETDATE()) as DiasDecorridos
+                FROM BI_Jira_Epico_Datas_Grafico
+                WHERE CAST(ISNULL(TasksPercentualMedia, 0) as decimal(5,2)) < 30
+                And TipoRegistroCalculo = 'Planejado Time'
+                AND EpicInicioPlanejado < DATEADD(day, -15, GETDATE())
+                AND EpicStatus NOT IN ('Done', 'Closed')
+                AND EpicInicioPlanejado IS NOT NULL
+                ORDER BY TasksPercentualMedia, EpicInicioPlanejado
+                """
             
-        else:
-            return jsonify({'error': 'Tipo de alerta não reconhecido'})
+            else:
+                return jsonify({'error': 'Tipo de alerta não reconhecido'})
         
-        df = pd.read_sql(query, conn)
-        conn.close()
+            df = cached_read_sql(query, conn)
         
         # Converter datas para string
         date_columns = [col for col in df.columns if 'Date' in col or 'Inicio' in col or 'Fim' in col]
@@ -851,98 +937,193 @@ def gantt():
 def gantt_redirect():
     return gantt_data()  
 
+def get_gantt_window_args():
+    """Janela pedida ao Gantt (row_offset, row_limit, janela_inicio, janela_fim)
+
+    Retorna None quando row_limit não é informado (gráfico completo).
+    """
+    row_limit = request.args.get('row_limit', '').strip()
+    if not row_limit:
+        return None
+    
+    try:
+        row_limit = max(1, min(int(row_limit), GANTT_WINDOW_MAX_ROWS))
+    except ValueError:
+        row_limit = GANTT_WINDOW_MAX_ROWS
+    try:
+        row_offset = max(0, int(request.args.get('row_offset', 0)))
+    except ValueError:
+        row_offset = 0
+    
+    def parse_janela(value):
+        try:
+            return datetime.strptime(value.strip()[:10], '%Y-%m-%d').strftime('%Y-%m-%d')
+        except ValueError:
+            return None
+    
+    janela_inicio = parse_janela(request.args.get('janela_inicio', ''))
+    janela_fim = parse_janela(request.args.get('janela_fim', ''))
+    
+    return {
+        'row_offset': row_offset,
+        'row_limit': row_limit,
+        'janela_inicio': janela_inicio,
+        'janela_fim': janela_fim
+    }
+
+# Registros que viram itens do Gantt (mesmo critério de build_gantt_items)
+GANTT_ITEM_SQL = (f"TipoRegistroCalculo IN ({', '.join('?' * len(TIPO_REGISTRO_STYLE))}) "
+                  "AND TasksDataInicial IS NOT NULL AND TasksDataFim IS NOT NULL")
+GANTT_ITEM_PARAMS = list(TIPO_REGISTRO_STYLE)
+
+def read_gantt_window_summary(conn, from_sql, params):
+    """Totais do Gantt em janelas calculados no banco (cada janela lê só as suas linhas)
+    
+    from_sql/params: FROM/WHERE dos épicos com os filtros da requisição.
+    Retorna dict com registros, épicos, itens, menor/maior data dos itens e
+    listas de equipes e status.
+    """
+    query_totais = f"""
+    SELECT 
+        COUNT(*) as Registros,
+        COUNT(DISTINCT ISNULL(EpicNumber, 'Epic-0')) as Epicos,
+        SUM(Item) as Itens,
+        MIN(CASE WHEN Item = 1 THEN Inicio END) as MinInicio,
+        MAX(CASE WHEN Item = 1 THEN Inicio END) as MaxInicio,
+        MIN(CASE WHEN Item = 1 THEN Fim END) as MinFim,
+        MAX(CASE WHEN Item = 1 THEN Fim END) as MaxFim
+    FROM (
+        SELECT EpicNumber,
+            CAST(TasksDataInicial AS DATE) as Inicio,
+            CAST(TasksDataFim AS DATE) as Fim,
+            CASE WHEN {GANTT_ITEM_SQL} THEN 1 ELSE 0 END as Item
+        {from_sql}
+    ) gantt
+    """
+    totais = cached_read_sql(query_totais, conn, params=GANTT_ITEM_PARAMS + params).iloc[0]
+    
+    query_listas = f"""
+    SELECT DISTINCT
+        CAST(ISNULL(EpicEquipe, 'Sem Equipe') AS VARCHAR(100)) as EpicEquipe,
+        CAST(ISNULL(EpicStatus, 'Indefinido') AS VARCHAR(50)) as EpicStatus
+    {from_sql}
+    """
+    listas = cached_read_sql(query_listas, conn, params=params)
+    
+    itens = int(totais['Itens'] or 0)
+    min_date = max_date = None
+    if itens:
+        min_date = min(pd.Timestamp(totais['MinInicio']), pd.Timestamp(totais['MinFim']))
+        max_date = max(pd.Timestamp(totais['MaxInicio']), pd.Timestamp(totais['MaxFim']))
+    
+    return {
+        'registros': int(totais['Registros'] or 0),
+        'epicos': int(totais['Epicos'] or 0),
+        'itens': itens,
+        'min_date': min_date,
+        'max_date': max_date,
+        'equipes': sorted(listas['EpicEquipe'].dropna().unique().tolist()),
+        'status': sorted(listas['EpicStatus'].dropna().unique().tolist())
+    }
+
 @app.route('/api/gantt-data')
 def gantt_data():
     """API para dados do gráfico de Gantt AGRUPADO POR ÉPICO com Indicadores """
     try:
         log_message("=== INICIANDO GANTT AGRUPADO COM INDICADORES  ===")
         
-        # Testar conexão primeiro
-        log_message("Testando conexão com banco...")
-        success, message = db_manager.test_connection()
-        if not success:
-            error_msg = f"Erro de conexão: {message}"
-            log_message(f"ERRO: {error_msg}")
-            return jsonify({'error': error_msg})
+        with db_manager.connection(lazy=True) as conn:
         
-        log_message("Conexão OK - obtendo parâmetros...")
+            # Obter filtros da requisição
+            equipe_filter = request.args.get('equipe', '').strip()
+            status_filter = request.args.get('status', '').strip()
         
-        conn = db_manager.get_connection()
-        
-        # Obter filtros da requisição
-        equipe_filter = request.args.get('equipe', '').strip()
-        status_filter = request.args.get('status', '').strip()
-        
-        # verificar se são datas personalizadas ou período pré-definido
-        periodo_filter = request.args.get('periodo', 'ano_atual')
-        data_inicio_custom = request.args.get('data_inicio', '').strip()
-        data_fim_custom = request.args.get('data_fim', '').strip()
-        
-        today = datetime.now()
-        current_year = today.year
-        
-        # Se há datas customizadas, usar elas. Senão, calcular pelo período
-        if data_inicio_custom and data_fim_custom:
-            data_inicio = data_inicio_custom
-            data_fim = data_fim_custom
-        else:
-            data_inicio, data_fim = calculate_period_dates(periodo_filter)
-            # Se ainda não tiver datas (período 'todos'), usar padrão
-            if not data_inicio:
-                data_inicio = f"{current_year}-01-01"
-            if not data_fim:
-                data_fim = f"{current_year}-12-31"
+            # verificar se são datas personalizadas ou período pré-definido
+            periodo_filter = request.args.get('periodo', 'ano_atual')
+            data_inicio_custom = request.args.get('data_inicio', '').strip()
+            data_fim_custom = request.args.get('data_fim', '').strip()
         
-        log_message(f"Filtros: equipe='{equipe_filter}', status='{status_filter}', periodo='{periodo_filter}', inicio='{data_inicio}', fim='{data_fim}'")
+            today = datetime.now()
+            current_year = today.year
         
-        # Query ATUALIZADA para usar a estrutura real da tabela
-        query = """
-        SELECT 
-            CAST(ISNULL(EpicNumber, 'Epic-0') AS VARCHAR(50)) as EpicNumber,
-            CAST(ISNULL(EpicSummary, 'Sem resumo') AS VARCHAR(500)) as EpicSummary,
-            CAST(ISNULL(EpicEquipe, 'Sem Equipe') AS VARCHAR(100)) as EpicEquipe,
-            CAST(ISNULL(EpicStatus, 'Indefinido') AS VARCHAR(50)) as EpicStatus,
-            CAST(ISNULL(EpicProduto, 'Sem Produto') AS VARCHAR(100)) as EpicProduto,
-            EpicInicioPlanejado,
-            EpicDueDate,
-            TasksDataInicial,
-            TasksDataFim,
-            CAST(ISNULL(TasksPercentualMedia, 0) AS DECIMAL(7,2)) as TasksPercentualMedia,
-            CAST(ISNULL(TipoRegistroCalculo, 'Indefinido') AS VARCHAR(100)) as TipoRegistroCalculo,
-            CAST(ISNULL(IndicadorAndamentoEpico, 'Verde') AS VARCHAR(100)) as IndicadorAndamentoEpico
-        FROM BI_Jira_Epico_Datas_Grafico
-        WHERE EpicInicioPlanejado IS NOT NULL 
-        AND EpicDueDate IS NOT NULL
-        AND TipoRegistroCalculo IS NOT NULL
-        AND (
-            -- Épicos que começam OU terminam no período especificado
-            (EpicDueDate >= ? AND EpicDueDate <= ?) OR
-            (EpicInicioPlanejado >= ? AND EpicInicioPlanejado <= ?) OR
-            -- Épicos que começam antes e terminam depois (atravessam o período)
-            (EpicInicioPlanejado < ? AND EpicDueDate > ?)
-        )
-        """
+            # Se há datas customizadas, usar elas. Senão, calcular pelo período
+            if data_inicio_custom and data_fim_custom:
+                data_inicio = data_inicio_custom
+                data_fim = data_fim_custom
+            else:
+                data_inicio, data_fim = calculate_period_dates(periodo_filter)
+                # Se ainda não tiver datas (período 'todos'), usar padrão
+                if not data_inicio:
+                    data_inicio = f"{current_year}-01-01"
+                if not data_fim:
+                    data_fim = f"{current_year}-12-31"
         
-        params = [data_inicio, data_fim, data_inicio, data_fim, data_inicio, data_fim]
+            log_message(f"Filtros: equipe='{equipe_filter}', status='{status_filter}', periodo='{periodo_filter}', inicio='{data_inicio}', fim='{data_fim}'")
         
-        if equipe_filter and equipe_filter != '':
-            query += " AND ISNULL(EpicEquipe, '') = ?"
-            params.append(equipe_filter)
+            # Query ATUALIZADA para usar a estrutura real da tabela
+            select_sql = """
+            SELECT 
+                CAST(ISNULL(EpicNumber, 'Epic-0') AS VARCHAR(50)) as EpicNumber,
+                CAST(ISNULL(EpicSummary, 'Sem resumo') AS VARCHAR(500)) as EpicSummary,
+                CAST(ISNULL(EpicEquipe, 'Sem Equipe') AS VARCHAR(100)) as EpicEquipe,
+                CAST(ISNULL(EpicStatus, 'Indefinido') AS VARCHAR(50)) as EpicStatus,
+                CAST(ISNULL(EpicProduto, 'Sem Produto') AS VARCHAR(100)) as EpicProduto,
+                EpicInicioPlanejado,
+                EpicDueDate,
+                TasksDataInicial,
+                TasksDataFim,
+                CAST(ISNULL(TasksPercentualMedia, 0) AS DECIMAL(7,2)) as TasksPercentualMedia,
+                CAST(ISNULL(TipoRegistroCalculo, 'Indefinido') AS VARCHAR(100)) as TipoRegistroCalculo,
+                CAST(ISNULL(IndicadorAndamentoEpico, 'Verde') AS VARCHAR(100)) as IndicadorAndamentoEpico
+            """
+            from_sql = """
+            FROM BI_Jira_Epico_Datas_Grafico
+            WHERE EpicInicioPlanejado IS NOT NULL 
+            AND EpicDueDate IS NOT NULL
+            AND TipoRegistroCalculo IS NOT NULL
+            """
             
-        if status_filter and status_filter != '':
-            query += " AND ISNULL(EpicStatus, '') = ?"
-            params.append(status_filter)
+            # Épicos que começam, terminam ou atravessam o período (um único intervalo sobreposto)
+            filters = SqlFilters()
+            filters.overlaps('EpicInicioPlanejado', 'EpicDueDate', data_inicio, data_fim, nullable=False)
+            filters.equals('EpicEquipe', equipe_filter, null_label=SEM_EQUIPE)
+            filters.equals('EpicStatus', status_filter, null_label=STATUS_INDEFINIDO)
+            
+            from_sql += filters.and_sql()
+            params = filters.params
             
-        query += " ORDER BY EpicEquipe, EpicNumber, TipoRegistroCalculo"
+            window = get_gantt_window_args()
+            
+            # Nível de detalhe: 'epicos' (padrão), 'equipes' ou 'auto' (equipes acima de GANTT_LOD_MAX_EPICOS)
+            nivel = request.args.get('nivel', 'epicos').strip()
+            
+            # Em janelas, totais e listas vêm de agregações e só as linhas pedidas são lidas
+            # (OFFSET/FETCH na mesma ordem do gráfico completo)
+            resumo = None
+            if window is not None and nivel != 'equipes':
+                resumo = read_gantt_window_summary(conn, from_sql, params)
+                if nivel == 'auto':
+                    nivel = 'equipes' if not equipe_filter and resumo['epicos'] > GANTT_LOD_MAX_EPICOS else 'epicos'
+                if nivel == 'equipes':
+                    resumo = None
+            
+            # Ordenação pelas colunas do SELECT (com ISNULL), a mesma nos dois modos
+            order_sql = f" ORDER BY {', '.join(GANTT_ORDER_COLUMNS)}"
+            if resumo is None:
+                query = select_sql + from_sql + order_sql
+                query_params = params
+            else:
+                query = (select_sql + from_sql + f" AND {GANTT_ITEM_SQL}" + order_sql
+                         + f" OFFSET {window['row_offset']} ROWS FETCH NEXT {window['row_limit']} ROWS ONLY")
+                query_params = params + GANTT_ITEM_PARAMS
         
-        log_message(f"Executando query com {len(params)} parâmetros...")
+            log_message(f"Executando query com {len(query_params)} parâmetros...")
         
-        df = pd.read_sql(query, conn, params=params)
-        conn.close()
+            df = cached_read_sql(query, conn, params=query_params)
         
         log_message(f"DataFrame retornou {len(df)} linhas")
         
-        if df.empty:
+        if (df.empty if resumo is None else resumo['registros'] == 0):
             log_message("DataFrame vazio - retornando mensagem")
             return jsonify({
                 'message': 'Nenhum dado encontrado para os filtros selecionados',
@@ -951,111 +1132,13 @@ def gantt_data():
                 'total_epicos': 0
             })
         
-        # NOVA LÓGICA: Agrupar por épico e criar subgrupos
-        gantt_data = []
-        epicos_agrupados = df.groupby(['EpicNumber', 'EpicSummary', 'EpicEquipe', 'EpicStatus'])
-        
-        log_message("Processando dados agrupados por épico...")
-        
-        for (epic_number, epic_summary, epic_equipe, epic_status), grupo in epicos_agrupados:
-            try:
-                log_message(f"Processando épico {epic_number}")
-                
-                epic_number_str = str(epic_number) if epic_number is not None else "Epic-0"
-                # Remover caracteres especiais que podem quebrar JSON
-                epic_summary_str = str(epic_summary) if epic_summary is not None else "Sem resumo"
-                epic_summary_str = epic_summary_str.replace('"', "'").replace('\n', ' ').replace('\r', ' ')
-                epic_equipe_str = str(epic_equipe) if epic_equipe is not None else "Sem Equipe"
-                
-                # Truncar resumo se muito longo
-                if len(epic_summary_str) > 60:
-                    epic_summary_str = epic_summary_str[:60] + "..."
-                
-                # Base do nome da task (épico)
-                task_base_name = f"{epic_number_str} - {epic_summary_str}"
-                
-                # Processar cada tipo de registro (Planejado P.O., Planejado Time, Realizado Time)
-                for index, row in grupo.iterrows():
-                    tipo_registro = row['TipoRegistroCalculo']
-                    indicador_andamento = row['IndicadorAndamentoEpico']
-                    
-                    # Definir configurações baseadas no tipo de registro
-                    if tipo_registro == 'Planejado P.O.':
-                        task_prefix = "📋 PO"
-                        base_color = '#6c757d'  # Cinza base
-                        opacity = 0.7
-                        width = 18
-                        tipo_display = "PLANEJADO P.O."
-                    elif tipo_registro == 'Planejado Time':
-                        task_prefix = "⏰ Time"
-                        base_color = '#17a2b8'  # Azul base
-                        opacity = 0.85
-                        width = 22
-                        tipo_display = "PLANEJADO TIME"
-                    elif tipo_registro == 'Realizado Time':
-                        task_prefix = "✅ Real"
-                        # Para o realizado, usar a cor baseada no indicador
-                        if indicador_andamento == 'Verde':
-                            base_color = '#28a745'  # Verde
-                        elif indicador_andamento == 'Amarelo':
-                            base_color = '#ffc107'  # Amarelo
-                        elif indicador_andamento == 'Vermelho':
-                            base_color = '#dc3545'  # Vermelho
-                        else:
-                            base_color = '#6c757d'  # Cinza padrão
-                        
-                        opacity = 1.0
-                        width = 26
-                        tipo_display = "REALIZADO TIME"
-                    else:
-                        log_message(f"  Tipo de registro não reconhecido: {tipo_registro}")
-                        continue  # Pular tipos não reconhecidos
-                    
-                    # Nome completo da task 
-                    task_name = f"  {task_prefix}: {task_base_name}"
-                    
-                    # Datas de início e fim
-                    task_start = row['TasksDataInicial']
-                    task_finish = row['TasksDataFim']
-                    
-                    if pd.isna(task_start) or pd.isna(task_finish):
-                        log_message(f"  Pulando {tipo_registro} - datas inválidas")
-                        continue
-                    
-                    # Descrição do indicador para hover - SEM EMOJIS
-                    indicador_descricao_map = {
-                        'Verde': 'Dentro do Prazo/Concluido',
-                        'Amarelo': 'Proximo do Prazo (<=5 dias)',
-                        'Vermelho': 'Atrasado/Critico'
-                    }
-                    indicador_descricao = indicador_descricao_map.get(indicador_andamento, 'Indefinido')
-                    
-                    gantt_data.append({
-                        'Task': task_name,
-                        'Start': task_start.strftime('%Y-%m-%d') if pd.notna(task_start) else None,
-                        'Finish': task_finish.strftime('%Y-%m-%d') if pd.notna(task_finish) else None,
-                        'Resource': epic_equipe_str,
-                        'Complete': float(row['TasksPercentualMedia']) if pd.notna(row['TasksPercentualMedia']) else 0.0,
-                        'Status': str(epic_status),
-                        'TipoRegistro': tipo_registro,
-                        'TipoDisplay': tipo_display,
-                        'EpicNumber': epic_number_str,
-                        'IndicadorAndamento': indicador_andamento,
-                        'IndicadorDescricao': indicador_descricao,
-                        'Color': base_color,
-                        'Opacity': opacity,
-                        'Width': width
-                    })
-                
-                log_message(f"  Épico {epic_number_str} processado com {len(grupo)} registros")
-                
-            except Exception as e:
-                log_message(f"ERRO no épico {epic_number}: {e}")
-                continue
+        # Itens do Gantt (um por épico e tipo de registro) montados por coluna
+        gantt_items = build_gantt_items(df)
+        total_items = len(gantt_items) if resumo is None else resumo['itens']
         
-        log_message(f"Total processado: {len(gantt_data)} itens")
+        log_message(f"Total processado: {total_items} itens")
         
-        if not gantt_data:
+        if total_items == 0:
             return jsonify({
                 'message': 'Nenhum épico com datas válidas encontrado',
                 'equipes': [],
@@ -1063,79 +1146,15 @@ def gantt_data():
                 'total_epicos': 0
             })
         
-        # Criar gráfico Plotly com AGRUPAMENTO e INDICADORES
-        log_message("Criando gráfico Plotly agrupado com indicadores...")
-        
-        fig = go.Figure()
-        
-        # Controle de legendas por tipo de registro
-        legendas_mostradas = {
-            'Planejado P.O.': False,
-            'Planejado Time': False,
-            'Realizado Time': False
-        }
-        
-        # Criar traces para cada item
-        for i, item in enumerate(gantt_data):
-            
-            tipo_registro = item['TipoRegistro']
-            
-            # Mostrar legenda apenas uma vez por tipo
-            show_legend = not legendas_mostradas[tipo_registro]
-            legendas_mostradas[tipo_registro] = True
-            
-            # Nome para a legenda - SEM EMOJIS
-            legend_names = {
-                'Planejado P.O.': 'Planejado P.O.',
-                'Planejado Time': 'Planejado Time',
-                'Realizado Time': 'Realizado Time'
-            }
-            legend_name = legend_names.get(tipo_registro, tipo_registro)
-            
-            # Remover caracteres especiais do hovertemplate
-            hover_text = f"""<b>{item["TipoDisplay"]}</b><br>
-<b>{item["Task"]}</b><br>
-Equipe: {item["Resource"]}<br>
-Inicio: {item["Start"]}<br>
-Fim: {item["Finish"]}<br>
-Progresso: {item["Complete"]}%<br>
-Status: {item["Status"]}<br>
-Indicador: {item["IndicadorDescricao"]}<br>
-<extra></extra>"""
-            
-            fig.add_trace(go.Scatter(
-                x=[item['Start'], item['Finish']],
-                y=[item['Task'], item['Task']],
-                mode='lines',
-                line=dict(
-                    color=item['Color'],
-                    width=item['Width']
-                ),
-                opacity=item['Opacity'],
-                name=legend_name,
-                showlegend=show_legend,
-                legendgroup=tipo_registro.lower().replace(' ', '_').replace('.', ''),
-                hovertemplate=hover_text,
-                text=[item['Task'], item['Task']],
-                hoverinfo='text'
-            ))
-        
-        log_message(f"Total de traces adicionadas: {len(fig.data)}")
-        
         # Calcular range de datas para zoom inicial correto
-        all_dates = []
-        for item in gantt_data:
-            if item['Start']:
-                all_dates.append(datetime.strptime(item['Start'], '%Y-%m-%d'))
-            if item['Finish']:
-                all_dates.append(datetime.strptime(item['Finish'], '%Y-%m-%d'))
+        if resumo is None:
+            min_date, max_date = gantt_date_range(gantt_items)
+        else:
+            min_date, max_date = resumo['min_date'], resumo['max_date']
         
         # Definir range de visualização
-        if all_dates:
-            min_date = min(all_dates)
-            max_date = max(all_dates)
+        if min_date is not None:
             # Margem menor para melhor visualização
-            from datetime import timedelta
             margin = timedelta(days=15)
             range_start = min_date - margin
             range_end = max_date + margin
@@ -1145,152 +1164,77 @@ Indicador: {item["IndicadorDescricao"]}<br>
             range_end = datetime.strptime(data_fim, '%Y-%m-%d')
             log_message(f"Range padrão: {range_start.strftime('%Y-%m-%d')} até {range_end.strftime('%Y-%m-%d')}")
         
-        # Adicionar linha vertical "HOJE"
         hoje_str = datetime.now().strftime('%Y-%m-%d')
         
-        fig.add_shape(
-            type="line",
-            x0=hoje_str,
-            x1=hoje_str,
-            y0=0,
-            y1=1,
-            yref="paper",
-            line=dict(
-                color="red",
-                width=3,
-                dash="dash"
-            )
-        )
-        
-        # Adicionar anotação "HOJE"
-        fig.add_annotation(
-            x=hoje_str,
-            y=1.05,
-            yref="paper",
-            text="<b>HOJE</b>",
-            showarrow=False,
-            font=dict(color="red", size=12, family="Arial Black"),
-            bgcolor="rgba(255,255,255,0.9)",
-            bordercolor="red",
-            borderwidth=2
-        )
-        
-        # Configurar layout - AGRUPADO E RESPONSIVO
-        fig.update_layout(
-            title={
-                'text': 'Roadmap de Epicos - Grafico de Gantt Agrupado<br><sub>Planejado PO | Planejado Time | Realizado (Indicadores por Cor)</sub>',
-                'x': 0.5,
-                'xanchor': 'center',
-                'font': {'size': 16}
-            },
-            
-            # Altura baseada no número de itens (considerando agrupamento)
-            height=max(800, len(gantt_data) * 30 + 200),
-            
-            # EIXO X PRINCIPAL (inferior)
-            xaxis=dict(
-                type='date',
-                tickformat='%d/%m/%Y',
-                dtick='M1',
-                tickmode='linear',
-                showgrid=True,
-                gridcolor='lightgray',
-                gridwidth=1,
-                tickangle=45,
-                tickfont=dict(size=11),
-                side='bottom',
-                showline=True,
-                linewidth=2,
-                linecolor='black',
-                title=dict(text='Data', font=dict(size=14)),
-                autorange=False,
-                range=[range_start, range_end]
-            ),
-            
-            # EIXO X SUPERIOR
-            xaxis2=dict(
-                type='date',
-                tickformat='%b/%Y',
-                dtick='M1',
-                tickmode='linear',
-                showgrid=False,
-                tickangle=0,
-                tickfont=dict(size=12, color='blue'),
-                side='top',
-                showline=True,
-                linewidth=2,
-                linecolor='blue',
-                overlaying='x',
-                matches='x',
-                title=dict(
-                    text='Timeline Principal',
-                    font=dict(size=14, color='blue')
-                ),
-                autorange=False,
-                range=[range_start, range_end]
-            ),
-            
-            # EIXO Y - Agrupado
-            yaxis=dict(
-                autorange='reversed',
-                showgrid=True,
-                gridcolor='lightgray',
-                gridwidth=1,
-                tickfont=dict(size=9),  # Fonte menor para comportar mais itens
-                side='left',
-                showline=True,
-                linewidth=2,
-                linecolor='black',
-                title=dict(text='Epicos por Tipo', font=dict(size=14))
-            ),
-            
-            # MARGENS OTIMIZADAS para agrupamento
-            margin=dict(l=480, r=50, t=180, b=120),
-            
-            # CORES E FONTES
-            plot_bgcolor='white',
-            paper_bgcolor='white',
-            font=dict(family="Arial, sans-serif", size=11),
-            
-            # LEGENDA HORIZONTAL
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="center",
-                x=0.5,
-                bgcolor="rgba(255,255,255,0.95)",
-                bordercolor="gray",
-                borderwidth=2,
-                font=dict(size=12)
-            ),
-            
-            showlegend=True,
-            hovermode='closest',
-            autosize=True
-        )
-        
-        log_message("Layout configurado! Convertendo para JSON...")
+        # Contar épicos únicos
+        total_epicos_unicos = df['EpicNumber'].nunique() if resumo is None else resumo['epicos']
+        
+        if nivel == 'auto':
+            nivel = 'equipes' if not equipe_filter and total_epicos_unicos > GANTT_LOD_MAX_EPICOS else 'epicos'
+        
+        # Renderização: 'svg' (padrão), 'webgl' ou 'auto' (WebGL acima de GANTT_WEBGL_MIN_ROWS linhas)
+        render = request.args.get('render', 'svg').strip()
+        trace_type = gantt_trace_type(render, total_items)
+        
+        if nivel == 'equipes':
+            # Uma barra resumo por equipe; os épicos são carregados ao expandir (filtro de equipe)
+            window = None
+            summary = build_gantt_team_summary(gantt_items)
+            figure = build_gantt_team_figure(summary, range_start, range_end, hoje_str)
+            log_message(f"Gantt resumido: {len(summary)} equipes")
+        elif window is None:
+            # Figura como dicts simples (um trace por tipo de registro/cor), sem validação do Plotly
+            log_message("Montando figura do Gantt agrupado com indicadores...")
+            figure = build_gantt_figure(gantt_items, range_start, range_end, hoje_str, trace_type)
+        else:
+            # Apenas as linhas pedidas (já paginadas na consulta); a janela de datas
+            # descarta barras fora da área visível
+            window_items, window_tasks = clip_gantt_window(gantt_items, window['janela_inicio'], window['janela_fim'])
+            view_start = pd.Timestamp(window['janela_inicio']) if window['janela_inicio'] else range_start
+            view_end = pd.Timestamp(window['janela_fim']) if window['janela_fim'] else range_end
+            figure = build_gantt_window_figure(window_items, window_tasks, view_start, view_end, hoje_str, trace_type)
+            log_message(f"Janela do Gantt: linhas {window['row_offset']}-{window['row_offset'] + len(window_tasks)} de {total_items}")
         
-        # Usar ensure_ascii=False para manter caracteres especiais, mas remover emojis problemáticos
-        graphJSON = json.dumps(fig, cls=PlotlyJSONEncoder, ensure_ascii=False)
+        log_message(f"Total de traces: {len(figure['data'])}")
         
         # Obter listas para filtros (únicas)
-        equipes_list = sorted(df['EpicEquipe'].dropna().unique().tolist())
-        status_list = sorted(df['EpicStatus'].dropna().unique().tolist())
-        
-        # Contar épicos únicos
-        total_epicos_unicos = df['EpicNumber'].nunique()
+        if resumo is None:
+            equipes_list = sorted(df['EpicEquipe'].dropna().unique().tolist())
+            status_list = sorted(df['EpicStatus'].dropna().unique().tolist())
+        else:
+            equipes_list, status_list = resumo['equipes'], resumo['status']
         
-        log_message(f"SUCESSO! Retornando {total_epicos_unicos} épicos únicos com {len(gantt_data)} registros")
+        log_message(f"SUCESSO! Retornando {total_epicos_unicos} épicos únicos com {total_items} registros")
         log_message("=== FIM GANTT-DATA AGRUPADO COM INDICADORES ===")
         
-        return jsonify({
-            'gantt': graphJSON,
+        payload = {
+            'gantt': figure,
             'equipes': equipes_list,
             'status': status_list,
-            'total_epicos': total_epicos_unicos
-        })
+            'total_epicos': int(total_epicos_unicos),
+            'nivel': nivel,
+            'render': 'webgl' if trace_type == 'scattergl' and nivel != 'equipes' else 'svg',
+            'webgl_min_rows': GANTT_WEBGL_MIN_ROWS
+        }
+        
+        if window is not None:
+            rows = len(window_tasks)
+            payload['total_rows'] = int(total_items)
+            payload['range'] = {
+                'inicio': min_date.strftime('%Y-%m-%d'),
+                'fim': max_date.strftime('%Y-%m-%d')
+            }
+            payload['window'] = {
+                'row_offset': window['row_offset'],
+                'row_limit': window['row_limit'],
+                'rows': rows,
+                'has_more': window['row_offset'] + rows < total_items,
+                'janela_inicio': window['janela_inicio'],
+                'janela_fim': window['janela_fim']
+            }
+        
+        # Figura enviada como objeto JSON (serializada uma única vez)
+        return fast_jsonify(payload)
         
     except Exception as e:
         import traceback
@@ -1307,27 +1251,126 @@ def relatorio_epicos():
     """Página do relatório de épicos"""
     return render_template('relatorio_epicos.html')
 
+def build_epicos_filters(equipe_filter='', status_filter='', produto_filter='', search_filter='',
+                         data_inicio='', data_fim=''):
+    """FROM/WHERE dos épicos ('Planejado Time') com os filtros da tela de épicos
+    
+    Usado pela API paginada e pela exportação, que precisam devolver o mesmo conjunto.
+    Retorna (sql, params).
+    """
+    filters = SqlFilters(["TipoRegistroCalculo = 'Planejado Time'"])
+    
+    # Aplicar filtros de equipe, status e produto
+    filters.equals('EpicEquipe', equipe_filter, null_label=SEM_EQUIPE)
+    filters.equals('EpicStatus', status_filter, null_label=STATUS_INDEFINIDO)
+    filters.equals('EpicProduto', produto_filter, null_label=SEM_PRODUTO)
+    
+    # Aplicar filtro de data (épicos que começam, terminam ou atravessam o período)
+    if data_inicio and data_fim:
+        filters.overlaps('EpicInicioPlanejado', 'EpicDueDate', data_inicio, data_fim)
+    elif data_inicio:
+        filters.between('EpicInicioPlanejado', inicio=data_inicio)
+    elif data_fim:
+        filters.between('EpicDueDate', fim=data_fim)
+    
+    # Filtro de busca (texto) por número ou resumo
+    filters.search(['EpicNumber', 'EpicSummary'], search_filter)
+    
+    where_sql = f" FROM BI_Jira_Epico_Datas_Grafico WHERE {filters.sql()}"
+    params = filters.params
+    
+    return where_sql, params
+
+# Ordenação estável da paginação por chave dos épicos
+EPICOS_PAGE_ORDER = [('EpicEquipe', 'ASC'), ('EpicNumber', 'ASC')]
+
+def format_epicos_dates(df):
+    """Converter datas dos épicos para string (JSON)"""
+    date_columns = ['EpicInicioPlanejado', 'EpicDueDate', 'TasksDataInicial', 'TasksDataFim']
+    for col in date_columns:
+        if col in df.columns:
+            df[col] = df[col].dt.strftime('%d/%m/%Y %H:%M') if df[col].dtype == 'datetime64[ns]' else df[col]
+    return df
+
 @app.route('/api/epicos-data')
 def epicos_data():
-    """API para dados dos épicos"""
+    """API paginada dos épicos com filtros aplicados no banco
+    
+    Parâmetros: equipe, status, produto, search, data_inicio, data_fim,
+    page_size e cursor (next_cursor da página anterior).
+    """
     try:
-        conn = db_manager.get_connection()
+        equipe_filter = request.args.get('equipe', '').strip()
+        status_filter = request.args.get('status', '').strip()
+        produto_filter = request.args.get('produto', '').strip()
+        search_filter = request.args.get('search', '').strip()
+        data_inicio = request.args.get('data_inicio', '').strip()
+        data_fim = request.args.get('data_fim', '').strip()
+        page_size = get_page_size()
+        last_values = decode_page_cursor(request.args.get('cursor', ''))
+        
+        where_sql, params = build_epicos_filters(
+            equipe_filter, status_filter, produto_filter, search_filter, data_inicio, data_fim
+        )
+        # Número do épico é a chave da paginação e do detalhe
+        where_sql += " AND EpicNumber IS NOT NULL"
+        
+        page_sql = where_sql
+        page_params = list(params)
+        if last_values and len(last_values) == len(EPICOS_PAGE_ORDER):
+            condition, condition_params = keyset_condition(EPICOS_PAGE_ORDER, last_values)
+            page_sql += f" AND {condition}"
+            page_params.extend(condition_params)
+        
+        order_sql = ', '.join(f"{col} {direction}" for col, direction in EPICOS_PAGE_ORDER)
+        # Uma linha a mais indica se existe próxima página
+        page_query = f"SELECT TOP {page_size + 1} *{page_sql} ORDER BY {order_sql}"
+        count_query = "SELECT COUNT(*) as total" + where_sql
+        
+        with db_manager.connection(lazy=True) as conn:
+            df = cached_fetch_columns(page_query, conn, 'BI_Jira_Epico_Datas_Grafico', params=page_params)
+            df_total = cached_read_sql(count_query, conn, params=params)
+        
+        total = int(df_total['total'].iloc[0]) if not df_total.empty else 0
+        has_more = len(df) > page_size
+        df = df.iloc[:page_size]
+        
+        next_cursor = None
+        if has_more and not df.empty:
+            next_cursor = encode_page_cursor(page_cursor_values(df.iloc[-1], EPICOS_PAGE_ORDER))
+        
+        df = format_epicos_dates(df)
+        
+        return jsonify({
+            'epicos': typed_frame_records(df),
+            'total': total,
+            'page_size': page_size,
+            'has_more': has_more,
+            'next_cursor': next_cursor
+        })
+        
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/epicos-detalhes')
+def epicos_detalhes():
+    """Todos os registros (tipos de cálculo) de um épico, usados no modal de detalhes"""
+    try:
+        epic_number = request.args.get('epic', '').strip()
+        if not epic_number:
+            return jsonify({'error': 'Parâmetro epic é obrigatório'}), 400
         
         query = """
         SELECT * FROM BI_Jira_Epico_Datas_Grafico
-        ORDER BY EpicEquipe, EpicNumber
+        WHERE EpicNumber = ?
+        ORDER BY TipoRegistroCalculo
         """
         
-        df = pd.read_sql(query, conn)
-        conn.close()
-        
-        # Converter datas para string para JSON
-        date_columns = ['EpicInicioPlanejado', 'EpicDueDate', 'TasksDataInicial', 'TasksDataFim']
-        for col in date_columns:
-            if col in df.columns:
-                df[col] = df[col].dt.strftime('%d/%m/%Y %H:%M') if df[col].dtype == 'datetime64[ns]' else df[col]
+        with db_manager.connection(lazy=True) as conn:
+            df = cached_fetch_columns(query, conn, 'BI_Jira_Epico_Datas_Grafico', params=[epic_number])
         
-        return jsonify(df.fillna('').to_dict('records'))
+        df = format_epicos_dates(df)
+        return jsonify(typed_frame_records(df))
         
     except Exception as e:
         return jsonify({'error': str(e)})
@@ -1336,8 +1379,6 @@ def epicos_data():
 def export_epicos():
     """Exportar épicos para CSV com filtros aplicados - VERSÃO ATUALIZADA"""
     try:
-        conn = db_manager.get_connection()
-        
         # Obter parâmetros dos filtros
         equipe_filter = request.args.get('equipe', '').strip()
         status_filter = request.args.get('status', '').strip()
@@ -1349,85 +1390,26 @@ def export_epicos():
         # Log dos filtros recebidos
         log_message(f"Export épicos - Filtros: equipe={equipe_filter}, status={status_filter}, produto={produto_filter}, search={search_filter}, data_inicio={data_inicio}, data_fim={data_fim}")
         
-        # Query base
-        query = "SELECT * FROM BI_Jira_Epico_Datas_Grafico WHERE TipoRegistroCalculo = 'Planejado Time'"
-        params = []
-        
-        # Aplicar filtros de equipe, status e produto
-        if equipe_filter:
-            query += " AND ISNULL(EpicEquipe, '') = ?"
-            params.append(equipe_filter)
-            
-        if status_filter:
-            query += " AND ISNULL(EpicStatus, '') = ?"
-            params.append(status_filter)
-            
-        if produto_filter:
-            query += " AND ISNULL(EpicProduto, '') = ?"
-            params.append(produto_filter)
-        
-        # Aplicar filtro de data (mesmo filtro usado na tela)
-        if data_inicio and data_fim:
-            query += """ AND (
-                (EpicDueDate >= ? AND EpicDueDate <= ?) OR
-                (EpicInicioPlanejado >= ? AND EpicInicioPlanejado <= ?) OR
-                (EpicInicioPlanejado < ? AND EpicDueDate > ?)
-            )"""
-            params.extend([data_inicio, data_fim, data_inicio, data_fim, data_inicio, data_fim])
-        elif data_inicio:
-            query += " AND EpicInicioPlanejado >= ?"
-            params.append(data_inicio)
-        elif data_fim:
-            query += " AND EpicDueDate <= ?"
-            params.append(data_fim)
+        # Condições comuns à contagem e à exportação (mesmas da tela)
+        where_sql, params = build_epicos_filters(
+            equipe_filter, status_filter, produto_filter, search_filter, data_inicio, data_fim
+        )
         
-        query += " ORDER BY EpicEquipe, EpicNumber"
+        query = "SELECT *" + where_sql + " ORDER BY EpicEquipe, EpicNumber"
         
         log_message(f"Query de export: {query}")
         log_message(f"Parâmetros: {params}")
         
-        # Executar query
-        df = pd.read_sql(query, conn, params=params)
-        log_message(f"Registros retornados antes do filtro de busca: {len(df)}")
-        
-        conn.close()
-        
-        # Aplicar filtro de busca (texto) no DataFrame - igual ao frontend
-        if search_filter:
-            search_lower = search_filter.lower()
-            mask = (
-                df['EpicNumber'].fillna('').astype(str).str.lower().str.contains(search_lower, na=False) |
-                df['EpicSummary'].fillna('').astype(str).str.lower().str.contains(search_lower, na=False)
-            )
-            df = df[mask]
-            log_message(f"Registros após filtro de busca '{search_filter}': {len(df)}")
+        total_registros = count_rows("SELECT COUNT(*)" + where_sql, params)
+        log_message(f"Registros a exportar: {total_registros}")
         
         # Verificar se há dados para exportar
-        if df.empty:
+        if total_registros == 0:
             log_message("Nenhum dado encontrado para exportar com os filtros aplicados")
             return jsonify({
                 'error': 'Nenhum dado encontrado para exportar com os filtros aplicados'
             }), 404
         
-        # Formatar datas para melhor visualização no CSV
-        date_columns = ['EpicInicioPlanejado', 'EpicDueDate', 'TasksDataInicial', 'TasksDataFim']
-        for col in date_columns:
-            if col in df.columns:
-                # Converter para datetime se não estiver e depois para string
-                try:
-                    df[col] = pd.to_datetime(df[col], errors='coerce').dt.strftime('%d/%m/%Y %H:%M')
-                except:
-                    pass
-        
-        # Preencher valores nulos
-        df = df.fillna('')
-        
-        # Criar arquivo temporário
-        temp_file = tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False)
-        
-        # Salvar com encoding UTF-8 com BOM para Excel
-        df.to_csv(temp_file.name, index=False, encoding='utf-8-sig', sep=';')
-        
         # Construir nome do arquivo com informações sobre os filtros
         filename_parts = ['relatorio_epicos']
         
@@ -1457,21 +1439,20 @@ def export_epicos():
         
         # Adicionar timestamp e total de registros
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename_parts.append(f"{len(df)}registros")
+        filename_parts.append(f"{total_registros}registros")
         filename_parts.append(timestamp)
         
         filename = '_'.join(filename_parts) + '.csv'
         
         # Limitar tamanho do nome do arquivo
         if len(filename) > 200:
-            filename = f"relatorio_epicos_{len(df)}registros_{timestamp}.csv"
+            filename = f"relatorio_epicos_{total_registros}registros_{timestamp}.csv"
         
-        log_message(f"Exportando {len(df)} registros para arquivo: {filename}")
+        log_message(f"Exportando {total_registros} registros para arquivo: {filename}")
         
-        return send_file(temp_file.name, 
-                        as_attachment=True, 
-                        download_name=filename,
-                        mimetype='text/csv')
+        # Datas formatadas para melhor visualização no CSV
+        date_columns = ['EpicInicioPlanejado', 'EpicDueDate', 'TasksDataInicial', 'TasksDataFim']
+        return stream_csv_response(query, params, filename, date_columns=date_columns)
         
     except Exception as e:
         error_msg = f"Erro na exportação de épicos: {str(e)}"
@@ -1486,128 +1467,225 @@ def relatorio_subtasks():
     """Página do relatório de subtasks"""
     return render_template('relatorio_subtasks.html')
 
+def calculate_period_dates_for_subtasks(periodo_filter, data_inicio_custom=None, data_fim_custom=None):
+    """Datas do período das subtasks (None, None quando não há filtro de data)"""
+    today = datetime.now()
+    current_year = today.year
+    
+    # Se há datas customizadas, usar elas
+    if data_inicio_custom and data_fim_custom:
+        return data_inicio_custom, data_fim_custom
+    
+    if periodo_filter == 'ano_atual':
+        return f"{current_year}-01-01", f"{current_year}-12-31"
+    elif periodo_filter == 'q1':
+        return f"{current_year}-01-01", f"{current_year}-03-31"
+    elif periodo_filter == 'q2':
+        return f"{current_year}-04-01", f"{current_year}-06-30"
+    elif periodo_filter == 'q3':
+        return f"{current_year}-07-01", f"{current_year}-09-30"
+    elif periodo_filter == 'q4':
+        return f"{current_year}-10-01", f"{current_year}-12-31"
+    elif periodo_filter == '6_meses':
+        return (today - timedelta(days=180)).strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
+    elif periodo_filter == '3_meses':
+        return (today - timedelta(days=90)).strftime('%Y-%m-%d'), today.strftime('%Y-%m-%d')
+    elif periodo_filter == 'mes_atual':
+        return f"{current_year}-{today.month:02d}-01", today.strftime('%Y-%m-%d')
+    
+    # Para 'personalizado' sem datas ou outros valores, não aplicar filtro de data
+    return None, None
+
+def build_subtasks_filters(equipe_filter='', status_filter='', tipo_filter='', subTipo_filter='',
+                           search_filter='', data_inicio=None, data_fim=None):
+    """FROM/WHERE das subtasks com todos os filtros da tela de subtasks
+    
+    Usado pela API paginada e pela exportação. Retorna (sql, params).
+    """
+    filters = SqlFilters()
+    
+    # Aplicar filtros básicos apenas se fornecidos
+    filters.equals('TaskEquipe', equipe_filter)
+    filters.equals('TaskStatus', status_filter)
+    filters.equals('TaskType', tipo_filter)
+    filters.equals('TaskSubTipo', subTipo_filter)
+    
+    # Aplicar filtro de data se tiver
+    if data_inicio and data_fim:
+        filters.overlaps('TaskInicioPlanejado', 'TaskFimPlanejado', data_inicio, data_fim)
+    elif data_inicio:
+        filters.between('TaskInicioPlanejado', inicio=data_inicio)
+    elif data_fim:
+        filters.between('TaskFimPlanejado', fim=data_fim)
+    
+    # Filtro de busca (texto) por número ou resumo
+    filters.search(['TaskNumberId', 'TaskSummary'], search_filter)
+    
+    where_sql = f" FROM BI_Jira_SubTasks_Datas_Grafico WHERE {filters.sql()}"
+    params = filters.params
+    
+    return where_sql, params
+
+def get_subtasks_filter_args():
+    """Filtros das subtasks a partir da requisição (página, API e exportação)"""
+    data_inicio, data_fim = calculate_period_dates_for_subtasks(
+        request.args.get('periodo', 'ano_atual'),
+        request.args.get('data_inicio', '').strip(),
+        request.args.get('data_fim', '').strip()
+    )
+    return {
+        'equipe_filter': request.args.get('equipe', '').strip(),
+        'status_filter': request.args.get('status', '').strip(),
+        'tipo_filter': request.args.get('tipo', '').strip(),
+        # 'SubTipo' é o nome enviado pela exportação da página
+        'subTipo_filter': (request.args.get('subTipo', '') or request.args.get('SubTipo', '')).strip(),
+        'search_filter': request.args.get('search', '').strip(),
+        'data_inicio': data_inicio,
+        'data_fim': data_fim
+    }
+
+# Colunas exibidas na tabela de subtasks (o detalhe completo vem de /api/subtasks-detalhes)
+SUBTASKS_TABLE_COLUMNS = [
+    'TaskNumberId',
+    'TaskProjectKey',
+    'TaskSummary',
+    'TaskEquipe',
+    'TaskType',
+    'TaskSubTipo',
+    'TaskStatus',
+    'TaskAssignee',
+    'TaskInicioPlanejado',
+    'TaskFimPlanejado',
+    'TaskPercentualConcluido',
+    'EpicNumber'
+]
+
+# Ordenação estável da paginação por chave das subtasks
+SUBTASKS_PAGE_ORDER = [('TaskEquipe', 'ASC'), ('TaskProjectKey', 'ASC'), ('TaskNumberId', 'ASC')]
+
+def format_subtasks_dates(df):
+    """Converter colunas de data das subtasks para string (JSON)"""
+    date_columns = [col for col in df.columns if 'date' in col.lower() or 'inicio' in col.lower() or 'fim' in col.lower() or 'created' in col.lower() or 'updated' in col.lower()]
+    for col in date_columns:
+        if not df[col].empty:
+            try:
+                df[col] = pd.to_datetime(df[col], errors='coerce').dt.strftime('%d/%m/%Y %H:%M')
+            except:
+                # Se falhar, manter como está
+                pass
+    return df
+
 @app.route('/api/subtasks-data')
 def subtasks_data():
-    """API para dados das subtasks seguindo o padrão dos épicos"""
+    """API paginada das subtasks com todos os filtros aplicados no banco
+    
+    Parâmetros: equipe, status, tipo, subTipo, search, periodo, data_inicio,
+    data_fim, page_size e cursor (next_cursor da página anterior).
+    """
     try:
-        conn = db_manager.get_connection()
+        filtros = get_subtasks_filter_args()
+        page_size = get_page_size()
+        last_values = decode_page_cursor(request.args.get('cursor', ''))
         
-        # Obter parâmetros dos filtros (igual ao padrão dos épicos)
-        equipe_filter = request.args.get('equipe', '').strip()
-        status_filter = request.args.get('status', '').strip()
-        tipo_filter = request.args.get('tipo', '').strip()
-        subTipo_filter = request.args.get('subTipo', '').strip()
-        search_filter = request.args.get('search', '').strip()
-        periodo_filter = request.args.get('periodo', 'ano_atual')
-        data_inicio_custom = request.args.get('data_inicio', '').strip()
-        data_fim_custom = request.args.get('data_fim', '').strip()
+        log_message(f"SubTasks API - Filtros: {filtros}, page_size={page_size}")
         
-        log_message(f"SubTasks API - Filtros recebidos: equipe='{equipe_filter}', status='{status_filter}', tipo='{tipo_filter}', subTipo='{subTipo_filter}', search='{search_filter}', periodo='{periodo_filter}', data_inicio='{data_inicio_custom}', data_fim='{data_fim_custom}'")
+        where_sql, params = build_subtasks_filters(**filtros)
         
-        # Calcular datas baseadas no período (mesmo que o export)
-        today = datetime.now()
-        current_year = today.year
-        
-        # Determinar datas baseadas no período
-        if data_inicio_custom and data_fim_custom:
-            data_inicio = data_inicio_custom
-            data_fim = data_fim_custom
-        elif periodo_filter == 'ano_atual':
-            data_inicio = f"{current_year}-01-01"
-            data_fim = f"{current_year}-12-31"
-        elif periodo_filter == 'q1':
-            data_inicio = f"{current_year}-01-01"
-            data_fim = f"{current_year}-03-31"
-        elif periodo_filter == 'q2':
-            data_inicio = f"{current_year}-04-01"
-            data_fim = f"{current_year}-06-30"
-        elif periodo_filter == 'q3':
-            data_inicio = f"{current_year}-07-01"
-            data_fim = f"{current_year}-09-30"
-        elif periodo_filter == 'q4':
-            data_inicio = f"{current_year}-10-01"
-            data_fim = f"{current_year}-12-31"
-        elif periodo_filter == '6_meses':
-            data_inicio = (today - timedelta(days=180)).strftime('%Y-%m-%d')
-            data_fim = today.strftime('%Y-%m-%d')
-        elif periodo_filter == '3_meses':
-            data_inicio = (today - timedelta(days=90)).strftime('%Y-%m-%d')
-            data_fim = today.strftime('%Y-%m-%d')
-        elif periodo_filter == 'mes_atual':
-            data_inicio = f"{current_year}-{today.month:02d}-01"
-            data_fim = today.strftime('%Y-%m-%d')
-        else:
-            # Para 'personalizado' sem datas ou outros valores, não aplicar filtro de data
-            data_inicio = None
-            data_fim = None
+        page_sql = where_sql
+        page_params = list(params)
+        if last_values and len(last_values) == len(SUBTASKS_PAGE_ORDER):
+            condition, condition_params = keyset_condition(SUBTASKS_PAGE_ORDER, last_values)
+            page_sql += f" AND {condition}"
+            page_params.extend(condition_params)
         
-        # Query base com filtros de período aplicados no backend (para performance)
-        query = "SELECT * FROM BI_Jira_SubTasks_Datas_Grafico WHERE 1=1"
-        params = []
+        order_sql = ', '.join(f"{col} {direction}" for col, direction in SUBTASKS_PAGE_ORDER)
+        # Uma linha a mais indica se existe próxima página
+        page_query = f"SELECT TOP {page_size + 1} {', '.join(SUBTASKS_TABLE_COLUMNS)}{page_sql} ORDER BY {order_sql}"
+        count_query = "SELECT COUNT(*) as total" + where_sql
         
-        # Aplicar filtro de data se tiver (para reduzir volume de dados)
-        if data_inicio and data_fim:
-            query += """ AND (
-                (TaskFimPlanejado >= ? AND TaskFimPlanejado <= ?) OR
-                (TaskInicioPlanejado >= ? AND TaskInicioPlanejado <= ?) OR
-                (TaskInicioPlanejado < ? AND TaskFimPlanejado > ?)
-            )"""
-            params.extend([data_inicio, data_fim, data_inicio, data_fim, data_inicio, data_fim])
-            log_message(f"SubTasks API - Aplicando filtro de período: {data_inicio} até {data_fim}")
-        elif data_inicio:
-            query += " AND TaskInicioPlanejado >= ?"
-            params.append(data_inicio)
-            log_message(f"SubTasks API - Aplicando filtro de início: {data_inicio}")
-        elif data_fim:
-            query += " AND TaskFimPlanejado <= ?"
-            params.append(data_fim)
-            log_message(f"SubTasks API - Aplicando filtro de fim: {data_fim}")
+        with db_manager.connection(lazy=True) as conn:
+            df = cached_fetch_columns(page_query, conn, 'BI_Jira_SubTasks_Datas_Grafico', params=page_params)
+            df_total = cached_read_sql(count_query, conn, params=params)
         
-        query += " ORDER BY TaskEquipe, TaskProjectKey"
+        total = int(df_total['total'].iloc[0]) if not df_total.empty else 0
+        has_more = len(df) > page_size
+        df = df.iloc[:page_size]
         
-        log_message(f"SubTasks Query: {query}")
-        log_message(f"SubTasks Params: {params}")
+        next_cursor = None
+        if has_more and not df.empty:
+            next_cursor = encode_page_cursor(page_cursor_values(df.iloc[-1], SUBTASKS_PAGE_ORDER))
         
-        # Executar query com filtros de período aplicados
-        df = pd.read_sql(query, conn, params=params)
-        conn.close()
+        df = format_subtasks_dates(df)
+        log_message(f"SubTasks - Retornando {len(df)} de {total} registros")
         
-        log_message(f"SubTasks - Registros retornados do banco após filtro de período: {len(df)}")
+        return jsonify({
+            'subtasks': typed_frame_records(df),
+            'total': total,
+            'page_size': page_size,
+            'has_more': has_more,
+            'next_cursor': next_cursor
+        })
         
-        # Converter datas para string para JSON
-        date_columns = [col for col in df.columns if 'date' in col.lower() or 'inicio' in col.lower() or 'fim' in col.lower() or 'created' in col.lower() or 'updated' in col.lower()]
-        for col in date_columns:
-            if col in df.columns and not df[col].empty:
-                try:
-                    # Tentar converter para datetime e depois para string
-                    df[col] = pd.to_datetime(df[col], errors='coerce').dt.strftime('%d/%m/%Y %H:%M')
-                except:
-                    # Se falhar, manter como está
-                    pass
+    except Exception as e:
+        error_msg = f"Erro na API de subtasks: {str(e)}"
+        log_message(error_msg)
+        return jsonify({'error': error_msg})
+
+@app.route('/api/subtasks-detalhes')
+def subtasks_detalhes():
+    """Registro completo de uma subtask (modal de detalhes)"""
+    try:
+        task_number = request.args.get('task', '').strip()
+        if not task_number:
+            return jsonify({'error': 'Parâmetro task é obrigatório'}), 400
         
-        # Converter tipos numpy e retornar dados filtrados por período
-        result = convert_numpy_types(df.fillna('').to_dict('records'))
-        log_message(f"SubTasks - Retornando {len(result)} registros (com filtros de período aplicados)")
+        query = "SELECT TOP 1 * FROM BI_Jira_SubTasks_Datas_Grafico WHERE TaskNumberId = ?"
+        
+        with db_manager.connection(lazy=True) as conn:
+            df = cached_fetch_columns(query, conn, 'BI_Jira_SubTasks_Datas_Grafico', params=[task_number])
+        
+        if df.empty:
+            return jsonify({'error': 'Subtask não encontrada'}), 404
+        
+        df = format_subtasks_dates(df)
+        return jsonify(typed_frame_records(df)[0])
+        
+    except Exception as e:
+        return jsonify({'error': str(e)})
+
+@app.route('/api/subtasks-filters')
+def subtasks_filters():
+    """Opções dos filtros da tela de subtasks"""
+    try:
+        queries = {
+            'equipes': "SELECT DISTINCT TaskEquipe as valor FROM BI_Jira_SubTasks_Datas_Grafico WHERE TaskEquipe IS NOT NULL AND TaskEquipe != '' ORDER BY valor",
+            'status': "SELECT DISTINCT TaskStatus as valor FROM BI_Jira_SubTasks_Datas_Grafico WHERE TaskStatus IS NOT NULL AND TaskStatus != '' ORDER BY valor",
+            'tipos': "SELECT DISTINCT TaskType as valor FROM BI_Jira_SubTasks_Datas_Grafico WHERE TaskType IS NOT NULL AND TaskType != '' ORDER BY valor",
+            'subtipos': "SELECT DISTINCT TaskSubTipo as valor FROM BI_Jira_SubTasks_Datas_Grafico WHERE TaskSubTipo IS NOT NULL AND TaskSubTipo != '' ORDER BY valor"
+        }
+        
+        result = {}
+        with db_manager.connection(lazy=True) as conn:
+            for name, query in queries.items():
+                df = cached_read_sql(query, conn, ttl=FILTERS_CACHE_TTL)
+                result[name] = df['valor'].tolist() if not df.empty else []
         
         return jsonify(result)
         
     except Exception as e:
-        error_msg = f"Erro na API de subtasks: {str(e)}"
-        log_message(error_msg)
-        return jsonify({'error': error_msg})
+        return jsonify({'error': str(e)})
 
 @app.route('/api/exportar-subtasks')
 def exportar_subtasks():
     try:
-        conn = db_manager.get_connection()
-        query = """
-        SELECT *
-        FROM BI_Jira_SubTasks_Datas_Grafico
-        WHERE TasksDataInicial IS NOT NULL
-        ORDER BY EpicNumber, TasksDataInicial
-        """
-        df = pd.read_sql(query, conn)
-        conn.close()
+        with db_manager.connection(lazy=True) as conn:
+            query = """
+            SELECT *
+            FROM BI_Jira_SubTasks_Datas_Grafico
+            WHERE TasksDataInicial IS NOT NULL
+            ORDER BY EpicNumber, TasksDataInicial
+            """
+            df = pd.read_sql(query, conn)
 
         # Salva em arquivo temporário
         temp_file = tempfile.NamedTemporaryFile(delete=False, suffix=".xlsx")
@@ -1726,13 +1804,11 @@ def cleanup_temp_files():
 def export_subtasks():
     """Exportar subtasks para CSV """
     try:
-        conn = db_manager.get_connection()
-        
         # Obter parâmetros dos filtros (usando o mesmo padrão dos épicos)
         equipe_filter = request.args.get('equipe', '').strip()
         status_filter = request.args.get('status', '').strip()
         tipo_filter = request.args.get('tipo', '').strip()
-        subTipo_filter = request.args.get('subTipo', '').strip()
+        subTipo_filter = (request.args.get('subTipo', '') or request.args.get('SubTipo', '')).strip()
         search_filter = request.args.get('search', '').strip()
         periodo_filter = request.args.get('periodo', 'ano_atual')
         data_inicio_custom = request.args.get('data_inicio', '').strip()
@@ -1741,125 +1817,27 @@ def export_subtasks():
         # Log dos filtros recebidos
         log_message(f"Export SubTasks - Filtros: equipe={equipe_filter}, status={status_filter}, tipo={tipo_filter}, subTipo={subTipo_filter}, search={search_filter}, periodo={periodo_filter}, data_inicio={data_inicio_custom}, data_fim={data_fim_custom}")
         
-        # Query base - iniciar sem filtros
-        query = "SELECT * FROM BI_Jira_SubTasks_Datas_Grafico WHERE 1=1"
-        params = []
-        
-        # Aplicar filtros básicos apenas se fornecidos
-        if equipe_filter:
-            query += " AND ISNULL(TaskEquipe, '') = ?"
-            params.append(equipe_filter)
-            
-        if status_filter:
-            query += " AND ISNULL(TaskStatus, '') = ?"
-            params.append(status_filter)
-            
-        if tipo_filter:
-            query += " AND ISNULL(TaskType, '') = ?"
-            params.append(tipo_filter)
-            
+        # Condições comuns à contagem e à exportação (mesmas da tela)
+        filtros = get_subtasks_filter_args()
+        data_inicio = filtros['data_inicio']
+        data_fim = filtros['data_fim']
+        where_sql, params = build_subtasks_filters(**filtros)
         
-        # Aplicar filtros de data baseado no período (igual aos épicos)
-        today = datetime.now()
-        current_year = today.year
-        
-        # Determinar datas baseadas no período
-        if data_inicio_custom and data_fim_custom:
-            data_inicio = data_inicio_custom
-            data_fim = data_fim_custom
-        elif periodo_filter == 'ano_atual':
-            data_inicio = f"{current_year}-01-01"
-            data_fim = f"{current_year}-12-31"
-        elif periodo_filter == 'q1':
-            data_inicio = f"{current_year}-01-01"
-            data_fim = f"{current_year}-03-31"
-        elif periodo_filter == 'q2':
-            data_inicio = f"{current_year}-04-01"
-            data_fim = f"{current_year}-06-30"
-        elif periodo_filter == 'q3':
-            data_inicio = f"{current_year}-07-01"
-            data_fim = f"{current_year}-09-30"
-        elif periodo_filter == 'q4':
-            data_inicio = f"{current_year}-10-01"
-            data_fim = f"{current_year}-12-31"
-        elif periodo_filter == '6_meses':
-            data_inicio = (today - timedelta(days=180)).strftime('%Y-%m-%d')
-            data_fim = today.strftime('%Y-%m-%d')
-        elif periodo_filter == '3_meses':
-            data_inicio = (today - timedelta(days=90)).strftime('%Y-%m-%d')
-            data_fim = today.strftime('%Y-%m-%d')
-        elif periodo_filter == 'mes_atual':
-            data_inicio = f"{current_year}-{today.month:02d}-01"
-            data_fim = today.strftime('%Y-%m-%d')
-        elif periodo_filter == 'personalizado':
-            # Para personalizado sem datas específicas, não aplicar filtro de data
-            data_inicio = None
-            data_fim = None
-        else:
-            data_inicio = None
-            data_fim = None
-        
-        # Aplicar filtro de data se tiver
-        if data_inicio and data_fim:
-            query += """ AND (
-                (TaskFimPlanejado >= ? AND TaskFimPlanejado <= ?) OR
-                (TaskInicioPlanejado >= ? AND TaskInicioPlanejado <= ?) OR
-                (TaskInicioPlanejado < ? AND TaskFimPlanejado > ?)
-            )"""
-            params.extend([data_inicio, data_fim, data_inicio, data_fim, data_inicio, data_fim])
-        elif data_inicio:
-            query += " AND TaskInicioPlanejado >= ?"
-            params.append(data_inicio)
-        elif data_fim:
-            query += " AND TaskFimPlanejado <= ?"
-            params.append(data_fim)
-        
-        query += " ORDER BY TaskEquipe, TaskNumberId"
+        query = "SELECT *" + where_sql + " ORDER BY TaskEquipe, TaskNumberId"
         
         log_message(f"Export SubTasks Query: {query}")
         log_message(f"Export SubTasks Params: {params}")
         
-        # Executar query
-        df = pd.read_sql(query, conn, params=params)
-        log_message(f"SubTasks Export - Registros retornados antes do filtro de busca: {len(df)}")
-        
-        conn.close()
-        
-        # Aplicar filtro de busca (texto) no DataFrame - igual ao frontend
-        if search_filter:
-            search_lower = search_filter.lower()
-            mask = (
-                df['TaskNumberId'].fillna('').astype(str).str.lower().str.contains(search_lower, na=False) |
-                df['TaskSummary'].fillna('').astype(str).str.lower().str.contains(search_lower, na=False)
-            )
-            df = df[mask]
-            log_message(f"SubTasks Export - Registros após filtro de busca '{search_filter}': {len(df)}")
+        total_registros = count_rows("SELECT COUNT(*)" + where_sql, params)
+        log_message(f"SubTasks Export - Registros a exportar: {total_registros}")
         
         # Verificar se há dados para exportar
-        if df.empty:
+        if total_registros == 0:
             log_message("Nenhum dado encontrado para exportar SubTasks com os filtros aplicados")
             return jsonify({
                 'error': 'Nenhum dado encontrado para exportar com os filtros aplicados'
             }), 404
         
-        # Formatar datas para melhor visualização no CSV
-        date_columns = [col for col in df.columns if 'date' in col.lower() or 'inicio' in col.lower() or 'fim' in col.lower() or 'created' in col.lower() or 'updated' in col.lower()]
-        for col in date_columns:
-            if col in df.columns:
-                try:
-                    df[col] = pd.to_datetime(df[col], errors='coerce').dt.strftime('%d/%m/%Y %H:%M')
-                except:
-                    pass
-        
-        # Preencher valores nulos
-        df = df.fillna('')
-        
-        # Criar arquivo temporário
-        temp_file = tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False)
-        
-        # Salvar com encoding UTF-8 com BOM para Excel
-        df.to_csv(temp_file.name, index=False, encoding='utf-8-sig', sep=';')
-        
         # Construir nome do arquivo com informações sobre os filtros
         filename_parts = ['relatorio_subtasks']
         
@@ -1896,21 +1874,23 @@ def export_subtasks():
         
         # Adicionar timestamp e total de registros
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename_parts.append(f"{len(df)}registros")
+        filename_parts.append(f"{total_registros}registros")
         filename_parts.append(timestamp)
         
         filename = '_'.join(filename_parts) + '.csv'
         
         # Limitar tamanho do nome do arquivo
         if len(filename) > 200:
-            filename = f"relatorio_subtasks_{len(df)}registros_{timestamp}.csv"
+            filename = f"relatorio_subtasks_{total_registros}registros_{timestamp}.csv"
         
-        log_message(f"Exportando SubTasks - {len(df)} registros para arquivo: {filename}")
+        log_message(f"Exportando SubTasks - {total_registros} registros para arquivo: {filename}")
         
-        return send_file(temp_file.name, 
-                        as_attachment=True, 
-                        download_name=filename,
-                        mimetype='text/csv')
+        # Datas formatadas para melhor visualização no CSV
+        def is_date_column(col):
+            col = col.lower()
+            return 'date' in col or 'inicio' in col or 'fim' in col or 'created' in col or 'updated' in col
+        
+        return stream_csv_response(query, params, filename, date_columns=is_date_column)
         
     except Exception as e:
         error_msg = f"Erro na exportação de subtasks: {str(e)}"
@@ -1927,13 +1907,15 @@ def relatorio_mans_page():
 @app.route('/api/mans-data')
 def mans_data():
     try:
-        conn = db_manager.get_connection()
-        query = """
-        SELECT * FROM BI_Jira_US 
-        WHERE Project = 'MAN' 
-        """
-        df = pd.read_sql(query, conn)
-        conn.close()
+        with db_manager.connection(lazy=True) as conn:
+            if mans_store.ready:
+                df = mans_store.frame()
+            else:
+                query = """
+                SELECT * FROM BI_Jira_US 
+                WHERE Project = 'MAN' 
+                """
+                df = cached_read_sql(query, conn)
 
         def limpar_dados(obj):
             """Converte valores problemáticos como NaT e numpy types"""
@@ -1959,112 +1941,112 @@ def mans_data():
 def mans_data_api():
     """API principal para dados de MANs """
     try:
-        conn = db_manager.get_connection()
+        with db_manager.connection(lazy=True) as conn:
         
-        # Obter parâmetros dos filtros
-        equipe_filter = request.args.get('equipe', '').strip()
-        status_filter = request.args.get('status', '').strip()
-        produto_filter = request.args.get('produto', '').strip()
-        busca_filter = request.args.get('busca', '').strip()
-        search_filter = request.args.get('search', '').strip()
-        ano_filter = request.args.get('ano', '').strip()
-        periodo_filter = request.args.get('periodo', 'ano_atual')
-        data_inicio_custom = request.args.get('data_inicio', '').strip()
-        data_fim_custom = request.args.get('data_fim', '').strip()
+            # Obter parâmetros dos filtros
+            equipe_filter = request.args.get('equipe', '').strip()
+            status_filter = request.args.get('status', '').strip()
+            produto_filter = request.args.get('produto', '').strip()
+            busca_filter = request.args.get('busca', '').strip()
+            search_filter = request.args.get('search', '').strip()
+            ano_filter = request.args.get('ano', '').strip()
+            periodo_filter = request.args.get('periodo', 'ano_atual')
+            data_inicio_custom = request.args.get('data_inicio', '').strip()
+            data_fim_custom = request.args.get('data_fim', '').strip()
         
-        # Usar busca ou search (compatibilidade)
-        search_text = busca_filter or search_filter
+            # Usar busca ou search (compatibilidade)
+            search_text = busca_filter or search_filter
         
-        log_message(f"MANs Data API - Filtros: equipe={equipe_filter}, status={status_filter}, produto={produto_filter}, busca={search_text}, periodo={periodo_filter}")
+            log_message(f"MANs Data API - Filtros: equipe={equipe_filter}, status={status_filter}, produto={produto_filter}, busca={search_text}, periodo={periodo_filter}")
         
-        # Calcular datas baseadas no período
-        today = datetime.now()
-        current_year = today.year
-        
-        if data_inicio_custom and data_fim_custom:
-            data_inicio = data_inicio_custom
-            data_fim = data_fim_custom
-        elif periodo_filter == 'ano_atual':
-            data_inicio = f"{current_year}-01-01"
-            data_fim = f"{current_year}-12-31"
-        elif periodo_filter == 'q1':
-            data_inicio = f"{current_year}-01-01"
-            data_fim = f"{current_year}-03-31"
-        elif periodo_filter == 'q2':
-            data_inicio = f"{current_year}-04-01"
-            data_fim = f"{current_year}-06-30"
-        elif periodo_filter == 'q3':
-            data_inicio = f"{current_year}-07-01"
-            data_fim = f"{current_year}-09-30"
-        elif periodo_filter == 'q4':
-            data_inicio = f"{current_year}-10-01"
-            data_fim = f"{current_year}-12-31"
-        elif periodo_filter == '6_meses':
-            data_inicio = (today - timedelta(days=180)).strftime('%Y-%m-%d')
-            data_fim = today.strftime('%Y-%m-%d')
-        elif periodo_filter == '3_meses':
-            data_inicio = (today - timedelta(days=90)).strftime('%Y-%m-%d')
-            data_fim = today.strftime('%Y-%m-%d')
-        elif periodo_filter == 'mes_atual':
-            data_inicio = f"{current_year}-{today.month:02d}-01"
-            data_fim = today.strftime('%Y-%m-%d')
-        else:
-            data_inicio = None
-            data_fim = None
+            # Calcular datas baseadas no período
+            today = datetime.now()
+            current_year = today.year
         
-        # Query base para dados de MANs
-        query = """
-        SELECT 
-            ID,
-            ISSUE_ID,
-            Number,
-            Project,
-            ProjectKey,
-            IssueType,
-            Summary,
-            Produto,
-            ParentEpicID,
-            ParentEpicNumber,
-            Equipe,
-            Assignee,
-            Status,
-            Created,
-            Updated,
-            ResolutionDate,
-            OrigemAbertura,
-            ServicePackLiberacao,
-            PatchLiberacao,
-            QtdeVinculos
-        FROM BI_Jira_US 
-        WHERE Project = 'MAN'
-        """
+            if data_inicio_custom and data_fim_custom:
+                data_inicio = data_inicio_custom
+                data_fim = data_fim_custom
+            elif periodo_filter == 'ano_atual':
+                data_inicio = f"{current_year}-01-01"
+                data_fim = f"{current_year}-12-31"
+            elif periodo_filter == 'q1':
+                data_inicio = f"{current_year}-01-01"
+                data_fim = f"{current_year}-03-31"
+            elif periodo_filter == 'q2':
+                data_inicio = f"{current_year}-04-01"
+                data_fim = f"{current_year}-06-30"
+            elif periodo_filter == 'q3':
+                data_inicio = f"{current_year}-07-01"
+                data_fim = f"{current_year}-09-30"
+            elif periodo_filter == 'q4':
+                data_inicio = f"{current_year}-10-01"
+                data_fim = f"{current_year}-12-31"
+            elif periodo_filter == '6_meses':
+                data_inicio = (today - timedelta(days=180)).strftime('%Y-%m-%d')
+                data_fim = today.strftime('%Y-%m-%d')
+            elif periodo_filter == '3_meses':
+                data_inicio = (today - timedelta(days=90)).strftime('%Y-%m-%d')
+                data_fim = today.strftime('%Y-%m-%d')
+            elif periodo_filter == 'mes_atual':
+                data_inicio = f"{current_year}-{today.month:02d}-01"
+                data_fim = today.strftime('%Y-%m-%d')
+            else:
+                data_inicio = None
+                data_fim = None
         
-        params = []
+            # Query base para dados de MANs
+            query = """
+            SELECT 
+                ID,
+                ISSUE_ID,
+                Number,
+                Project,
+                ProjectKey,
+                IssueType,
+                Summary,
+                Produto,
+                ParentEpicID,
+                ParentEpicNumber,
+                Equipe,
+                Assignee,
+                Status,
+                Created,
+                Updated,
+                ResolutionDate,
+                OrigemAbertura,
+                ServicePackLiberacao,
+                PatchLiberacao,
+                QtdeVinculos
+            FROM BI_Jira_US 
+            WHERE Project = 'MAN'
+            """
         
-        # Aplicar filtro de data se tiver (para reduzir volume de dados)
-        if data_inicio and data_fim:
-            query += " AND Created BETWEEN ? AND ?"
-            params.extend([data_inicio, data_fim])
-            log_message(f"MANs API - Aplicando filtro de período: {data_inicio} até {data_fim}")
-        elif data_inicio:
-            query += " AND Created >= ?"
-            params.append(data_inicio)
-        elif data_fim:
-            query += " AND Created <= ?"
-            params.append(data_fim)
+            params = []
         
-        query += " ORDER BY Created DESC"
+            # Aplicar filtro de data se tiver (para reduzir volume de dados)
+            if data_inicio and data_fim:
+                query += " AND Created BETWEEN ? AND ?"
+                params.extend([data_inicio, data_fim])
+                log_message(f"MANs API - Aplicando filtro de período: {data_inicio} até {data_fim}")
+            elif data_inicio:
+                query += " AND Created >= ?"
+                params.append(data_inicio)
+            elif data_fim:
+                query += " AND Created <= ?"
+                params.append(data_fim)
         
-        log_message(f"MANs Query: {query}")
-        log_message(f"MANs Params: {params}")
+            query += " ORDER BY Created DESC"
         
-        # Executar query com filtros de período aplicados
-        df = pd.read_sql(query, conn, params=params)
+            log_message(f"MANs Query: {query}")
+            log_message(f"MANs Params: {params}")
         
-        # Buscar dados para gráficos
-        grafico_data = get_mans_chart_data(conn, equipe_filter, periodo_filter, data_inicio, data_fim)
+            # Executar query com filtros de período aplicados
+            df = cached_read_sql(query, conn, params=params)
+        
+            # Buscar dados para gráficos
+            grafico_data = get_mans_chart_data(conn, equipe_filter, periodo_filter, data_inicio, data_fim,
+                                               parse_granularidade(request.args.get('granularidade')))
         
-        conn.close()
         
         log_message(f"MANs - Registros retornados do banco após filtro de período: {len(df)}")
         
@@ -2215,90 +2197,85 @@ def get_mans_chart_data(conn, equipe_filter=None, periodo_filter='ano_atual', da
 @app.route('/api/mans-report-table-data')
 def mans_report_table_data_api():
     try:
-        conn = db_manager.get_connection()
-        
-        # Obter parâmetros dos filtros
-        equipe_filter = request.args.get('equipe', '').strip()
-        status_filter = request.args.get('status', '').strip()
-        produto_filter = request.args.get('produto', '').strip()
-        busca_filter = request.args.get('busca', '').strip()
-        search_filter = request.args.get('search', '').strip()
-        periodo_filter = request.args.get('periodo', 'ano_atual')
-        data_inicio = request.args.get('data_inicio', '').strip()
-        data_fim = request.args.get('data_fim', '').strip()
-        
-        # Usar busca ou search (compatibilidade)
-        search_text = busca_filter or search_filter
+        with db_manager.connection(lazy=True) as conn:
         
-        log_message(f"MANs Table API - Filtros recebidos: equipe={equipe_filter}, status={status_filter}, produto={produto_filter}, busca={search_text}, periodo={periodo_filter}, data_inicio={data_inicio}, data_fim={data_fim}")
+            # Obter parâmetros dos filtros
+            equipe_filter = request.args.get('equipe', '').strip()
+            status_filter = request.args.get('status', '').strip()
+            produto_filter = request.args.get('produto', '').strip()
+            busca_filter = request.args.get('busca', '').strip()
+            search_filter = request.args.get('search', '').strip()
+            periodo_filter = request.args.get('periodo', 'ano_atual')
+            data_inicio = request.args.get('data_inicio', '').strip()
+            data_fim = request.args.get('data_fim', '').strip()
         
-        # Calcular datas baseadas no período se não fornecidas
-        if not data_inicio or not data_fim:
-            data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter)
+            # Usar busca ou search (compatibilidade)
+            search_text = busca_filter or search_filter
         
-        log_message(f"MANs Table API - Datas calculadas: inicio={data_inicio}, fim={data_fim}")
+            log_message(f"MANs Table API - Filtros recebidos: equipe={equipe_filter}, status={status_filter}, produto={produto_filter}, busca={search_text}, periodo={periodo_filter}, data_inicio={data_inicio}, data_fim={data_fim}")
         
-        # Query base com filtros aplicados no SQL
-        query = """
-        SELECT 
-            ID,
-            ISSUE_ID,
-            Number,
-            Project,
-            ProjectKey,
-            IssueType,
-            Summary,
-            Produto,
-            ParentEpicID,
-            ParentEpicNumber,
-            Equipe,
-            Assignee,
-            Status,
-            Created,
-            Updated,
-            ResolutionDate,
-            OrigemAbertura,
-            ServicePackLiberacao,
-            PatchLiberacao,
-            QtdeVinculos
-        FROM BI_Jira_US 
-        WHERE Project = 'MAN'
-        """
+            # Calcular datas baseadas no período se não fornecidas
+            if not data_inicio or not data_fim:
+                data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter)
         
-        params = []
-        
-        # Aplicar filtro de período se tiver
-        if data_inicio and data_fim:
-            query += " AND Created >= ? AND Created <= ?"
-            # Adicionar tempo para incluir o dia completo
-            data_fim_completo = data_fim + " 23:59:59"
-            params.extend([data_inicio, data_fim_completo])
-            log_message(f"MANs Table API - Filtro de período aplicado: {data_inicio} até {data_fim_completo}")
+            log_message(f"MANs Table API - Datas calculadas: inicio={data_inicio}, fim={data_fim}")
         
-        # Aplicar outros filtros se fornecidos
-        if equipe_filter:
-            query += " AND ISNULL(Equipe, '') = ?"
-            params.append(equipe_filter)
-            
-        if status_filter:
-            query += " AND ISNULL(Status, '') = ?"
-            params.append(status_filter)
-            
-        if produto_filter:
-            query += " AND ISNULL(Produto, '') = ?"
-            params.append(produto_filter)
-        
-        query += " ORDER BY Created DESC"
-        
-        log_message(f"MANs Table Query: {query}")
-        log_message(f"MANs Table Params: {params}")
+            # Query base com filtros aplicados no SQL
+            query = """
+            SELECT 
+                ID,
+                ISSUE_ID,
+                Number,
+                Project,
+                ProjectKey,
+                IssueType,
+                Summary,
+                Produto,
+                ParentEpicID,
+                ParentEpicNumber,
+                Equipe,
+                Assignee,
+                Status,
+                Created,
+                Updated,
+                ResolutionDate,
+                OrigemAbertura,
+                ServicePackLiberacao,
+                PatchLiberacao,
+                QtdeVinculos
+            FROM BI_Jira_US 
+            WHERE Project = 'MAN'
+            """
         
-        # Executar query COM filtros aplicados
-        df = pd.read_sql(query, conn, params=params)
-        log_message(f"MANs Table - {len(df)} registros carregados do banco (COM filtros)")
+            params = []
         
-        # Obter estatísticas baseadas nos dados filtrados
-        stats = get_mans_dashboard_stats(conn, equipe_filter, status_filter, produto_filter, 
+            # Aplicar filtro de período se tiver
+            if data_inicio and data_fim:
+                query += " AND Created >= ? AND Created <= ?"
+                # Adicionar tempo para incluir o dia completo
+                data_fim_completo = data_fim + " 23:59:59"
+                params.extend([data_inicio, data_fim_completo])
+                log_message(f"MANs Table API - Filtro de período aplicado: {data_inicio} até {data_fim_completo}")
+        
+            # Aplicar outros filtros se fornecidos
+            filters = SqlFilters()
+            filters.equals('Equipe', equipe_filter, null_label=SEM_EQUIPE)
+            filters.equals('Status', status_filter, null_label=STATUS_INDEFINIDO)
+            filters.equals('Produto', produto_filter, null_label=SEM_PRODUTO)
+            query += filters.and_sql()
+            params.extend(filters.params)
+        
+            query += " ORDER BY Created DESC"
+        
+            log_message(f"MANs Table Query: {query}")
+            log_message(f"MANs Table Params: {params}")
+        
+            # Executar query COM filtros aplicados
+            df = cached_read_sql(query, conn, params=params)
+            log_message(f"MANs Table - {len(df)} registros carregados do banco (COM filtros)")
+        
+        # Obter estatísticas baseadas nos dados filtrados (consultas em paralelo, fora da conexão acima)
+        stats = get_mans_dashboard_stats(equipe_filter, status_filter, produto_filter, 
                                        periodo_filter, data_inicio, data_fim)
         
         # Converter datas para string
@@ -2310,8 +2287,6 @@ def mans_report_table_data_api():
         # Converter para formato JSON
         mans_data = convert_numpy_types(df.fillna('').to_dict('records'))
         
-        conn.close()
-        
         log_message(f"MANs Table - Retornando {len(mans_data)} registros")
         
         return jsonify({
@@ -2338,120 +2313,173 @@ def mans_report_table_data_api():
 # APIS PARA O DASHBOARD DE MANS
 # ===============================
 
+def build_mans_filters(equipe_filter='', status_filter='', produto_filter='', search_filter='',
+                       data_inicio=None, data_fim=None):
+    """FROM/WHERE das MANs com os filtros da tela (tabela, contagem, estatísticas e exportação)
+    
+    Retorna (where_sql, params). data_fim inclui o dia inteiro.
+    """
+    filters = SqlFilters(["Project = 'MAN'"])
+    filters.equals('Equipe', equipe_filter, null_label=SEM_EQUIPE)
+    filters.equals('Status', status_filter, null_label=STATUS_INDEFINIDO)
+    filters.equals('Produto', produto_filter, null_label=SEM_PRODUTO)
+    
+    if data_inicio and data_fim:
+        filters.add("Created >= ? AND Created <= ?", data_inicio, data_fim + " 23:59:59")
+    
+    # Mesmo critério da busca da tela: número, chave do projeto ou resumo
+    filters.search(['Number', 'ProjectKey', 'Summary'], search_filter)
+    
+    where_sql = f"""
+        FROM BI_Jira_US 
+        WHERE {filters.sql()}
+        """
+    return where_sql, filters.params
+
+# Colunas da tabela de MANs (também usadas no modal de detalhes)
+MANS_TABLE_COLUMNS = [
+    'ID',
+    'ISSUE_ID',
+    'Number',
+    'Project',
+    'ProjectKey',
+    'IssueType',
+    'Summary',
+    'Produto',
+    'ParentEpicNumber',
+    'Equipe',
+    'Assignee',
+    'Status',
+    'Created',
+    'Updated',
+    'ResolutionDate',
+    'OrigemAbertura',
+    'ServicePackLiberacao',
+    'PatchLiberacao',
+    'QtdeVinculos'
+]
+
+# Colunas aceitas em sort; ID desempata a ordenação da paginação por chave
+MANS_SORT_COLUMNS = ['Created', 'Updated', 'ResolutionDate', 'Number', 'Equipe', 'Status', 'Produto', 'Assignee']
+
+def get_mans_page_order():
+    """Ordenação da requisição (sort/order) validada contra MANS_SORT_COLUMNS"""
+    sort_column = request.args.get('sort', 'Created').strip()
+    if sort_column not in MANS_SORT_COLUMNS:
+        sort_column = 'Created'
+    direction = 'ASC' if request.args.get('order', 'desc').strip().lower() == 'asc' else 'DESC'
+    return [(sort_column, direction), ('ID', direction)]
+
+def get_mans_table_stats(where_sql, params, conn):
+    """Indicadores da tabela calculados sobre o mesmo conjunto filtrado"""
+    stats_query = """
+    SELECT 
+        COUNT(*) as total_mans,
+        SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) as mans_fechadas,
+        COUNT(*) - SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) as mans_abertas,
+        COUNT(DISTINCT ISNULL(Equipe, 'Sem Equipe')) as total_equipes,
+        AVG(CASE 
+            WHEN ResolutionDate IS NOT NULL AND Created IS NOT NULL 
+            THEN DATEDIFF(day, Created, ResolutionDate)
+            ELSE NULL 
+        END) as tempo_medio_resolucao
+    """ + where_sql
+    
+    df_stats = cached_read_sql(stats_query, conn, params=params)
+    stats = convert_numpy_types(df_stats.iloc[0].to_dict()) if not df_stats.empty else {}
+    
+    total_mans = stats.get('total_mans') or 0
+    mans_fechadas = stats.get('mans_fechadas') or 0
+    stats['total_mans'] = total_mans
+    stats['mans_fechadas'] = mans_fechadas
+    stats['mans_abertas'] = stats.get('mans_abertas') or 0
+    
+    # Calcular métricas adicionais
+    stats['mans_criticas'] = max(0, round(total_mans * 0.15))  # 15% simulação
+    stats['sla_atrasado'] = max(0, round((total_mans - mans_fechadas) * 0.25))  # 25% simulação
+    stats['backlog_total'] = total_mans - mans_fechadas
+    stats['taxa_resolucao'] = round((mans_fechadas / total_mans * 100), 1) if total_mans > 0 else 0
+    return stats
+
 @app.route('/api/mans-table-data')
 def mans_table_data_api():
+    """API paginada da tabela de MANs com filtros e ordenação aplicados no banco
+    
+    Parâmetros: equipe, status, produto, busca/search, periodo, data_inicio, data_fim,
+    sort, order (asc|desc), page_size e cursor (next_cursor da página anterior).
+    """
     try:
-        conn = db_manager.get_connection()
-        
         # Obter parâmetros dos filtros
         equipe_filter = request.args.get('equipe', '').strip()
         status_filter = request.args.get('status', '').strip()
         produto_filter = request.args.get('produto', '').strip()
         busca_filter = request.args.get('busca', '').strip()
         search_filter = request.args.get('search', '').strip()
-        periodo_filter = request.args.get('periodo', 'ano_atual')
-        data_inicio = request.args.get('data_inicio', '').strip()
-        data_fim = request.args.get('data_fim', '').strip()
+        periodo_filter = request.args.get('periodo', 'ano_atual')
+        data_inicio_custom = request.args.get('data_inicio', '').strip()
+        data_fim_custom = request.args.get('data_fim', '').strip()
+        page_size = get_page_size()
+        page_order = get_mans_page_order()
+        last_values = decode_page_cursor(request.args.get('cursor', ''))
         
         # Usar busca ou search (compatibilidade)
         search_text = busca_filter or search_filter
         
-        
         log_message(f"MANs Table API - Filtros: equipe={equipe_filter}, status={status_filter}, produto={produto_filter}, busca={search_text}, periodo={periodo_filter}")
         
-        # Calcular datas baseadas no período se não fornecidas
-        if not data_inicio or not data_fim:
-            data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter)
-        
-        # Query para carregar TODOS os dados (otimização)
-        # Vamos carregar todos os dados e filtrar no frontend para melhor performance
-        query = """
-        SELECT 
-            ID,
-            ISSUE_ID,
-            Number,
-            Project,
-            ProjectKey,
-            IssueType,
-            Summary,
-            Produto,
-            ParentEpicID,
-            ParentEpicNumber,
-            Equipe,
-            Assignee,
-            Status,
-            Created,
-            Updated,
-            ResolutionDate,
-            OrigemAbertura,
-            ServicePackLiberacao,
-            PatchLiberacao,
-            QtdeVinculos
-        FROM BI_Jira_US 
-        WHERE Project = 'MAN'
-        ORDER BY Created DESC
-        """
+        data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter, data_inicio_custom, data_fim_custom)
         
-        # Executar query SEM filtros para carregar todos os dados
-        df = pd.read_sql(query, conn)
-        log_message(f"MANs Table - {len(df)} registros carregados do banco")
+        where_sql, params = build_mans_filters(
+            equipe_filter, status_filter, produto_filter, search_text, data_inicio, data_fim
+        )
         
-        # Obter estatísticas baseadas nos dados filtrados por período
-        stats_query = """
-        SELECT 
-            COUNT(*) as total_mans,
-            SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) as mans_fechadas,
-            COUNT(*) - SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) as mans_abertas,
-            COUNT(DISTINCT ISNULL(Equipe, 'Sem Equipe')) as total_equipes,
-            AVG(CASE 
-                WHEN ResolutionDate IS NOT NULL AND Created IS NOT NULL 
-                THEN DATEDIFF(day, Created, ResolutionDate)
-                ELSE NULL 
-            END) as tempo_medio_resolucao
-        FROM BI_Jira_US
-        WHERE Project = 'MAN'
-        """
+        page_sql = where_sql
+        page_params = list(params)
+        if last_values and len(last_values) == len(page_order):
+            condition, condition_params = keyset_condition(page_order, last_values)
+            page_sql += f" AND {condition}"
+            page_params.extend(condition_params)
         
-        params = []
-        if data_inicio and data_fim:
-            stats_query += " AND Created BETWEEN ? AND ?"
-            params.extend([data_inicio, data_fim])
+        order_sql = ', '.join(f"{col} {direction}" for col, direction in page_order)
+        # Uma linha a mais indica se existe próxima página
+        page_query = f"SELECT TOP {page_size + 1} {', '.join(MANS_TABLE_COLUMNS)}{page_sql} ORDER BY {order_sql}"
         
-        df_stats = pd.read_sql(stats_query, conn, params=params)
-        stats = convert_numpy_types(df_stats.iloc[0].to_dict()) if not df_stats.empty else {}
+        with db_manager.connection(lazy=True) as conn:
+            df = cached_fetch_columns(page_query, conn, 'BI_Jira_US', params=page_params)
+            stats = get_mans_table_stats(where_sql, params, conn)
         
-        # Adicionar estatísticas calculadas
-        total_mans = stats.get('total_mans', 0)
-        mans_fechadas = stats.get('mans_fechadas', 0)
+        has_more = len(df) > page_size
+        df = df.iloc[:page_size]
         
-        # Calcular métricas adicionais
-        stats['mans_criticas'] = max(0, round(total_mans * 0.15))  # 15% simulação
-        stats['sla_atrasado'] = max(0, round((total_mans - mans_fechadas) * 0.25))  # 25% simulação
-        stats['backlog_total'] = total_mans - mans_fechadas
-        stats['taxa_resolucao'] = round((mans_fechadas / total_mans * 100), 1) if total_mans > 0 else 0
+        next_cursor = None
+        if has_more and not df.empty:
+            next_cursor = encode_page_cursor(page_cursor_values(df.iloc[-1], page_order))
         
         # Converter datas para string
-        date_columns = ['Created', 'Updated', 'ResolutionDate']
-        for col in date_columns:
-            if col in df.columns and not df[col].empty:
+        for col in ['Created', 'Updated', 'ResolutionDate']:
+            if col in df.columns:
                 df[col] = pd.to_datetime(df[col], errors='coerce').dt.strftime('%Y-%m-%d %H:%M:%S')
         
-        # Converter para formato JSON
-        mans_data = convert_numpy_types(df.fillna('').to_dict('records'))
-        
-        conn.close()
-        
-        log_message(f"MANs Table - Retornando {len(mans_data)} registros")
+        mans_data = typed_frame_records(df)
+        log_message(f"MANs Table - Retornando {len(mans_data)} de {stats['total_mans']} registros")
         
         return jsonify({
             'mans': mans_data,
+            'total': stats['total_mans'],
+            'page_size': page_size,
+            'has_more': has_more,
+            'next_cursor': next_cursor,
+            'sort': page_order[0][0],
+            'order': page_order[0][1].lower(),
             'stats': stats,
             'filtros_aplicados': {
                 'equipe': equipe_filter,
                 'status': status_filter,
                 'produto': produto_filter,
                 'busca': search_text,
-                'periodo': periodo_filter
+                'periodo': periodo_filter,
+                'data_inicio': data_inicio,
+                'data_fim': data_fim
             }
         })
         
@@ -2460,7 +2488,6 @@ def mans_table_data_api():
         log_message(error_msg)
         return jsonify({'error': error_msg})
 
-
 @app.route('/dashboard-mans')
 def dashboard_mans():
     """Página do dashboard de MANs"""
@@ -2501,7 +2528,7 @@ def calculate_period_dates_for_mans(periodo_filter, data_inicio_custom=None, dat
     else:
         return None, None
 
-def get_mans_dashboard_stats(conn, equipe_filter=None, status_filter=None, produto_filter=None, 
+def get_mans_dashboard_stats(equipe_filter=None, status_filter=None, produto_filter=None, 
                            periodo_filter='ano_atual', data_inicio=None, data_fim=None):
     """Função para obter estatísticas completas do dashboard de MANs"""
     try:
@@ -2512,26 +2539,16 @@ def get_mans_dashboard_stats(conn, equipe_filter=None, status_filter=None, produ
             data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter)
         
         # Query base com filtros
-        where_conditions = ["Project = 'MAN'"]
-        params = []
-        
-        if equipe_filter:
-            where_conditions.append("ISNULL(Equipe, '') = ?")
-            params.append(equipe_filter)
-        
-        if status_filter:
-            where_conditions.append("ISNULL(Status, '') = ?")
-            params.append(status_filter)
-        
-        if produto_filter:
-            where_conditions.append("ISNULL(Produto, '') = ?")
-            params.append(produto_filter)
+        filters = SqlFilters(["Project = 'MAN'"])
+        filters.equals('Equipe', equipe_filter, null_label=SEM_EQUIPE)
+        filters.equals('Status', status_filter, null_label=STATUS_INDEFINIDO)
+        filters.equals('Produto', produto_filter, null_label=SEM_PRODUTO)
         
         if data_inicio and data_fim:
-            where_conditions.append("Created BETWEEN ? AND ?")
-            params.extend([data_inicio, data_fim])
+            filters.between('Created', data_inicio, data_fim)
         
-        where_clause = " AND ".join(where_conditions)
+        where_clause = filters.sql()
+        params = filters.params
         
         # 1. Estatísticas básicas
         query_stats = f"""
@@ -2549,9 +2566,6 @@ def get_mans_dashboard_stats(conn, equipe_filter=None, status_filter=None, produ
         WHERE {where_clause}
         """
         
-        df_stats = pd.read_sql(query_stats, conn, params=params)
-        stats = convert_numpy_types(df_stats.iloc[0].to_dict()) if not df_stats.empty else {}
-        
         # 2. MANs críticas (simulação - você pode ajustar conforme sua regra)
         query_criticas = f"""
         SELECT COUNT(*) as mans_criticas
@@ -2565,12 +2579,6 @@ def get_mans_dashboard_stats(conn, equipe_filter=None, status_filter=None, produ
         )
         """
         
-        df_criticas = pd.read_sql(query_criticas, conn, params=params)
-        if not df_criticas.empty:
-            stats['mans_criticas'] = convert_numpy_types(df_criticas.iloc[0]['mans_criticas'])
-        else:
-            stats['mans_criticas'] = 0
-        
         # 3. SLA Atrasado (MANs abertas há mais de X dias)
         query_sla = f"""
         SELECT COUNT(*) as sla_atrasado
@@ -2580,12 +2588,6 @@ def get_mans_dashboard_stats(conn, equipe_filter=None, status_filter=None, produ
         AND DATEDIFF(day, Created, GETDATE()) > 15
         """
         
-        df_sla = pd.read_sql(query_sla, conn, params=params)
-        if not df_sla.empty:
-            stats['sla_atrasado'] = convert_numpy_types(df_sla.iloc[0]['sla_atrasado'])
-        else:
-            stats['sla_atrasado'] = 0
-        
         # 4. Backlog total (todas as MANs abertas, independente do período)
         query_backlog = """
         SELECT COUNT(*) as backlog_total
@@ -2595,11 +2597,34 @@ def get_mans_dashboard_stats(conn, equipe_filter=None, status_filter=None, produ
         """
         
         backlog_params = []
-        if equipe_filter:
-            query_backlog += " AND ISNULL(Equipe, '') = ?"
-            backlog_params.append(equipe_filter)
+        filters = SqlFilters().equals('Equipe', equipe_filter, null_label=SEM_EQUIPE)
+        query_backlog += filters.and_sql()
+        backlog_params.extend(filters.params)
+        
+        # Consultas independentes: executadas em paralelo
+        results = read_sql_group({
+            'stats': (query_stats, params),
+            'criticas': (query_criticas, params),
+            'sla': (query_sla, params),
+            'backlog': (query_backlog, backlog_params)
+        })
+        
+        df_stats = results['stats']
+        stats = convert_numpy_types(df_stats.iloc[0].to_dict()) if not df_stats.empty else {}
+        
+        df_criticas = results['criticas']
+        if not df_criticas.empty:
+            stats['mans_criticas'] = convert_numpy_types(df_criticas.iloc[0]['mans_criticas'])
+        else:
+            stats['mans_criticas'] = 0
+        
+        df_sla = results['sla']
+        if not df_sla.empty:
+            stats['sla_atrasado'] = convert_numpy_types(df_sla.iloc[0]['sla_atrasado'])
+        else:
+            stats['sla_atrasado'] = 0
         
-        df_backlog = pd.read_sql(query_backlog, conn, params=backlog_params)
+        df_backlog = results['backlog']
         if not df_backlog.empty:
             stats['backlog_total'] = convert_numpy_types(df_backlog.iloc[0]['backlog_total'])
         else:
@@ -2672,7 +2697,8 @@ def calculate_period_dates_for_mans(periodo_filter, data_inicio_custom=None, dat
         return None, None
 
 # Função para dados dos gráficos de MANs
-def get_mans_chart_data(conn, equipe_filter=None, periodo_filter='ano_atual', data_inicio=None, data_fim=None):
+def get_mans_chart_data(conn, equipe_filter=None, periodo_filter='ano_atual', data_inicio=None, data_fim=None,
+                        granularidade=GRANULARIDADE_PADRAO):
     """Função ATUALIZADA para obter dados dos gráficos de MANs com dados detalhados"""
     try:
         log_message("Obtendo dados dos gráficos de MANs...")
@@ -2688,6 +2714,20 @@ def get_mans_chart_data(conn, equipe_filter=None, periodo_filter='ano_atual', da
         
         log_message(f"Período para gráficos: {data_inicio} até {data_fim}")
         
+        if mans_store.ready:
+            df_mans = mans_store.select(data_inicio, data_fim, equipe_filter)
+            equipe_mes_data = convert_numpy_types(compute_mans_equipe_mes(df_mans, granularidade))
+            return {
+                'backlog': compute_mans_backlog(df_mans),
+                'tendencia': compute_mans_tendencia(df_mans, granularidade, data_inicio, data_fim),
+                'equipe_mes_detalhado': equipe_mes_data,
+                'periodo_aplicado': {
+                    'inicio': data_inicio,
+                    'fim': data_fim,
+                    'periodo': periodo_filter
+                }
+            }
+        
         # 1. Gráfico de backlog por equipe
         query_backlog = """
         SELECT 
@@ -2702,24 +2742,25 @@ def get_mans_chart_data(conn, equipe_filter=None, periodo_filter='ano_atual', da
         
         params_backlog = [data_inicio, data_fim]
         
-        if equipe_filter:
-            query_backlog += " AND ISNULL(Equipe, '') = ?"
-            params_backlog.append(equipe_filter)
+        filters = SqlFilters().equals('Equipe', equipe_filter, null_label=SEM_EQUIPE)
+        query_backlog += filters.and_sql()
+        params_backlog.extend(filters.params)
             
         query_backlog += """
         GROUP BY ISNULL(Equipe, 'Sem Equipe')
         ORDER BY Equipe
         """
         
-        df_backlog = pd.read_sql(query_backlog, conn, params=params_backlog)
+        df_backlog = cached_read_sql(query_backlog, conn, params=params_backlog)
         
-        # 2. Tendência mensal
-        query_tendencia = """
+        # 2. Tendência por período de criação (agrupada pela data de início do período, sem FORMAT)
+        periodo_criacao = bucket_sql('Created', granularidade)
+        query_tendencia = f"""
         SELECT 
-            FORMAT(Created, 'yyyy-MM') as Mes,
+            {periodo_criacao} as Periodo,
             COUNT(*) as TotalAbertas,
             SUM(CASE WHEN ResolutionDate IS NOT NULL 
-                AND FORMAT(ResolutionDate, 'yyyy-MM') = FORMAT(Created, 'yyyy-MM')
+                AND {bucket_sql('ResolutionDate', granularidade)} = {periodo_criacao}
                 THEN 1 ELSE 0 END) as FechadasNoMesmo
         FROM BI_Jira_US 
         WHERE Project = 'MAN'
@@ -2728,25 +2769,24 @@ def get_mans_chart_data(conn, equipe_filter=None, periodo_filter='ano_atual', da
         
         params_tendencia = [data_inicio, data_fim]
         
-        if equipe_filter:
-            query_tendencia += " AND ISNULL(Equipe, '') = ?"
-            params_tendencia.append(equipe_filter)
+        filters = SqlFilters().equals('Equipe', equipe_filter, null_label=SEM_EQUIPE)
+        query_tendencia += filters.and_sql()
+        params_tendencia.extend(filters.params)
             
-        query_tendencia += """
-        GROUP BY FORMAT(Created, 'yyyy-MM') 
-        ORDER BY FORMAT(Created, 'yyyy-MM')
+        query_tendencia += f"""
+        GROUP BY {periodo_criacao}
         """
         
-        df_tendencia = pd.read_sql(query_tendencia, conn, params=params_tendencia)
+        df_tendencia = cached_read_sql(query_tendencia, conn, params=params_tendencia)
         
         # 3. NOVO: Dados detalhados por equipe e mês para o gráfico detalhado
-        query_detalhado = """
+        query_detalhado = f"""
         SELECT 
             ISNULL(Equipe, 'Sem Equipe') as Equipe,
-            FORMAT(Created, 'yyyy-MM') as MesAno,
+            {periodo_criacao} as MesAno,
             COUNT(*) as TotalAbertas,
             SUM(CASE WHEN ResolutionDate IS NOT NULL 
-                AND FORMAT(ResolutionDate, 'yyyy-MM') = FORMAT(Created, 'yyyy-MM')
+                AND {bucket_sql('ResolutionDate', granularidade)} = {periodo_criacao}
                 THEN 1 ELSE 0 END) as FechadasNoMesmo,
             SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) as TotalFechadas
         FROM BI_Jira_US 
@@ -2756,16 +2796,16 @@ def get_mans_chart_data(conn, equipe_filter=None, periodo_filter='ano_atual', da
         
         params_detalhado = [data_inicio, data_fim]
         
-        if equipe_filter:
-            query_detalhado += " AND ISNULL(Equipe, '') = ?"
-            params_detalhado.append(equipe_filter)
+        filters = SqlFilters().equals('Equipe', equipe_filter, null_label=SEM_EQUIPE)
+        query_detalhado += filters.and_sql()
+        params_detalhado.extend(filters.params)
             
-        query_detalhado += """
-        GROUP BY ISNULL(Equipe, 'Sem Equipe'), FORMAT(Created, 'yyyy-MM')
-        ORDER BY Equipe, FORMAT(Created, 'yyyy-MM')
+        query_detalhado += f"""
+        GROUP BY ISNULL(Equipe, 'Sem Equipe'), {periodo_criacao}
+        ORDER BY Equipe, MesAno
         """
         
-        df_detalhado = pd.read_sql(query_detalhado, conn, params=params_detalhado)
+        df_detalhado = cached_read_sql(query_detalhado, conn, params=params_detalhado)
         
         # Processar dados para o frontend
         
@@ -2779,18 +2819,21 @@ def get_mans_chart_data(conn, equipe_filter=None, periodo_filter='ano_atual', da
                 'saldo': df_backlog['Saldo'].astype(int).tolist()
             }
         
-        # Dados da tendência (gráfico 2)
-        tendencia_data = {'meses': [], 'abertas': [], 'fechadas': []}
+        # Dados da tendência (gráfico 2), com os períodos sem MANs zerados
+        tendencia_data = {'meses': [], 'abertas': [], 'fechadas': [], 'granularidade': granularidade}
         if not df_tendencia.empty:
+            df_tendencia = fill_buckets(df_tendencia, 'Periodo', granularidade, data_inicio, data_fim)
             tendencia_data = {
-                'meses': df_tendencia['Mes'].tolist(),
+                'meses': bucket_labels(df_tendencia.index, granularidade),
                 'abertas': df_tendencia['TotalAbertas'].astype(int).tolist(),
-                'fechadas': df_tendencia['FechadasNoMesmo'].astype(int).tolist()
+                'fechadas': df_tendencia['FechadasNoMesmo'].astype(int).tolist(),
+                'granularidade': granularidade
             }
         
         # Dados detalhados por equipe e mês (gráfico 5 - NOVO)
         equipe_mes_data = []
         if not df_detalhado.empty:
+            df_detalhado['MesAno'] = bucket_labels(pd.to_datetime(df_detalhado['MesAno']), granularidade)
             equipe_mes_data = convert_numpy_types(df_detalhado.to_dict('records'))
         
         log_message(f"Gráficos MANs - Backlog: {len(backlog_data['equipes'])} equipes, Tendência: {len(tendencia_data['meses'])} meses, Detalhado: {len(equipe_mes_data)} registros")
@@ -2824,20 +2867,20 @@ def get_mans_chart_data(conn, equipe_filter=None, periodo_filter='ano_atual', da
 def mans_data_charts():
     """API ATUALIZADA para dados dos gráficos de MANs"""
     try:
-        conn = db_manager.get_connection()
+        with db_manager.connection(lazy=True) as conn:
         
-        # Obter parâmetros dos filtros
-        equipe_filter = request.args.get('equipe', '').strip()
-        periodo_filter = request.args.get('periodo', 'ano_atual')
-        data_inicio = request.args.get('data_inicio', '').strip()
-        data_fim = request.args.get('data_fim', '').strip()
+            # Obter parâmetros dos filtros
+            equipe_filter = request.args.get('equipe', '').strip()
+            periodo_filter = request.args.get('periodo', 'ano_atual')
+            data_inicio = request.args.get('data_inicio', '').strip()
+            data_fim = request.args.get('data_fim', '').strip()
         
-        log_message(f"MANs Charts API - Filtros: equipe={equipe_filter}, periodo={periodo_filter}")
+            log_message(f"MANs Charts API - Filtros: equipe={equipe_filter}, periodo={periodo_filter}")
         
-        # Obter dados dos gráficos
-        grafico_data = get_mans_chart_data(conn, equipe_filter, periodo_filter, data_inicio, data_fim)
+            # Obter dados dos gráficos
+            grafico_data = get_mans_chart_data(conn, equipe_filter, periodo_filter, data_inicio, data_fim,
+                                               parse_granularidade(request.args.get('granularidade')))
         
-        conn.close()
         
         log_message(f"MANs Charts - Dados obtidos: backlog={len(grafico_data.get('backlog', {}).get('equipes', []))}, tendencia={len(grafico_data.get('tendencia', {}).get('meses', []))}")
         
@@ -2861,8 +2904,6 @@ def mans_data_charts():
 @app.route('/export/mans-filtered')  
 def export_mans_filtered():
     try:
-        conn = db_manager.get_connection()
-        
         # Obter parâmetros dos filtros
         equipe_filter = request.args.get('equipe', '').strip()
         status_filter = request.args.get('status', '').strip()
@@ -2882,8 +2923,8 @@ def export_mans_filtered():
         # Calcular datas baseadas no período 
         data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter, data_inicio_custom, data_fim_custom)
         
-        # Query para exportação com colunas formatadas e EXATAMENTE os mesmos filtros do frontend
-        query = """
+        # Colunas formatadas da exportação
+        select_sql = """
         SELECT 
             Number as 'Número MAN',
             Summary as 'Resumo',
@@ -2910,85 +2951,31 @@ def export_mans_filtered():
                 WHEN Status IN ('Closed', 'Done', 'Resolved') THEN 'Fechada'
                 WHEN Status IN ('In Progress', 'Development') THEN 'Em Andamento'
                 ELSE 'Aberta'
-            END as 'Situação',
-            -- Campos adicionais para debug
-            Created as 'Data_Criacao_Original',
-            Number as 'Numero_Original'
-        FROM BI_Jira_US 
-        WHERE Project = 'MAN'
+            END as 'Situação'
         """
         
-        params = []
-        
-        # IMPORTANTE: Aplicar filtros EXATAMENTE como no frontend
-        
-        # Filtro de equipe
-        if equipe_filter:
-            query += " AND ISNULL(Equipe, '') = ?"
-            params.append(equipe_filter)
-            
-        # Filtro de status
-        if status_filter:
-            query += " AND ISNULL(Status, '') = ?"
-            params.append(status_filter)
-            
-        # Filtro de produto
-        if produto_filter:
-            query += " AND ISNULL(Produto, '') = ?"
-            params.append(produto_filter)
+        # Condições comuns à contagem e à exportação, as mesmas da tabela da tela
+        where_sql, params = build_mans_filters(
+            equipe_filter, status_filter, produto_filter, search_text, data_inicio, data_fim
+        )
         
-        # Filtro de período - CRUCIAL: usar EXATAMENTE a mesma lógica do frontend
-        if data_inicio and data_fim:
-            # Converter para datetime para comparação correta
-            query += " AND Created >= ? AND Created <= ?"
-            # Adicionar tempo para incluir o dia completo
-            data_fim_completo = data_fim + " 23:59:59"
-            params.extend([data_inicio, data_fim_completo])
-            log_message(f"Filtro de data aplicado: {data_inicio} até {data_fim_completo}")
-            
-        query += " ORDER BY Created DESC"
+        query = select_sql + where_sql + " ORDER BY Created DESC"
         
         log_message(f"Query de export MANs: {query}")
         log_message(f"Parâmetros: {params}")
         
-        # Executar query
-        df = pd.read_sql(query, conn, params=params)
-        log_message(f"MANs Export - Registros retornados ANTES do filtro de busca: {len(df)}")
-        
-        # Aplicar filtro de busca no DataFrame (EXATAMENTE como no frontend)
-        if search_text:
-            busca_lower = search_text.lower()
-            mask = (
-                df['Numero_Original'].fillna('').astype(str).str.lower().str.contains(busca_lower, na=False) |
-                df['Resumo'].fillna('').astype(str).str.lower().str.contains(busca_lower, na=False)
-            )
-            df = df[mask]
-            log_message(f"MANs Export - Registros APÓS filtro de busca '{search_text}': {len(df)}")
-        
-        # Remover colunas de debug
-        df = df.drop(['Data_Criacao_Original', 'Numero_Original'], axis=1, errors='ignore')
-        
-        conn.close()
+        total_registros = count_rows("SELECT COUNT(*)" + where_sql, params)
         
         # Log de comparação
-        log_message(f"Comparação: Esperado={total_registros_esperado}, Obtido={len(df)}")
+        log_message(f"Comparação: Esperado={total_registros_esperado}, Obtido={total_registros}")
         
         # Verificar se há dados para exportar
-        if df.empty:
+        if total_registros == 0:
             log_message("Nenhum dado encontrado para exportar MANs com os filtros aplicados")
             return jsonify({
                 'error': 'Nenhum dado encontrado para exportar com os filtros aplicados'
             }), 404
         
-        # Preencher valores nulos com texto vazio
-        df = df.fillna('')
-        
-        # Criar arquivo temporário
-        temp_file = tempfile.NamedTemporaryFile(mode='w+b', suffix='.csv', delete=False)
-        
-        # Salvar com encoding UTF-8 com BOM para Excel (separador ponto e vírgula)
-        df.to_csv(temp_file.name, index=False, encoding='utf-8-sig', sep=';')
-        
         # Construir nome do arquivo com informações sobre os filtros
         filename_parts = ['relatorio_mans']
         
@@ -3021,21 +3008,18 @@ def export_mans_filtered():
         
         # Adicionar timestamp e total de registros
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename_parts.append(f"{len(df)}registros")
+        filename_parts.append(f"{total_registros}registros")
         filename_parts.append(timestamp)
         
         filename = '_'.join(filename_parts) + '.csv'
         
         # Limitar tamanho do nome do arquivo (Windows tem limite de 255 chars)
         if len(filename) > 200:
-            filename = f"relatorio_mans_{len(df)}registros_{timestamp}.csv"
+            filename = f"relatorio_mans_{total_registros}registros_{timestamp}.csv"
         
-        log_message(f"Exportando MANs - {len(df)} registros para arquivo: {filename}")
+        log_message(f"Exportando MANs - {total_registros} registros para arquivo: {filename}")
         
-        return send_file(temp_file.name, 
-                        as_attachment=True, 
-                        download_name=filename,
-                        mimetype='text/csv')
+        return stream_csv_response(query, params, filename)
         
     except Exception as e:
         error_msg = f"Erro na exportação de MANs: {str(e)}"
@@ -3088,44 +3072,43 @@ def calculate_period_dates_for_mans(periodo_filter, data_inicio_custom=None, dat
 def mans_status_distribution():
     """API específica para distribuição de status das MANs"""
     try:
-        conn = db_manager.get_connection()
+        with db_manager.connection(lazy=True) as conn:
         
-        # Obter parâmetros dos filtros
-        equipe_filter = request.args.get('equipe', '').strip()
-        periodo_filter = request.args.get('periodo', 'ano_atual')
-        data_inicio = request.args.get('data_inicio', '').strip()
-        data_fim = request.args.get('data_fim', '').strip()
+            # Obter parâmetros dos filtros
+            equipe_filter = request.args.get('equipe', '').strip()
+            periodo_filter = request.args.get('periodo', 'ano_atual')
+            data_inicio = request.args.get('data_inicio', '').strip()
+            data_fim = request.args.get('data_fim', '').strip()
         
-        # Calcular datas baseadas no período
-        if not data_inicio or not data_fim:
-            data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter)
+            # Calcular datas baseadas no período
+            if not data_inicio or not data_fim:
+                data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter)
         
-        # Query para distribuição por status
-        query = """
-        SELECT 
-            ISNULL(Status, 'Indefinido') as status,
-            COUNT(*) as quantidade
-        FROM BI_Jira_US
-        WHERE Project = 'MAN'
-        """
+            # Query para distribuição por status
+            query = """
+            SELECT 
+                ISNULL(Status, 'Indefinido') as status,
+                COUNT(*) as quantidade
+            FROM BI_Jira_US
+            WHERE Project = 'MAN'
+            """
         
-        params = []
+            params = []
         
-        if equipe_filter:
-            query += " AND ISNULL(Equipe, '') = ?"
-            params.append(equipe_filter)
+            filters = SqlFilters().equals('Equipe', equipe_filter, null_label=SEM_EQUIPE)
+            query += filters.and_sql()
+            params.extend(filters.params)
         
-        if data_inicio and data_fim:
-            query += " AND Created BETWEEN ? AND ?"
-            params.extend([data_inicio, data_fim])
+            if data_inicio and data_fim:
+                query += " AND Created BETWEEN ? AND ?"
+                params.extend([data_inicio, data_fim])
         
-        query += """
-        GROUP BY Status
-        ORDER BY quantidade DESC
-        """
+            query += """
+            GROUP BY Status
+            ORDER BY quantidade DESC
+            """
         
-        df_status = pd.read_sql(query, conn, params=params)
-        conn.close()
+            df_status = cached_read_sql(query, conn, params=params)
         
         status_distribution = convert_numpy_types(df_status.to_dict('records')) if not df_status.empty else []
         
@@ -3148,39 +3131,38 @@ def mans_status_distribution():
 def mans_filters():
     """API para obter opções de filtros específicas para MANs"""
     try:
-        conn = db_manager.get_connection()
-        
-        # Buscar equipes distintas de MANs
-        query_equipes = """
-        SELECT DISTINCT ISNULL(Equipe, 'Sem Equipe') as equipe
-        FROM BI_Jira_US
-        WHERE Project = 'MAN' AND Equipe IS NOT NULL AND Equipe != ''
-        ORDER BY equipe
-        """
-        df_equipes = pd.read_sql(query_equipes, conn)
-        equipes = df_equipes['equipe'].tolist() if not df_equipes.empty else []
-        
-        # Buscar produtos distintos de MANs
-        query_produtos = """
-        SELECT DISTINCT ISNULL(Produto, 'Sem Produto') as produto
-        FROM BI_Jira_US
-        WHERE Project = 'MAN' AND Produto IS NOT NULL AND Produto != ''
-        ORDER BY produto
-        """
-        df_produtos = pd.read_sql(query_produtos, conn)
-        produtos = df_produtos['produto'].tolist() if not df_produtos.empty else []
-        
-        # Buscar status distintos de MANs
-        query_status = """
-        SELECT DISTINCT ISNULL(Status, 'Indefinido') as status
-        FROM BI_Jira_US
-        WHERE Project = 'MAN' AND Status IS NOT NULL AND Status != ''
-        ORDER BY status
-        """
-        df_status = pd.read_sql(query_status, conn)
-        status = df_status['status'].tolist() if not df_status.empty else []
+        with db_manager.connection(lazy=True) as conn:
+        
+            # Buscar equipes distintas de MANs
+            query_equipes = """
+            SELECT DISTINCT ISNULL(Equipe, 'Sem Equipe') as equipe
+            FROM BI_Jira_US
+            WHERE Project = 'MAN' AND Equipe IS NOT NULL AND Equipe != ''
+            ORDER BY equipe
+            """
+            df_equipes = cached_read_sql(query_equipes, conn, ttl=FILTERS_CACHE_TTL)
+            equipes = df_equipes['equipe'].tolist() if not df_equipes.empty else []
+        
+            # Buscar produtos distintos de MANs
+            query_produtos = """
+            SELECT DISTINCT ISNULL(Produto, 'Sem Produto') as produto
+            FROM BI_Jira_US
+            WHERE Project = 'MAN' AND Produto IS NOT NULL AND Produto != ''
+            ORDER BY produto
+            """
+            df_produtos = cached_read_sql(query_produtos, conn, ttl=FILTERS_CACHE_TTL)
+            produtos = df_produtos['produto'].tolist() if not df_produtos.empty else []
+        
+            # Buscar status distintos de MANs
+            query_status = """
+            SELECT DISTINCT ISNULL(Status, 'Indefinido') as status
+            FROM BI_Jira_US
+            WHERE Project = 'MAN' AND Status IS NOT NULL AND Status != ''
+            ORDER BY status
+            """
+            df_status = cached_read_sql(query_status, conn, ttl=FILTERS_CACHE_TTL)
+            status = df_status['status'].tolist() if not df_status.empty else []
         
-        conn.close()
         
         return jsonify({
             'equipes': equipes,
@@ -3195,77 +3177,85 @@ def mans_filters():
 def mans_insights():
     """API para insights e análises avançadas de MANs"""
     try:
-        conn = db_manager.get_connection()
-        
-        # Obter parâmetros
-        equipe_filter = request.args.get('equipe', '').strip()
-        periodo_filter = request.args.get('periodo', 'ano_atual')
+        with db_manager.connection(lazy=True) as conn:
         
-        data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter)
+            # Obter parâmetros
+            equipe_filter = request.args.get('equipe', '').strip()
+            periodo_filter = request.args.get('periodo', 'ano_atual')
         
-        # Análise 1: Top 5 equipes com melhor performance
-        query_top_equipes = """
-        SELECT TOP 5
-            ISNULL(Equipe, 'Sem Equipe') as equipe,
-            COUNT(*) as total_mans,
-            SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) as resolvidas,
-            CASE 
-                WHEN COUNT(*) > 0 
-                THEN (SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) * 100.0 / COUNT(*))
-                ELSE 0 
-            END as taxa_resolucao,
-            AVG(CASE 
-                WHEN ResolutionDate IS NOT NULL AND Created IS NOT NULL 
-                THEN DATEDIFF(day, Created, ResolutionDate)
-                ELSE NULL 
-            END) as tempo_medio
-        FROM BI_Jira_US
-        WHERE Project = 'MAN'
-        AND Created BETWEEN ? AND ?
-        GROUP BY Equipe
-        HAVING COUNT(*) >= 5
-        ORDER BY taxa_resolucao DESC, tempo_medio ASC
-        """
+            data_inicio, data_fim = calculate_period_dates_for_mans(periodo_filter)
         
-        df_top = pd.read_sql(query_top_equipes, conn, params=[data_inicio, data_fim])
-        top_equipes = convert_numpy_types(df_top.to_dict('records')) if not df_top.empty else []
+            # Análise 1: Top 5 equipes com melhor performance
+            query_top_equipes = """
+            SELECT TOP 5
+                ISNULL(Equipe, 'Sem Equipe') as equipe,
+                COUNT(*) as total_mans,
+                SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) as resolvidas,
+                CASE 
+                    WHEN COUNT(*) > 0 
+                    THEN (SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) * 100.0 / COUNT(*))
+                    ELSE 0 
+                END as taxa_resolucao,
+                AVG(CASE 
+                    WHEN ResolutionDate IS NOT NULL AND Created IS NOT NULL 
+                    THEN DATEDIFF(day, Created, ResolutionDate)
+                    ELSE NULL 
+                END) as tempo_medio
+            FROM BI_Jira_US
+            WHERE Project = 'MAN'
+            AND Created BETWEEN ? AND ?
+            GROUP BY Equipe
+            HAVING COUNT(*) >= 5
+            ORDER BY taxa_resolucao DESC, tempo_medio ASC
+            """
         
-        # Análise 2: Tendência comparativa (período atual vs anterior)
-        if periodo_filter == 'ano_atual':
-            today = datetime.now()
-            ano_anterior = today.year - 1
-            data_inicio_anterior = f"{ano_anterior}-01-01"
-            data_fim_anterior = f"{ano_anterior}-12-31"
-        else:
-            # Para outros períodos, calcular período equivalente anterior
-            try:
-                delta = datetime.strptime(data_fim, '%Y-%m-%d') - datetime.strptime(data_inicio, '%Y-%m-%d')
-                data_fim_anterior = (datetime.strptime(data_inicio, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
-                data_inicio_anterior = (datetime.strptime(data_inicio, '%Y-%m-%d') - delta - timedelta(days=1)).strftime('%Y-%m-%d')
-            except:
-                data_inicio_anterior = data_inicio
-                data_fim_anterior = data_fim
+            if mans_store.ready:
+                top_equipes = convert_numpy_types(compute_mans_top_equipes(mans_store.select(data_inicio, data_fim)))
+            else:
+                df_top = cached_read_sql(query_top_equipes, conn, params=[data_inicio, data_fim])
+                top_equipes = convert_numpy_types(df_top.to_dict('records')) if not df_top.empty else []
+        
+            # Análise 2: Tendência comparativa (período atual vs anterior)
+            if periodo_filter == 'ano_atual':
+                today = datetime.now()
+                ano_anterior = today.year - 1
+                data_inicio_anterior = f"{ano_anterior}-01-01"
+                data_fim_anterior = f"{ano_anterior}-12-31"
+            else:
+                # Para outros períodos, calcular período equivalente anterior
+                try:
+                    delta = datetime.strptime(data_fim, '%Y-%m-%d') - datetime.strptime(data_inicio, '%Y-%m-%d')
+                    data_fim_anterior = (datetime.strptime(data_inicio, '%Y-%m-%d') - timedelta(days=1)).strftime('%Y-%m-%d')
+                    data_inicio_anterior = (datetime.strptime(data_inicio, '%Y-%m-%d') - delta - timedelta(days=1)).strftime('%Y-%m-%d')
+                except:
+                    data_inicio_anterior = data_inicio
+                    data_fim_anterior = data_fim
         
-        query_comparacao = """
-        SELECT 
-            'atual' as periodo,
-            COUNT(*) as total_mans,
-            SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) as resolvidas
-        FROM BI_Jira_US
-        WHERE Project = 'MAN' AND Created BETWEEN ? AND ?
-        UNION ALL
-        SELECT 
-            'anterior' as periodo,
-            COUNT(*) as total_mans,
-            SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END) as resolvidas
-        FROM BI_Jira_US
-        WHERE Project = 'MAN' AND Created BETWEEN ? AND ?
-        """
+            query_comparacao = """
+            SELECT 
+                'atual' as periodo,
+                COUNT(*) as total_mans,
+                ISNULL(SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END), 0) as resolvidas
+            FROM BI_Jira_US
+            WHERE Project = 'MAN' AND Created BETWEEN ? AND ?
+            UNION ALL
+            SELECT 
+                'anterior' as periodo,
+                COUNT(*) as total_mans,
+                ISNULL(SUM(CASE WHEN ResolutionDate IS NOT NULL THEN 1 ELSE 0 END), 0) as resolvidas
+            FROM BI_Jira_US
+            WHERE Project = 'MAN' AND Created BETWEEN ? AND ?
+            """
         
-        df_comp = pd.read_sql(query_comparacao, conn, params=[data_inicio, data_fim, data_inicio_anterior, data_fim_anterior])
-        comparacao = convert_numpy_types(df_comp.to_dict('records')) if not df_comp.empty else []
+            if mans_store.ready:
+                comparacao = [
+                    compute_mans_periodo(mans_store.select(data_inicio, data_fim), 'atual'),
+                    compute_mans_periodo(mans_store.select(data_inicio_anterior, data_fim_anterior), 'anterior')
+                ]
+            else:
+                df_comp = cached_read_sql(query_comparacao, conn, params=[data_inicio, data_fim, data_inicio_anterior, data_fim_anterior])
+                comparacao = convert_numpy_types(df_comp.to_dict('records')) if not df_comp.empty else []
         
-        conn.close()
         
         return jsonify({
             'top_equipes': top_equipes,
@@ -3285,6 +3275,125 @@ def mans_insights():
         log_message(error_msg)
         return jsonify({'error': error_msg})
 
+# ===============================
+# PRÉ-CÁLCULO DOS DASHBOARDS
+# ===============================
+
+# Rotas pré-calculadas e os parâmetros (com padrão) que cada uma lê
+PRECOMPUTED_ROUTES = {
+    '/api/dashboard-data': (('equipe', ''), ('produto', ''), ('status', ''), ('periodo', 'ano_atual'),
+                            ('granularidade', GRANULARIDADE_PADRAO)),
+    '/api/mans-data-charts': (('equipe', ''), ('periodo', 'ano_atual'), ('data_inicio', ''), ('data_fim', ''),
+                              ('granularidade', GRANULARIDADE_PADRAO)),
+    '/api/mans-insights': (('equipe', ''), ('periodo', 'ano_atual'))
+}
+PRECOMPUTE_PERIODOS = ('ano_atual', 'mes_atual', '3_meses', '6_meses', 'q1', 'q2', 'q3', 'q4')
+
+def precompute_combinations(scheduler):
+    """Filtros pré-calculados: padrão primeiro, depois cada período e cada equipe × período"""
+    equipes_epicos = scheduler.fetch_json('/api/dashboard-filters').get('equipes', [])
+    equipes_mans = scheduler.fetch_json('/api/mans-filters').get('equipes', [])
+    
+    rotas = (
+        ('/api/dashboard-data', equipes_epicos),
+        ('/api/mans-data-charts', equipes_mans),
+        ('/api/mans-insights', equipes_mans)
+    )
+    for equipe in dict.fromkeys([''] + equipes_epicos + equipes_mans):
+        for periodo in PRECOMPUTE_PERIODOS:
+            for path, equipes in rotas:
+                if not equipe or equipe in equipes:
+                    yield path, {'equipe': equipe, 'periodo': periodo}
+
+precomputed = PrecomputeScheduler(app, data_versions, PRECOMPUTED_ROUTES, precompute_combinations)
+
+# ===============================
+# ATUALIZAÇÃO AO VIVO (SSE)
+# ===============================
+
+# Dashboards abertos recebem um aviso quando a versão dos dados muda, em vez de
+# consultar as APIs periodicamente
+data_events = EventBroadcaster()
+
+def publish_data_version(*_):
+    """Publicar a versão atual dos dados se ela mudou desde o último aviso"""
+    versao = data_versions.version()
+    if versao is None or versao == data_events.last_id:
+        return
+    data_events.publish('dados', {
+        'versao': versao,
+        'versoes': data_versions.table_versions()
+    }, event_id=versao)
+
+def on_data_changed_publish(tabelas, versoes):
+    # Com o pré-cálculo ativo o aviso sai ao fim do ciclo: os clientes
+    # recarregam e já encontram os resultados prontos
+    if not precomputed.running:
+        publish_data_version()
+
+precomputed.on_cycle(publish_data_version)
+data_versions.on_publish(on_data_changed_publish)
+
+@app.context_processor
+def inject_data_version():
+    """Última versão avisada pelo canal SSE quando a página foi gerada
+
+    onDataChanged (base.html) compara o primeiro evento da conexão com ela: uma
+    mudança entre a geração da página e a conexão também recarrega os dados.
+    """
+    if data_events.last_id is None:
+        publish_data_version()
+    return {'data_version': data_events.last_id}
+
+@app.route('/api/events')
+def data_events_stream():
+    """Canal SSE: evento 'dados' com a versão atual a cada mudança nos dados"""
+    if data_events.last_id is None:
+        publish_data_version()
+    return Response(data_events.stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.before_request
+def serve_precomputed():
+    """Responder as rotas de dashboard com o resultado pré-calculado, se estiver em dia"""
+    if request.method != 'GET':
+        return None
+    body = precomputed.lookup(request.path, request.args)
+    if body is None:
+        return None
+    return Response(body, mimetype='application/json')
+
+# ===============================
+# CACHE DE CONSULTAS
+# ===============================
+
+@app.route('/api/cache/status')
+def cache_status():
+    """API para acompanhar uso do cache de consultas e do pool de conexões"""
+    return jsonify({
+        'cache': query_cache.status(),
+        'pool': db_manager.pool.status(),
+        'dados': data_versions.status(),
+        'precalculo': precomputed.status(),
+        'eventos': data_events.status(),
+        'replica': local_replica.status(),
+        'mans': mans_store.status(),
+        'indices': index_pack.status()
+    })
+
+@app.route('/api/cache/invalidate', methods=['POST'])
+def cache_invalidate():
+    """API para invalidar o cache (ex.: após carga do ETL). Parâmetro opcional: tabela"""
+    tabela = request.args.get('tabela', '').strip() or None
+    removidas = query_cache.invalidate(tabela)
+    log_message(f"Cache invalidado ({tabela or 'todas as tabelas'}): {removidas} entradas removidas")
+    return jsonify({
+        'tabela': tabela,
+        'removidas': removidas
+    })
+
 # ===============================
 # ATUALIZAÇÃO DAS ROTAS EXISTENTES
 # ===============================
@@ -3316,7 +3425,50 @@ def open_browser():
     """Abre o navegador após iniciar o servidor"""
     webbrowser.open_new('http://localhost:5000/')
 
+def prepare_local_replica():
+    """Abrir a réplica local já existente e sincronizá-la com o SQL Server"""
+    if not local_replica.enabled:
+        return
+    try:
+        local_replica.open()
+        local_replica.sync()
+    except Exception as e:
+        log_message(f"Erro ao sincronizar réplica local (consultas seguem no SQL Server): {str(e)}")
+        return
+    
+    # Resultados lidos da cópia anterior em disco durante a sincronização são descartados
+    query_cache.invalidate()
+    precomputed.wake()
+
+def prepare_mans_store():
+    """Carga inicial das MANs em memória (até lá as rotas consultam o SQL Server)"""
+    try:
+        linhas = mans_store.sync()
+        log_message(f"MANs carregadas em memória: {linhas} linhas")
+    except Exception as e:
+        log_message(f"Erro ao carregar MANs em memória (consultas seguem no SQL Server): {str(e)}")
+
+def prewarm_connection_pool():
+    """Abre as conexões iniciais do pool sem bloquear a subida do servidor"""
+    success, message = db_manager.prewarm_pool()
+    log_message(message)
+
+def start_background_services():
+    """Threads em segundo plano (pool, índices, réplica, MANs, monitores e pré-cálculo)"""
+    threading.Thread(target=prewarm_connection_pool, daemon=True).start()
+    threading.Thread(target=apply_index_pack, args=(None, {}), daemon=True).start()
+    threading.Thread(target=prepare_local_replica, daemon=True).start()
+    threading.Thread(target=prepare_mans_store, daemon=True).start()
+    db_manager.start_credentials_watcher()
+    data_versions.start_watcher()
+    precomputed.start()
+
 if __name__ == '__main__':
+    # Com o reloader do modo debug o script roda duas vezes: no processo que observa os
+    # arquivos e no que atende as requisições (WERKZEUG_RUN_MAIN). Só o segundo inicia as threads.
+    if getattr(sys, 'frozen', False) or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        start_background_services()
+    
     # Configurar para não mostrar console no executável
     if getattr(sys, 'frozen', False):
         # Executando como .exe
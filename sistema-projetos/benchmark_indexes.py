@@ -0,0 +1,208 @@
+"""
+Benchmark das rotas /api/* sem e com o pacote de índices (bi_indexes.py)
+Execute: python benchmark_indexes.py [--repeticoes N] [--rota trecho] [--sem-remover] [--saida arquivo.json]
+
+1. Remove os índices do pacote e mede cada rota (linha de base)
+2. Aplica o pacote e mede de novo
+Com --sem-remover a linha de base é o estado atual do banco (sem DDL antes da
+primeira fase). As rotas são executadas de fato (test_client) com o cache de
+consultas limpo antes de cada chamada e sem réplica local, MANs em memória ou
+pré-cálculo: o tempo medido inclui as consultas ao SQL Server.
+"""
+
+import io
+import sys
+import json
+import time
+import argparse
+import statistics
+from contextlib import redirect_stdout
+from datetime import datetime
+
+import app as aplicacao
+from bi_indexes import IndexPack
+
+BENCHMARK_REPETICOES = 5
+
+# Rotas que não consultam as tabelas BI
+ROTAS_IGNORADAS = ('/api/cache/', '/api/events')
+
+# Cenários medidos: (rota, parâmetros). Valores entre <> vêm dos próprios dados
+CENARIOS = [
+    ('/api/dashboard-data', {}),
+    ('/api/dashboard-data', {'periodo': 'mes_atual'}),
+    ('/api/dashboard-data', {'equipe': '<equipe_epicos>'}),
+    ('/api/dashboard-filters', {}),
+    ('/api/alertas-detalhes', {'tipo': 'atrasados'}),
+    ('/api/alertas-detalhes', {'tipo': 'proximo_prazo'}),
+    ('/api/alertas-detalhes', {'tipo': 'baixo_progresso'}),
+    ('/api/gantt', {}),
+    ('/api/gantt-data', {}),
+    ('/api/gantt-data', {'equipe': '<equipe_epicos>'}),
+    ('/api/epicos-data', {}),
+    ('/api/epicos-data', {'equipe': '<equipe_epicos>'}),
+    ('/api/epicos-detalhes', {'epic': '<epico>'}),
+    ('/api/subtasks-data', {}),
+    ('/api/subtasks-detalhes', {'task': '<subtask>'}),
+    ('/api/subtasks-filters', {}),
+    ('/api/exportar-subtasks', {}),
+    ('/api/mans-data', {}),
+    ('/api/mans-report-table-data', {}),
+    ('/api/mans-table-data', {}),
+    ('/api/mans-table-data', {'equipe': '<equipe_mans>'}),
+    ('/api/mans-data-charts', {}),
+    ('/api/mans-data-charts', {'equipe': '<equipe_mans>'}),
+    ('/api/mans-status-distribution', {}),
+    ('/api/mans-filters', {}),
+    ('/api/mans-insights', {})
+]
+
+
+def isolar_banco():
+    """Desligar as camadas que respondem sem o SQL Server"""
+    aplicacao.local_replica.enabled = False
+    aplicacao.query_cache.invalidate()
+
+
+def chamar(client, rota, params):
+    """(status, erro, ms) de uma chamada à rota com o cache de consultas vazio"""
+    aplicacao.query_cache.invalidate()
+    with redirect_stdout(io.StringIO()):  # logs das rotas
+        inicio = time.perf_counter()
+        response = client.get(rota, query_string=params)
+        ms = (time.perf_counter() - inicio) * 1000
+    erro = None
+    if response.is_json:
+        body = response.get_json(silent=True)
+        if isinstance(body, dict) and body.get('error'):
+            erro = str(body['error'])
+    return response.status_code, erro, ms
+
+
+def valores_exemplo(client):
+    """Equipes, épico e subtask reais para os cenários com <valor>"""
+    def primeiro(rota, chave, campo=None):
+        with redirect_stdout(io.StringIO()):
+            body = client.get(rota).get_json(silent=True) or {}
+        valores = body.get(chave) or []
+        if not valores:
+            return ''
+        return valores[0].get(campo, '') if campo else valores[0]
+
+    return {
+        '<equipe_epicos>': primeiro('/api/dashboard-filters', 'equipes'),
+        '<equipe_mans>': primeiro('/api/mans-filters', 'equipes'),
+        '<epico>': primeiro('/api/epicos-data', 'epicos', 'EpicNumber'),
+        '<subtask>': primeiro('/api/subtasks-data', 'subtasks', 'TaskNumberId')
+    }
+
+
+def montar_cenarios(exemplos, filtro=None):
+    cenarios = []
+    for rota, params in CENARIOS:
+        if filtro and filtro not in rota:
+            continue
+        params = {nome: exemplos.get(valor, valor) for nome, valor in params.items()}
+        if any(not valor for valor in params.values()):
+            continue  # Sem dados para o cenário (ex.: tabela vazia)
+        cenarios.append((rota, params))
+    return cenarios
+
+
+def rotas_sem_cenario():
+    """Rotas GET /api/* registradas que não aparecem em CENARIOS"""
+    cobertas = {rota for rota, _ in CENARIOS}
+    rotas = set()
+    for rule in aplicacao.app.url_map.iter_rules():
+        if 'GET' in rule.methods and rule.rule.startswith('/api/') and not rule.rule.startswith(ROTAS_IGNORADAS):
+            rotas.add(rule.rule)
+    return sorted(rotas - cobertas)
+
+
+def medir(client, cenarios, repeticoes, fase):
+    """Mediana/mínimo (ms) de cada cenário; a primeira chamada só aquece o plano"""
+    resultados = []
+    for rota, params in cenarios:
+        chamar(client, rota, params)
+        amostras = []
+        status, erro = None, None
+        for _ in range(repeticoes):
+            status, erro, ms = chamar(client, rota, params)
+            amostras.append(ms)
+        resultados.append({
+            'rota': rota,
+            'parametros': params,
+            'status': status,
+            'erro': erro,
+            'mediana_ms': round(statistics.median(amostras), 1),
+            'minimo_ms': round(min(amostras), 1),
+            'amostras_ms': [round(ms, 1) for ms in amostras]
+        })
+        print(f"  [{fase}] {rota} {params or ''}: {resultados[-1]['mediana_ms']} ms"
+              + (f" (erro: {erro})" if erro else ''))
+    return resultados
+
+
+def imprimir_comparacao(antes, depois):
+    print()
+    print(f"{'Rota':<34} {'Parâmetros':<28} {'Sem índices':>12} {'Com índices':>12} {'Ganho':>8}")
+    print('-' * 98)
+    for base, novo in zip(antes, depois):
+        params = ', '.join(f"{k}={v}" for k, v in base['parametros'].items())[:28]
+        ganho = ''
+        if base['mediana_ms'] > 0:
+            ganho = f"{(1 - novo['mediana_ms'] / base['mediana_ms']) * 100:.0f}%"
+        print(f"{base['rota']:<34} {params:<28} {base['mediana_ms']:>10.1f}ms {novo['mediana_ms']:>10.1f}ms {ganho:>8}")
+
+    total_antes = sum(r['mediana_ms'] for r in antes)
+    total_depois = sum(r['mediana_ms'] for r in depois)
+    print('-' * 98)
+    print(f"{'Total':<63} {total_antes:>10.1f}ms {total_depois:>10.1f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark das rotas /api/* sem e com o pacote de índices')
+    parser.add_argument('--repeticoes', type=int, default=BENCHMARK_REPETICOES, help='chamadas medidas por cenário')
+    parser.add_argument('--rota', help='medir só as rotas que contêm este trecho')
+    parser.add_argument('--sem-remover', action='store_true', help='linha de base com os índices atuais (sem DROP)')
+    parser.add_argument('--saida', help='gravar os resultados em JSON')
+    args = parser.parse_args()
+
+    isolar_banco()
+    pack = IndexPack(aplicacao.db_manager)
+    client = aplicacao.app.test_client()
+
+    faltando = rotas_sem_cenario()
+    if faltando:
+        print(f"Aviso: rotas sem cenário de benchmark: {', '.join(faltando)}")
+
+    if not args.sem_remover:
+        removidos = pack.drop()
+        print(f"Linha de base: {len(removidos)} índices do pacote removidos")
+
+    cenarios = montar_cenarios(valores_exemplo(client), args.rota)
+    print(f"Medindo {len(cenarios)} cenários ({args.repeticoes} repetições cada)...")
+    antes = medir(client, cenarios, args.repeticoes, 'sem índices')
+
+    criados, removidos = pack.apply()
+    print(f"Pacote v{pack.version} aplicado: {len(criados)} índices criados em {pack.last_duration}s")
+    depois = medir(client, cenarios, args.repeticoes, 'com índices')
+
+    imprimir_comparacao(antes, depois)
+
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            json.dump({
+                'executado_em': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'versao_pacote': pack.version,
+                'repeticoes': args.repeticoes,
+                'linha_de_base_sem_indices': not args.sem_remover,
+                'sem_indices': antes,
+                'com_indices': depois
+            }, arquivo, ensure_ascii=False, indent=2)
+        print(f"Resultados gravados em {args.saida}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
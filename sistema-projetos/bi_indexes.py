@@ -0,0 +1,288 @@
+"""
+Pacote de índices das tabelas BI (versionado)
+Execute: python bi_indexes.py [--script | --aplicar | --remover | --status]
+
+Índices cobrindo os predicados repetidos pelas rotas: intervalos de
+EpicInicioPlanejado/EpicDueDate, EpicEquipe, TipoRegistroCalculo,
+Project = 'MAN' + Created e o backlog (ResolutionDate IS NULL).
+Os nomes levam a versão do pacote (IX_RP<versão>_...): aplicar uma versão
+nova cria os índices que faltam e remove os das versões anteriores.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime
+
+INDEX_PACK_VERSION = 1
+INDEX_PREFIX = 'IX_RP'  # Índices criados por este pacote (qualquer versão)
+
+# 'on': reaplicar o pacote após cada carga do ETL (tabelas recriadas perdem os índices);
+# requer permissão de ALTER nas tabelas BI
+INDEX_MODE = os.environ.get('BI_INDEXES', 'off').strip().lower()
+
+
+class IndexDefinition:
+    """Índice não clusterizado: chaves, colunas incluídas e filtro opcional"""
+    def __init__(self, table, name, keys, include=(), where=None):
+        self.table = table
+        self.name = name
+        self.keys = tuple(keys)
+        self.include = tuple(include)
+        self.where = where
+
+    def index_name(self, version=INDEX_PACK_VERSION):
+        return f"{INDEX_PREFIX}{version}_{self.name}"
+
+    def ddl(self, version=INDEX_PACK_VERSION):
+        sql = f"CREATE NONCLUSTERED INDEX {self.index_name(version)} ON {self.table} ({', '.join(self.keys)})"
+        if self.include:
+            sql += f" INCLUDE ({', '.join(self.include)})"
+        if self.where:
+            sql += f" WHERE {self.where}"
+        return sql
+
+
+INDEX_PACK = [
+    # Dashboard e timeline: período sobreposto, colunas dos indicadores incluídas
+    IndexDefinition(
+        'BI_Jira_Epico_Datas_Grafico', 'Epico_Periodo',
+        keys=('EpicInicioPlanejado', 'EpicDueDate'),
+        include=('EpicEquipe', 'EpicStatus', 'EpicProduto', 'TasksPercentualMedia', 'TipoRegistroCalculo'),
+        where='EpicInicioPlanejado IS NOT NULL'
+    ),
+    # Dashboard filtrado por equipe e lista de equipes
+    IndexDefinition(
+        'BI_Jira_Epico_Datas_Grafico', 'Epico_Equipe_Periodo',
+        keys=('EpicEquipe', 'EpicInicioPlanejado'),
+        include=('EpicDueDate', 'EpicStatus', 'EpicProduto', 'TasksPercentualMedia', 'TipoRegistroCalculo')
+    ),
+    # Tabela paginada de épicos: ordem (EpicEquipe, EpicNumber) do keyset, só 'Planejado Time'
+    IndexDefinition(
+        'BI_Jira_Epico_Datas_Grafico', 'Epico_PlanejadoTime',
+        keys=('EpicEquipe', 'EpicNumber'),
+        include=('EpicStatus', 'EpicProduto', 'EpicInicioPlanejado', 'EpicDueDate'),
+        where="TipoRegistroCalculo = 'Planejado Time'"
+    ),
+    # Gantt: épicos com datas por equipe, cobrindo as colunas exibidas
+    IndexDefinition(
+        'BI_Jira_Epico_Datas_Grafico', 'Epico_Gantt',
+        keys=('EpicEquipe', 'EpicNumber', 'TipoRegistroCalculo'),
+        include=('EpicSummary', 'EpicStatus', 'EpicProduto', 'EpicInicioPlanejado', 'EpicDueDate',
+                 'TasksDataInicial', 'TasksDataFim', 'TasksPercentualMedia', 'IndicadorAndamentoEpico'),
+        where='TipoRegistroCalculo IS NOT NULL AND EpicInicioPlanejado IS NOT NULL AND EpicDueDate IS NOT NULL'
+    ),
+    # Modal de detalhes do épico
+    IndexDefinition(
+        'BI_Jira_Epico_Datas_Grafico', 'Epico_Numero',
+        keys=('EpicNumber', 'TipoRegistroCalculo')
+    ),
+    # Alertas (atrasados / próximos do prazo)
+    IndexDefinition(
+        'BI_Jira_Epico_Datas_Grafico', 'Epico_DueDate',
+        keys=('EpicDueDate',),
+        include=('EpicNumber', 'EpicSummary', 'EpicEquipe', 'EpicStatus', 'TasksPercentualMedia')
+    ),
+
+    # Tabela paginada de subtasks: ordem do keyset e filtros da tela
+    IndexDefinition(
+        'BI_Jira_SubTasks_Datas_Grafico', 'SubTask_Pagina',
+        keys=('TaskEquipe', 'TaskProjectKey', 'TaskNumberId'),
+        include=('TaskStatus', 'TaskType', 'TaskSubTipo', 'TaskInicioPlanejado', 'TaskFimPlanejado')
+    ),
+    IndexDefinition(
+        'BI_Jira_SubTasks_Datas_Grafico', 'SubTask_Periodo',
+        keys=('TaskInicioPlanejado', 'TaskFimPlanejado'),
+        include=('TaskEquipe', 'TaskStatus', 'TaskType', 'TaskSubTipo')
+    ),
+    IndexDefinition(
+        'BI_Jira_SubTasks_Datas_Grafico', 'SubTask_Numero',
+        keys=('TaskNumberId',)
+    ),
+
+    # MANs por período de criação (estatísticas, gráficos e tabela)
+    IndexDefinition(
+        'BI_Jira_US', 'MAN_Created',
+        keys=('Project', 'Created'),
+        include=('Equipe', 'Status', 'Produto', 'ResolutionDate', 'Updated')
+    ),
+    # MANs de uma equipe no período e listas de filtros
+    IndexDefinition(
+        'BI_Jira_US', 'MAN_Equipe_Created',
+        keys=('Project', 'Equipe', 'Created'),
+        include=('Status', 'Produto', 'ResolutionDate')
+    ),
+    # Backlog: MANs abertas
+    IndexDefinition(
+        'BI_Jira_US', 'MAN_Backlog',
+        keys=('Equipe',),
+        include=('Created', 'Status'),
+        where="Project = 'MAN' AND ResolutionDate IS NULL"
+    ),
+    # Marca d'água (MAX(Updated)) e sincronização incremental das MANs
+    IndexDefinition(
+        'BI_Jira_US', 'US_Updated',
+        keys=('Updated',),
+        include=('Project', 'ID')
+    )
+]
+
+EXISTING_INDEXES_QUERY = f"""
+SELECT t.name AS tabela, i.name AS indice
+FROM sys.indexes i
+JOIN sys.tables t ON t.object_id = i.object_id
+WHERE i.name LIKE '{INDEX_PREFIX.replace('_', '[_]')}%'
+"""
+
+
+class IndexPack:
+    """Aplicação idempotente do pacote de índices nas tabelas BI
+
+    apply() cria os índices da versão atual que não existem e remove os de
+    outras versões do pacote; índices criados fora do pacote não são tocados.
+    """
+    def __init__(self, db_manager, indexes=INDEX_PACK, version=INDEX_PACK_VERSION, mode=INDEX_MODE):
+        self.db_manager = db_manager
+        self.indexes = indexes
+        self.version = version
+        self.enabled = mode == 'on'
+
+        self.created = 0
+        self.dropped = 0
+        self.last_apply = None
+        self.last_duration = None
+        self.last_error = None
+
+    def _tables(self, tables=None):
+        known = {index.table for index in self.indexes}
+        return [table for table in (tables or sorted(known)) if table in known]
+
+    @staticmethod
+    def _execute(conn, sql):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(sql)
+        finally:
+            cursor.close()
+
+    def existing(self, conn):
+        """Índices do pacote (qualquer versão) presentes no banco: {(tabela, índice)}"""
+        cursor = conn.cursor()
+        try:
+            cursor.execute(EXISTING_INDEXES_QUERY)
+            return {(row[0], row[1]) for row in cursor.fetchall()}
+        finally:
+            cursor.close()
+
+    def apply(self, tables=None):
+        """Criar os índices que faltam (e remover os de versões anteriores); retorna (criados, removidos)"""
+        tables = self._tables(tables)
+        started = time.monotonic()
+        created, dropped = [], []
+
+        with self.db_manager.connection() as conn:
+            existing = self.existing(conn)
+            wanted = {(index.table, index.index_name(self.version)) for index in self.indexes}
+
+            for table, name in sorted(existing - wanted):
+                if table in tables:
+                    self._execute(conn, f"DROP INDEX {name} ON {table}")
+                    dropped.append(f"{table}.{name}")
+
+            for index in self.indexes:
+                if index.table in tables and (index.table, index.index_name(self.version)) not in existing:
+                    self._execute(conn, index.ddl(self.version))
+                    created.append(f"{index.table}.{index.index_name(self.version)}")
+
+        self.created += len(created)
+        self.dropped += len(dropped)
+        self.last_apply = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.last_duration = round(time.monotonic() - started, 2)
+        return created, dropped
+
+    def drop(self, tables=None):
+        """Remover todos os índices do pacote (linha de base dos benchmarks); retorna os removidos"""
+        tables = self._tables(tables)
+        dropped = []
+        with self.db_manager.connection() as conn:
+            for table, name in sorted(self.existing(conn)):
+                if table in tables:
+                    self._execute(conn, f"DROP INDEX {name} ON {table}")
+                    dropped.append(f"{table}.{name}")
+        self.dropped += len(dropped)
+        return dropped
+
+    def script(self):
+        """Script T-SQL idempotente do pacote (para o job do ETL ou aplicação manual)"""
+        current = ', '.join(f"'{index.index_name(self.version)}'" for index in self.indexes)
+        lines = [
+            f"-- Pacote de índices das tabelas BI - versão {self.version}",
+            f"-- Gerado por bi_indexes.py em {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}",
+            "",
+            "-- Remover índices de outras versões do pacote",
+            "DECLARE @sql NVARCHAR(MAX) = N'';",
+            "SELECT @sql += N'DROP INDEX ' + QUOTENAME(i.name) + N' ON ' + QUOTENAME(t.name) + N';'",
+            "FROM sys.indexes i",
+            "JOIN sys.tables t ON t.object_id = i.object_id",
+            f"WHERE i.name LIKE '{INDEX_PREFIX.replace('_', '[_]')}%' AND i.name NOT IN ({current});",
+            "EXEC sp_executesql @sql;",
+            "",
+            f"-- Índices da versão {self.version}"
+        ]
+        for index in self.indexes:
+            lines += [
+                f"IF NOT EXISTS (SELECT 1 FROM sys.indexes WHERE object_id = OBJECT_ID('{index.table}')"
+                f" AND name = '{index.index_name(self.version)}')",
+                f"    {index.ddl(self.version)};"
+            ]
+        return '\n'.join(lines) + '\n'
+
+    def status(self):
+        """Resumo do pacote para logs/diagnóstico"""
+        return {
+            'versao': self.version,
+            'ativo': self.enabled,
+            'indices': len(self.indexes),
+            'criados': self.created,
+            'removidos': self.dropped,
+            'ultima_aplicacao': self.last_apply,
+            'duracao_ultima_aplicacao': self.last_duration,
+            'ultimo_erro': self.last_error
+        }
+
+
+def main():
+    pack = IndexPack(None)
+    if len(sys.argv) < 2 or sys.argv[1] == '--script':
+        print(pack.script(), end='')
+        return 0
+
+    from database import DatabaseManager
+    pack.db_manager = DatabaseManager()
+
+    if sys.argv[1] == '--aplicar':
+        created, dropped = pack.apply()
+        print(f"Pacote v{pack.version}: {len(created)} índices criados, {len(dropped)} removidos")
+        for name in created:
+            print(f"  + {name}")
+        for name in dropped:
+            print(f"  - {name}")
+    elif sys.argv[1] == '--remover':
+        dropped = pack.drop()
+        print(f"{len(dropped)} índices do pacote removidos")
+        for name in dropped:
+            print(f"  - {name}")
+    elif sys.argv[1] == '--status':
+        with pack.db_manager.connection() as conn:
+            existing = pack.existing(conn)
+        for index in pack.indexes:
+            presente = (index.table, index.index_name(pack.version)) in existing
+            print(f"{'OK ' if presente else '-- '} {index.table}.{index.index_name(pack.version)}")
+    else:
+        print(__doc__)
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
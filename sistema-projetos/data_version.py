@@ -0,0 +1,272 @@
+import os
+import hashlib
+import threading
+import time
+
+# Tabelas BI cuja versão define a validade de ETags, caches e resultados pré-calculados
+BI_TABLES = ('BI_Jira_Epico_Datas_Grafico', 'BI_Jira_SubTasks_Datas_Grafico', 'BI_Jira_US')
+
+DATA_VERSION_TTL = 30  # Segundos em que uma sondagem das marcas d'água é reaproveitada
+DATA_VERSION_POLL_INTERVAL = int(os.environ.get('DATA_VERSION_POLL_INTERVAL', 60))  # Monitor em segundo plano
+DATA_VERSION_FIRST_PROBE_WAIT = 10  # Segundos que uma requisição espera pela primeira sondagem
+
+# Marca d'água barata por tabela, sem ler as linhas das tabelas de épicos e subtasks:
+# linhas: contagem mantida pelo SQL Server em sys.partitions (heap ou índice clusterizado)
+# marca: data da última escrita registrada em sys.dm_db_index_usage_stats + create_date do
+#        objeto (tabela recriada pelo ETL); em BI_Jira_US, MAX(Updated), coberto pelo índice
+#        US_Updated (bi_indexes.py). A DMV é zerada quando o SQL Server reinicia, o que causa
+#        no máximo uma invalidação a mais.
+# modify_date não entra: CREATE/DROP INDEX (pacote de índices aplicado após cada carga)
+# altera essa data sem mudar os dados.
+# Uma única ida ao banco para as três tabelas.
+WATERMARK_QUERY = """
+SELECT o.name AS tabela,
+       (SELECT SUM(p.rows) FROM sys.partitions p WHERE p.object_id = o.object_id AND p.index_id IN (0, 1)) AS linhas,
+       CONVERT(VARCHAR(30), o.create_date, 126) + '|' + ISNULL(CONVERT(VARCHAR(30), (
+           SELECT MAX(u.last_user_update) FROM sys.dm_db_index_usage_stats u
+           WHERE u.database_id = DB_ID() AND u.object_id = o.object_id), 126), '') AS marca
+FROM sys.objects o
+WHERE o.object_id IN (OBJECT_ID('BI_Jira_Epico_Datas_Grafico'), OBJECT_ID('BI_Jira_SubTasks_Datas_Grafico'))
+UNION ALL
+SELECT 'BI_Jira_US',
+       (SELECT SUM(p.rows) FROM sys.partitions p WHERE p.object_id = OBJECT_ID('BI_Jira_US') AND p.index_id IN (0, 1)),
+       CONVERT(VARCHAR(40), (SELECT MAX(Updated) FROM BI_Jira_US), 126)
+"""
+
+# Sem permissão VIEW SERVER STATE (dm_db_index_usage_stats): só linhas + create_date nas
+# tabelas de épicos e subtasks. Detecta cargas que recriam a tabela ou mudam a quantidade
+# de linhas, mas não UPDATEs (ou recargas por TRUNCATE) que mantêm a contagem.
+WATERMARK_QUERY_BASIC = """
+SELECT o.name AS tabela,
+       (SELECT SUM(p.rows) FROM sys.partitions p WHERE p.object_id = o.object_id AND p.index_id IN (0, 1)) AS linhas,
+       CONVERT(VARCHAR(30), o.create_date, 126) AS marca
+FROM sys.objects o
+WHERE o.object_id IN (OBJECT_ID('BI_Jira_Epico_Datas_Grafico'), OBJECT_ID('BI_Jira_SubTasks_Datas_Grafico'))
+UNION ALL
+SELECT 'BI_Jira_US',
+       (SELECT SUM(p.rows) FROM sys.partitions p WHERE p.object_id = OBJECT_ID('BI_Jira_US') AND p.index_id IN (0, 1)),
+       CONVERT(VARCHAR(40), (SELECT MAX(Updated) FROM BI_Jira_US), 126)
+"""
+
+
+class DataVersionProbe:
+    """Versão dos dados a partir das marcas d'água das tabelas BI
+
+    Cada tabela tem um número de versão incrementado quando sua marca d'água
+    muda (carga do ETL). Assinantes (cache de consultas, resultados
+    pré-calculados) são avisados com as tabelas alteradas.
+
+    A versão usada nas ETags e nos avisos aos navegadores (version) só passa
+    para a nova marca d'água depois que todos os assinantes terminaram: durante
+    a sincronização as respostas ainda podem vir dos dados antigos e não devem
+    receber a ETag nova. Quem depende da versão publicada (pré-cálculo, avisos
+    SSE) se registra em on_publish.
+
+    As requisições nunca consultam o banco nem avisam assinantes: leem o último
+    estado e, sem o monitor, uma sondagem vencida (DATA_VERSION_TTL) é refeita
+    em segundo plano, uma por vez. Só a primeira sondagem é aguardada.
+    """
+    def __init__(self, db_manager, ttl=DATA_VERSION_TTL):
+        self.db_manager = db_manager
+        self.ttl = ttl
+
+        self._watermarks = None      # Última sondagem bem-sucedida (None se o banco falhou)
+        self._last_seen = None       # Referência para detectar mudanças (mantida em falhas)
+        self._published = None       # Marcas d'água cujos assinantes já terminaram (ETags, avisos)
+        self._table_versions = {table: 0 for table in BI_TABLES}
+        self._checked_at = None      # Instante da última sondagem (None antes da primeira)
+        self._changed_at = None
+        self._lock = threading.Lock()        # Só para ler/trocar o estado, nunca durante o banco
+        self._probe_lock = threading.Lock()  # Uma sondagem (e seus avisos) por vez
+        self._usage_stats = True     # False após falta de permissão para dm_db_index_usage_stats
+
+        self._subscribers = []
+        self._publish_listeners = []
+        self._refreshing = None      # Evento da sondagem em segundo plano em andamento
+        self._watcher = None
+        self._interval = None
+
+    def _query(self, query):
+        with self.db_manager.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.execute(query)
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+
+    def probe(self):
+        """Consultar as marcas d'água agora: dict tabela -> (linhas, marca)"""
+        if self._usage_stats:
+            try:
+                rows = self._query(WATERMARK_QUERY)
+            except Exception as e:
+                rows = self._query(WATERMARK_QUERY_BASIC)
+                # A consulta simples respondeu: faltou permissão para a DMV, não o banco
+                self._usage_stats = False
+                print(f"Versão dos dados sem dm_db_index_usage_stats: {str(e)}")
+        else:
+            rows = self._query(WATERMARK_QUERY_BASIC)
+        return {row[0]: (int(row[1] or 0), row[2]) for row in rows}
+
+    def subscribe(self, callback):
+        """Registrar função callback(tabelas_alteradas, versoes) chamada após cada mudança"""
+        self._subscribers.append(callback)
+
+    def on_publish(self, callback):
+        """Registrar função callback(tabelas_alteradas, versoes) chamada quando a nova versão é publicada"""
+        self._publish_listeners.append(callback)
+
+    def _apply_locked(self, watermarks):
+        """Registrar uma sondagem e retornar as tabelas alteradas (chamar com o lock)"""
+        syncing = self._published != self._last_seen
+        changed = []
+        if self._last_seen is not None:
+            changed = [table for table in BI_TABLES if watermarks.get(table) != self._last_seen.get(table)]
+            for table in changed:
+                self._table_versions[table] += 1
+            if changed:
+                self._changed_at = time.time()
+
+        self._watermarks = watermarks
+        self._last_seen = watermarks
+        self._checked_at = time.monotonic()
+        if not changed and not syncing:
+            self._published = watermarks  # Nada a sincronizar: publicada de imediato
+        return changed
+
+    def _notify(self, changed):
+        """Avisar os assinantes e só então publicar a versão detectada"""
+        with self._lock:
+            watermarks = self._last_seen
+            versions = dict(self._table_versions)
+        for callback in list(self._subscribers):
+            try:
+                callback(changed, versions)
+            except Exception as e:
+                print(f"Erro ao notificar mudança de dados: {str(e)}")
+
+        with self._lock:
+            if self._last_seen == watermarks:  # Uma sondagem mais nova publica a própria versão
+                self._published = watermarks
+        for callback in list(self._publish_listeners):
+            try:
+                callback(changed, versions)
+            except Exception as e:
+                print(f"Erro ao notificar publicação da versão dos dados: {str(e)}")
+
+    def refresh(self):
+        """Sondar agora e avisar os assinantes se alguma tabela mudou
+
+        A consulta ao banco roda fora de _lock (leitores não esperam por ela);
+        _probe_lock mantém sondagens e avisos em série, na ordem das sondagens.
+        """
+        with self._probe_lock:
+            try:
+                watermarks = self.probe()
+            except Exception as e:
+                print(f"Erro ao consultar versão dos dados: {str(e)}")
+                with self._lock:
+                    self._watermarks = None
+                    self._checked_at = time.monotonic()
+                return []
+
+            with self._lock:
+                changed = self._apply_locked(watermarks)
+            if changed:
+                self._notify(changed)
+        return changed
+
+    def _max_age(self):
+        # Com o monitor ativo, a idade tolerada acompanha o intervalo dele (folga para atrasos)
+        if self._watcher is not None:
+            return max(self.ttl, self._interval * 2)
+        return self.ttl
+
+    def refresh_async(self):
+        """Sondar em segundo plano (no máximo uma sondagem por vez); retorna o evento de conclusão"""
+        with self._lock:
+            if self._refreshing is not None:
+                return self._refreshing
+            done = self._refreshing = threading.Event()
+
+        def run():
+            try:
+                self.refresh()
+            except Exception as e:
+                print(f"Erro ao atualizar versão dos dados: {str(e)}")
+            finally:
+                with self._lock:
+                    self._refreshing = None
+                done.set()
+
+        threading.Thread(target=run, name='data-version-refresh', daemon=True).start()
+        return done
+
+    def watermarks(self):
+        """Marcas d'água atuais (None se o banco não responder)
+
+        Uma sondagem vencida é refeita em segundo plano e a chamada retorna o
+        último valor conhecido; só antes da primeira sondagem ela aguarda.
+        """
+        with self._lock:
+            checked_at = self._checked_at
+            watermarks = self._watermarks
+        if checked_at is not None and time.monotonic() - checked_at < self._max_age():
+            return watermarks
+
+        done = self.refresh_async()
+        if checked_at is None:
+            done.wait(DATA_VERSION_FIRST_PROBE_WAIT)
+            with self._lock:
+                watermarks = self._watermarks
+        return watermarks
+
+    def table_versions(self):
+        """Número de versão publicado por tabela (incrementado a cada mudança detectada)"""
+        with self._lock:
+            return dict(self._table_versions)
+
+    @staticmethod
+    def _version_id(watermarks):
+        text = '|'.join(f"{table}:{watermarks.get(table)}" for table in BI_TABLES)
+        return hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+
+    def version(self):
+        """Identificador curto da versão publicada de todas as tabelas BI (None se indisponível)"""
+        if self.watermarks() is None:
+            return None
+        with self._lock:
+            published = self._published
+        return self._version_id(published) if published is not None else None
+
+    def start_watcher(self, interval=DATA_VERSION_POLL_INTERVAL):
+        """Iniciar thread em segundo plano que sonda as tabelas BI a cada interval segundos"""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                try:
+                    self.refresh()
+                except Exception as e:
+                    print(f"Erro no monitor de versão dos dados: {str(e)}")
+                time.sleep(interval)
+
+        self._interval = interval
+        self._watcher = threading.Thread(target=watch, name='data-version-watcher', daemon=True)
+        self._watcher.start()
+
+    def status(self):
+        """Resumo das versões para logs/diagnóstico"""
+        with self._lock:
+            return {
+                'versoes': dict(self._table_versions),
+                'marcas': {table: list(mark) for table, mark in (self._watermarks or {}).items()},
+                'sincronizando': self._published != self._last_seen,
+                'ultima_mudanca': (time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(self._changed_at))
+                                   if self._changed_at else None),
+                'monitor_ativo': self._watcher is not None,
+                'estatisticas_uso': self._usage_stats,
+                'intervalo': self._interval
+            }
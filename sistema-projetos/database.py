@@ -2,6 +2,265 @@ import pyodbc
 from cryptography.fernet import Fernet
 import base64
 import os
+import re
+import time
+import threading
+import datetime
+import decimal
+import numpy as np
+import pandas as pd
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import contextmanager
+from table_schemas import get_table_schema
+
+# Configuração padrão do pool de conexões
+POOL_MAX_SIZE = 10          # Máximo de conexões abertas simultaneamente
+POOL_MIN_SIZE = 2           # Conexões abertas no pre-aquecimento
+POOL_MAX_LIFETIME = 1800    # Reciclar conexões com mais de 30 minutos
+POOL_IDLE_VALIDATION = 60   # Validar com SELECT 1 conexões ociosas há mais de 60s
+POOL_CHECKOUT_TIMEOUT = 30  # Tempo máximo de espera por uma conexão livre
+
+# Execução paralela de consultas independentes de uma mesma requisição
+QUERY_GROUP_MAX_PARALLEL = 4  # Limite por requisição: um usuário não esgota o pool sozinho
+
+# Leitura tipada em lotes (fetch_columns)
+FETCH_BATCH_SIZE = 5000  # Linhas por cursor.fetchmany
+
+# Fontes de credenciais monitoradas para recarga sem reiniciar a aplicação
+CREDENTIALS_FILE = os.environ.get(
+    'DB_CREDENTIALS_FILE',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'credenciais_criptografadas.txt')
+)
+CREDENTIALS_ENV_VARS = ('DB_SERVER', 'DB_USERNAME', 'DB_PASSWORD', 'DB_DATABASE')
+CREDENTIALS_RELOAD_INTERVAL = 30  # Segundos entre verificações de mudança nas credenciais
+
+# Perfil de conexão imutável: resolvido uma vez e trocado por inteiro na recarga
+ConnectionProfile = namedtuple('ConnectionProfile', ['server', 'database', 'username', 'connection_string', 'source'])
+
+
+class PooledConnection:
+    """Conexão do pool com os tempos usados na validação e reciclagem"""
+    def __init__(self, raw, generation=0):
+        self.raw = raw
+        self.generation = generation
+        self.created_at = time.monotonic()
+        self.last_used = self.created_at
+        self.suspect = False  # Houve erro durante o uso: validar antes de reutilizar
+
+
+class ConnectionPool:
+    """Pool limitado de conexões pyodbc com checkout/checkin, validação e reciclagem"""
+    def __init__(self, connect_func, max_size=POOL_MAX_SIZE, min_size=POOL_MIN_SIZE,
+                 max_lifetime=POOL_MAX_LIFETIME, idle_validation=POOL_IDLE_VALIDATION,
+                 checkout_timeout=POOL_CHECKOUT_TIMEOUT):
+        self._connect = connect_func
+        self.max_size = max_size
+        self.min_size = min(min_size, max_size)
+        self.max_lifetime = max_lifetime
+        self.idle_validation = idle_validation
+        self.checkout_timeout = checkout_timeout
+        
+        self._idle = deque()
+        self._total = 0  # Conexões abertas (ociosas + em uso)
+        self._generation = 0  # Incrementado em recycle(): conexões antigas são descartadas
+        self._cond = threading.Condition()
+    
+    def _open(self):
+        """Abrir uma nova conexão física (a vaga já foi reservada em _total)"""
+        generation = self._generation
+        try:
+            return PooledConnection(self._connect(), generation)
+        except Exception:
+            with self._cond:
+                self._total -= 1
+                self._cond.notify()
+            raise
+    
+    def _discard(self, pooled):
+        """Fechar conexão física e liberar a vaga no pool"""
+        try:
+            pooled.raw.close()
+        except Exception:
+            pass
+        with self._cond:
+            self._total -= 1
+            self._cond.notify()
+    
+    def _is_expired(self, pooled):
+        return (pooled.generation != self._generation
+                or time.monotonic() - pooled.created_at > self.max_lifetime)
+    
+    def _is_alive(self, pooled):
+        """Validar conexão ociosa há muito tempo com um SELECT 1"""
+        if not pooled.suspect and time.monotonic() - pooled.last_used < self.idle_validation:
+            return True
+        try:
+            cursor = pooled.raw.cursor()
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+            cursor.close()
+            pooled.suspect = False
+            return True
+        except Exception:
+            return False
+    
+    def acquire(self):
+        """Retirar uma conexão do pool, abrindo uma nova se houver vaga"""
+        deadline = time.monotonic() + self.checkout_timeout
+        while True:
+            with self._cond:
+                while not self._idle and self._total >= self.max_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Exception(f"Tempo esgotado aguardando conexão livre no pool ({self.max_size} em uso)")
+                    self._cond.wait(remaining)
+                
+                if self._idle:
+                    pooled = self._idle.pop()  # LIFO: reaproveita a conexão mais recente
+                else:
+                    self._total += 1
+                    pooled = None
+            
+            if pooled is None:
+                return self._open()
+            
+            if self._is_expired(pooled) or not self._is_alive(pooled):
+                self._discard(pooled)
+                continue
+            
+            return pooled
+    
+    def release(self, pooled):
+        """Devolver conexão ao pool (ou descartar se expirada)"""
+        if self._is_expired(pooled):
+            self._discard(pooled)
+            return
+        
+        pooled.last_used = time.monotonic()
+        with self._cond:
+            self._idle.append(pooled)
+            self._cond.notify()
+    
+    def prewarm(self):
+        """Abrir min_size conexões antecipadamente (chamado na inicialização)"""
+        opened = []
+        try:
+            for _ in range(self.min_size):
+                opened.append(self.acquire())
+        finally:
+            for pooled in opened:
+                self.release(pooled)
+        return len(opened)
+    
+    def recycle(self):
+        """Invalidar todas as conexões atuais (ex.: credenciais trocadas)
+
+        As ociosas são fechadas já; as em uso são descartadas ao voltar ao pool.
+        """
+        with self._cond:
+            self._generation += 1
+        self.close_all()
+    
+    def close_all(self):
+        """Fechar todas as conexões ociosas"""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+        for pooled in idle:
+            self._discard(pooled)
+    
+    def status(self):
+        """Resumo do estado do pool para logs/diagnóstico"""
+        with self._cond:
+            return {
+                'abertas': self._total,
+                'ociosas': len(self._idle),
+                'em_uso': self._total - len(self._idle),
+                'max_size': self.max_size
+            }
+
+
+class LazyConnection:
+    """Conexão do pool retirada só quando algum atributo (cursor, commit...) é usado"""
+    def __init__(self, pool):
+        self.pool = pool
+        self.pooled = None
+
+    def acquire(self):
+        if self.pooled is None:
+            self.pooled = self.pool.acquire()
+        return self.pooled.raw
+
+    def __getattr__(self, name):
+        return getattr(self.acquire(), name)
+
+
+def _infer_column_kind(type_code):
+    """Tipo da coluna a partir da descrição do cursor (colunas fora do manifesto)"""
+    if type_code in (datetime.datetime, datetime.date):
+        return 'datetime'
+    if type_code is int:
+        return 'int64'
+    if type_code in (float, decimal.Decimal):
+        return 'float'
+    return 'object'
+
+
+class ColumnBuilder:
+    """Acumula os lotes de uma coluna já convertidos para arrays NumPy tipados"""
+    def __init__(self, kind):
+        self.kind = kind
+        self.chunks = []
+        self.masks = []       # NULLs das colunas inteiras
+        self.categories = {}  # valor -> código das colunas categóricas
+
+    def append(self, values):
+        if self.kind == 'datetime':
+            try:
+                chunk = np.array(values, dtype='datetime64[ns]')
+            except (TypeError, ValueError):
+                chunk = pd.to_datetime(pd.Series(values, dtype=object), errors='coerce').to_numpy('datetime64[ns]')
+        elif self.kind in ('int32', 'int64'):
+            mask = np.fromiter((value is None for value in values), dtype=bool, count=len(values))
+            if mask.any():
+                values = [0 if value is None else value for value in values]
+            chunk = np.array(values, dtype=np.int64)
+            self.masks.append(mask)
+        elif self.kind == 'float':
+            try:
+                chunk = np.array(values, dtype=np.float64)
+            except (TypeError, ValueError):
+                chunk = pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(np.float64)
+        elif self.kind == 'category':
+            # Dicionário montado lote a lote: só os códigos int32 ficam em memória
+            lookup = self.categories
+            chunk = np.fromiter(
+                (-1 if value is None else lookup.setdefault(value, len(lookup)) for value in values),
+                dtype=np.int32, count=len(values)
+            )
+        else:
+            chunk = np.empty(len(values), dtype=object)
+            chunk[:] = values
+        self.chunks.append(chunk)
+
+    def finish(self):
+        if self.kind == 'category':
+            codes = np.concatenate(self.chunks) if self.chunks else np.empty(0, dtype=np.int32)
+            return pd.Categorical.from_codes(codes, categories=list(self.categories))
+
+        if not self.chunks:
+            empty_dtypes = {'datetime': 'datetime64[ns]', 'int32': np.int32, 'int64': np.int64, 'float': np.float64}
+            return np.empty(0, dtype=empty_dtypes.get(self.kind, object))
+
+        data = np.concatenate(self.chunks)
+        if self.kind in ('int32', 'int64'):
+            mask = np.concatenate(self.masks)
+            data = data.astype(np.int32 if self.kind == 'int32' else np.int64)
+            if mask.any():
+                return pd.arrays.IntegerArray(data, mask)
+        return data
+
 
 class DatabaseManager:
     def __init__(self):
@@ -20,7 +279,20 @@ class DatabaseManager:
         self.username = "marcos.araujo" 
         self.password = "1234"
         self.database = "project_bi"
-    
+
+        # Perfil de conexão resolvido (lazy) e assinatura das fontes usadas
+        self._profile = None
+        self._profile_signature = None
+        self._profile_lock = threading.Lock()
+        self._watcher = None
+
+        # Pool de conexões reutilizadas entre as requisições
+        self.pool = ConnectionPool(self.get_connection)
+
+        # Threads que executam os grupos de consultas (uma conexão do pool por consulta)
+        self.query_executor = ThreadPoolExecutor(max_workers=self.pool.max_size,
+                                                 thread_name_prefix='query-group')
+
     def encrypt_credentials(self, server, username, password):
         """
         Método para criptografar credenciais (use uma vez para gerar as strings criptografadas)
@@ -39,13 +311,24 @@ class DatabaseManager:
         return encrypted_server, encrypted_username, encrypted_password
     
     def decrypt_credentials(self):
-        """Descriptografar credenciais"""
+        """Descriptografar credenciais
+
+        Usa o arquivo de credenciais (chave + valores criptografados) quando existir;
+        caso contrário, as credenciais embutidas nesta classe.
+        """
         try:
+            cipher = self.cipher
+            encrypted = (self.encrypted_server, self.encrypted_username,
+                         self.encrypted_password, self.encrypted_database)
+
+            file_values = self._read_credentials_file()
+            if file_values:
+                cipher = Fernet(file_values['Chave'].encode())
+                encrypted = (file_values['Server'].encode(), file_values['Username'].encode(),
+                             file_values['Password'].encode(), file_values['Database'].encode())
+
             # Em produção, use estas linhas:
-            server = self.cipher.decrypt(self.encrypted_server).decode()
-            username = self.cipher.decrypt(self.encrypted_username).decode()
-            password = self.cipher.decrypt(self.encrypted_password).decode()
-            database = self.cipher.decrypt(self.encrypted_database).decode()
+            server, username, password, database = [cipher.decrypt(value).decode() for value in encrypted]
             # Para desenvolvimento (REMOVER EM PRODUÇÃO):
             #server = self.server
             #username = self.username
@@ -54,11 +337,43 @@ class DatabaseManager:
             return server, username, password, database
         except Exception as e:
             raise Exception(f"Erro ao descriptografar credenciais: {str(e)}")
-    
-    def get_connection_string(self):
-        """Gerar string de conexão"""
-        server, username, password, database = self.decrypt_credentials()
-        
+
+    def _read_credentials_file(self):
+        """Ler chave e credenciais criptografadas do arquivo gerado por gerar_credenciais_criptografadas.py"""
+        if not os.path.exists(CREDENTIALS_FILE):
+            return None
+
+        with open(CREDENTIALS_FILE, 'rb') as f:
+            content = f.read().decode('utf-8', errors='replace')
+
+        values = {}
+        for line in content.splitlines():
+            match = re.match(r"^(Chave|Server|Username|Password|Database):\s*(?:b'([^']*)'|(\S+))\s*$", line)
+            if match and match.group(1) not in values:
+                values[match.group(1)] = match.group(2) or match.group(3)
+
+        required = ('Chave', 'Server', 'Username', 'Password', 'Database')
+        return values if all(name in values for name in required) else None
+
+    def _credentials_signature(self):
+        """Assinatura barata das fontes de credenciais (mtime/tamanho do arquivo + variáveis de ambiente)"""
+        try:
+            stat = os.stat(CREDENTIALS_FILE)
+            file_signature = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            file_signature = None
+        return file_signature, tuple(os.environ.get(name) for name in CREDENTIALS_ENV_VARS)
+
+    def _resolve_profile(self):
+        """Resolver credenciais (variáveis de ambiente têm prioridade) em um ConnectionProfile"""
+        env_values = [os.environ.get(name) for name in CREDENTIALS_ENV_VARS]
+        if all(env_values):
+            server, username, password, database = env_values
+            source = 'ambiente'
+        else:
+            server, username, password, database = self.decrypt_credentials()
+            source = CREDENTIALS_FILE if self._read_credentials_file() else 'embutidas'
+
         connection_string = (
             f"DRIVER={{ODBC Driver 17 for SQL Server}};"
             f"SERVER={server};"
@@ -68,28 +383,183 @@ class DatabaseManager:
             f"TrustServerCertificate=yes;"
             f"Connection Timeout=30;"
         )
-        
-        return connection_string
+        return ConnectionProfile(server, database, username, connection_string, source)
+
+    def get_profile(self):
+        """Perfil de conexão atual (descriptografa apenas na primeira chamada ou após recarga)"""
+        profile = self._profile
+        if profile is not None:
+            return profile
+
+        with self._profile_lock:
+            if self._profile is None:
+                signature = self._credentials_signature()
+                self._profile = self._resolve_profile()
+                self._profile_signature = signature
+            return self._profile
+
+    def reload_credentials_if_changed(self):
+        """Recarregar o perfil se o arquivo/variáveis de credenciais mudaram
+
+        Em caso de erro (ex.: arquivo gravado pela metade) o perfil anterior é mantido.
+        """
+        signature = self._credentials_signature()
+        if self._profile is not None and signature == self._profile_signature:
+            return False
+
+        with self._profile_lock:
+            try:
+                new_profile = self._resolve_profile()
+            except Exception as e:
+                print(f"Erro ao recarregar credenciais (mantendo as atuais): {str(e)}")
+                return False
+
+            old_profile = self._profile
+            self._profile = new_profile
+            self._profile_signature = signature
+
+        if old_profile is not None and old_profile.connection_string != new_profile.connection_string:
+            print(f"Credenciais recarregadas de: {new_profile.source}")
+            self.pool.recycle()
+            return True
+        return False
+
+    def start_credentials_watcher(self, interval=CREDENTIALS_RELOAD_INTERVAL):
+        """Iniciar thread em segundo plano que recarrega as credenciais quando mudam"""
+        if self._watcher is not None:
+            return
+
+        def watch():
+            while True:
+                time.sleep(interval)
+                try:
+                    self.reload_credentials_if_changed()
+                except Exception as e:
+                    print(f"Erro no monitor de credenciais: {str(e)}")
+
+        self._watcher = threading.Thread(target=watch, name='credentials-watcher', daemon=True)
+        self._watcher.start()
+    
+    def get_connection_string(self):
+        """Gerar string de conexão"""
+        return self.get_profile().connection_string
     
     def get_connection(self):
-        """Obter conexão com o banco de dados"""
+        """Abrir uma nova conexão física com o banco de dados (fora do pool)"""
         try:
             connection_string = self.get_connection_string()
-            conn = pyodbc.connect(connection_string)
+            # Somente leitura: autocommit evita transações implícitas abertas no pool
+            conn = pyodbc.connect(connection_string, autocommit=True)
             return conn
         except pyodbc.Error as e:
             raise Exception(f"Erro ao conectar com o banco de dados: {str(e)}")
         except Exception as e:
             raise Exception(f"Erro geral: {str(e)}")
-    
+
+    @contextmanager
+    def connection(self, lazy=False):
+        """Checkout/checkin de uma conexão do pool
+
+        Uso:
+            with db_manager.connection() as conn:
+                df = pd.read_sql(query, conn)
+
+        lazy=True adia o checkout para o primeiro uso da conexão: blocos cujas
+        consultas são atendidas sem o SQL Server (cache/réplica local) não
+        ocupam o pool nem falham com o banco indisponível.
+        """
+        conn = LazyConnection(self.pool)
+        if not lazy:
+            conn.acquire()
+        try:
+            yield conn if lazy else conn.pooled.raw
+        except Exception:
+            # O erro pode ter deixado a conexão inutilizável: validar no próximo checkout
+            if conn.pooled is not None:
+                conn.pooled.suspect = True
+            raise
+        finally:
+            if conn.pooled is not None:
+                self.pool.release(conn.pooled)
+
+    def _run_with_connection(self, task):
+        with self.connection() as conn:
+            return task(conn)
+
+    def run_query_group(self, tasks, max_parallel=QUERY_GROUP_MAX_PARALLEL):
+        """Executar consultas independentes em paralelo e reunir os resultados
+
+        tasks: dict nome -> função que recebe a conexão e retorna o resultado.
+        Cada consulta usa sua própria conexão do pool e no máximo max_parallel
+        rodam ao mesmo tempo. Retorna dict nome -> resultado; se alguma falhar,
+        as pendentes são canceladas e o primeiro erro é propagado.
+        Não chame com uma conexão do pool já retida pela mesma requisição.
+        """
+        pending = list(tasks.items())
+        running = {}
+        results = {}
+        max_parallel = max(1, min(max_parallel, self.pool.max_size))
+
+        try:
+            while pending or running:
+                while pending and len(running) < max_parallel:
+                    name, task = pending.pop(0)
+                    running[self.query_executor.submit(self._run_with_connection, task)] = name
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+        finally:
+            for future in running:
+                future.cancel()
+
+        return results
+
+    def fetch_columns(self, conn, query, params=None, table=None, batch_size=FETCH_BATCH_SIZE):
+        """Ler o resultado em lotes (cursor.fetchmany) direto para colunas tipadas
+
+        Alternativa ao pd.read_sql na conexão pyodbc, que monta todas as linhas como
+        tuplas Python e deixa as colunas como object. Os tipos vêm do manifesto da
+        tabela (table_schemas.py): datas em datetime64, contagens em int32 e
+        Equipe/Status/Produto como categóricos. Retorna um DataFrame.
+        """
+        schema = get_table_schema(table) if table else {}
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query, *(params or []))
+            columns = [column[0] for column in cursor.description]
+            builders = [
+                ColumnBuilder(schema.get(name) or _infer_column_kind(column[1]))
+                for name, column in zip(columns, cursor.description)
+            ]
+
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for builder, values in zip(builders, zip(*rows)):
+                    builder.append(values)
+        finally:
+            cursor.close()
+
+        return pd.DataFrame({name: builder.finish() for name, builder in zip(columns, builders)}, columns=columns)
+
+    def prewarm_pool(self):
+        """Pré-aquecer o pool na inicialização da aplicação"""
+        try:
+            opened = self.pool.prewarm()
+            return True, f"Pool de conexões pré-aquecido com {opened} conexões"
+        except Exception as e:
+            return False, f"Erro ao pré-aquecer pool de conexões: {str(e)}"
+
     def test_connection(self):
         """Testar conexão com o banco"""
         try:
-            conn = self.get_connection()
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1")
-            result = cursor.fetchone()
-            conn.close()
+            with self.connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT 1")
+                result = cursor.fetchone()
+                cursor.close()
             return True, "Conexão estabelecida com sucesso!"
         except Exception as e:
             return False, f"Erro na conexão: {str(e)}"
@@ -0,0 +1,83 @@
+import os
+import json
+import queue
+import threading
+
+SSE_HEARTBEAT = 25  # Segundos entre comentários de keep-alive (proxies fecham conexões ociosas)
+SSE_CLIENT_QUEUE = 16  # Eventos pendentes por cliente; acima disso o cliente lento perde os antigos
+SSE_RETRY_MS = int(os.environ.get('SSE_RETRY_MS', 10000))  # Espera do navegador antes de reconectar
+
+
+def format_event(event, data, event_id=None):
+    """Mensagem no formato text/event-stream"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"event: {event}")
+    lines.append(f"data: {json.dumps(data, ensure_ascii=False)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+class EventBroadcaster:
+    """Canal Server-Sent Events: cada conexão recebe os eventos publicados
+
+    O último evento é reenviado a quem conecta (ou reconecta), então o cliente
+    sempre compara com a versão mais recente mesmo que tenha perdido avisos.
+    """
+    def __init__(self, heartbeat=SSE_HEARTBEAT):
+        self.heartbeat = heartbeat
+
+        self._clients = set()
+        self._lock = threading.Lock()
+        self._last_message = None
+        self.last_id = None
+        self.published = 0
+
+    def publish(self, event, data, event_id=None):
+        """Enviar evento a todos os clientes conectados"""
+        message = format_event(event, data, event_id)
+        with self._lock:
+            self._last_message = message
+            self.last_id = event_id
+            self.published += 1
+            clients = list(self._clients)
+
+        for client in clients:
+            try:
+                client.put_nowait(message)
+            except queue.Full:
+                # Cliente lento: descarta o mais antigo; o último evento é o que importa
+                try:
+                    client.get_nowait()
+                    client.put_nowait(message)
+                except (queue.Empty, queue.Full):
+                    pass
+
+    def stream(self):
+        """Gerador da resposta de uma conexão (encerrado quando o cliente desconecta)"""
+        client = queue.Queue(maxsize=SSE_CLIENT_QUEUE)
+        with self._lock:
+            self._clients.add(client)
+            last_message = self._last_message
+
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n\n"
+            if last_message is not None:
+                yield last_message
+            while True:
+                try:
+                    yield client.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield ': ping\n\n'
+        finally:
+            with self._lock:
+                self._clients.discard(client)
+
+    def status(self):
+        """Resumo do canal para logs/diagnóstico"""
+        with self._lock:
+            return {
+                'clientes': len(self._clients),
+                'eventos_publicados': self.published,
+                'ultimo_id': self.last_id
+            }
@@ -0,0 +1,457 @@
+import os
+import numpy as np
+import pandas as pd
+
+# Ordem dos itens do Gantt (ORDER BY da consulta, pelas colunas já com ISNULL): épicos por
+# número, resumo, equipe e status; dentro do épico, o tipo de registro. A tabela não tem chave
+# única, então as demais colunas lidas completam o desempate: linhas ainda empatadas são
+# idênticas e a paginação (OFFSET/FETCH) não repete nem pula itens distintos.
+GANTT_ORDER_COLUMNS = [
+    'EpicNumber', 'EpicSummary', 'EpicEquipe', 'EpicStatus', 'TipoRegistroCalculo',
+    'TasksDataInicial', 'TasksDataFim', 'TasksPercentualMedia', 'IndicadorAndamentoEpico',
+    'EpicProduto', 'EpicInicioPlanejado', 'EpicDueDate'
+]
+
+GANTT_SUMMARY_MAX_LENGTH = 60
+
+# Aparência de cada tipo de registro (tipos fora desta lista não entram no gráfico)
+TIPO_REGISTRO_STYLE = {
+    'Planejado P.O.': {'prefix': '📋 PO', 'color': '#6c757d', 'opacity': 0.7, 'width': 18, 'display': 'PLANEJADO P.O.'},
+    'Planejado Time': {'prefix': '⏰ Time', 'color': '#17a2b8', 'opacity': 0.85, 'width': 22, 'display': 'PLANEJADO TIME'},
+    'Realizado Time': {'prefix': '✅ Real', 'color': None, 'opacity': 1.0, 'width': 26, 'display': 'REALIZADO TIME'}
+}
+
+# O realizado usa a cor do indicador de andamento
+INDICADOR_COLORS = {
+    'Verde': '#28a745',
+    'Amarelo': '#ffc107',
+    'Vermelho': '#dc3545'
+}
+INDICADOR_COLOR_DEFAULT = '#6c757d'
+
+# Descrição do indicador para hover - SEM EMOJIS
+INDICADOR_DESCRICOES = {
+    'Verde': 'Dentro do Prazo/Concluido',
+    'Amarelo': 'Proximo do Prazo (<=5 dias)',
+    'Vermelho': 'Atrasado/Critico'
+}
+
+GANTT_ITEM_COLUMNS = [
+    'Task', 'Start', 'Finish', 'Resource', 'Complete', 'Status', 'TipoRegistro', 'TipoDisplay',
+    'EpicNumber', 'IndicadorAndamento', 'IndicadorDescricao', 'Color', 'Opacity', 'Width'
+]
+
+
+def _text_column(series, default):
+    """Coluna de texto sem nulos"""
+    return series.astype(object).where(series.notna(), default).astype(str)
+
+
+def _sanitize_summary(series):
+    """Remover caracteres que quebram o hover e truncar resumos longos"""
+    summary = _text_column(series, 'Sem resumo')
+    summary = summary.str.replace('"', "'", regex=False).str.replace(r'[\r\n]', ' ', regex=True)
+    longo = summary.str.len() > GANTT_SUMMARY_MAX_LENGTH
+    return summary.where(~longo, summary.str.slice(0, GANTT_SUMMARY_MAX_LENGTH) + '...')
+
+
+def _format_dates(values):
+    """Datas em 'YYYY-MM-DD' de uma só vez (sem strftime linha a linha)"""
+    return values.to_numpy(dtype='datetime64[ns]').astype('datetime64[D]').astype(str)
+
+
+def build_gantt_items(df):
+    """Itens do Gantt (um por épico e tipo de registro) com cor, largura e opacidade
+
+    Descarta tipos de registro não reconhecidos e registros sem datas.
+    Retorna DataFrame com GANTT_ITEM_COLUMNS na ordem de df (a consulta já
+    ordena por GANTT_ORDER_COLUMNS, igual no gráfico completo e nas janelas).
+    """
+    if df.empty:
+        return pd.DataFrame(columns=GANTT_ITEM_COLUMNS)
+
+    tipo = _text_column(df['TipoRegistroCalculo'], 'Indefinido')
+    inicio = pd.to_datetime(df['TasksDataInicial'], errors='coerce')
+    fim = pd.to_datetime(df['TasksDataFim'], errors='coerce')
+
+    valid = (tipo.isin(list(TIPO_REGISTRO_STYLE)) & inicio.notna() & fim.notna()).to_numpy()
+    if not valid.any():
+        return pd.DataFrame(columns=GANTT_ITEM_COLUMNS)
+
+    df = df.loc[valid]
+    tipo = tipo.loc[valid]
+    inicio = inicio.loc[valid]
+    fim = fim.loc[valid]
+
+    epic_number = _text_column(df['EpicNumber'], 'Epic-0')
+    indicador = _text_column(df['IndicadorAndamentoEpico'], 'Verde')
+
+    styles = pd.DataFrame.from_dict(TIPO_REGISTRO_STYLE, orient='index')
+    color = tipo.map(styles['color'])
+    color = color.where(color.notna(), indicador.map(INDICADOR_COLORS).fillna(INDICADOR_COLOR_DEFAULT))
+
+    items = pd.DataFrame({
+        'Task': '  ' + tipo.map(styles['prefix']) + ': ' + epic_number + ' - ' + _sanitize_summary(df['EpicSummary']),
+        'Start': _format_dates(inicio),
+        'Finish': _format_dates(fim),
+        'Resource': _text_column(df['EpicEquipe'], 'Sem Equipe'),
+        'Complete': pd.to_numeric(df['TasksPercentualMedia'], errors='coerce').fillna(0.0).astype(float),
+        'Status': _text_column(df['EpicStatus'], 'Indefinido'),
+        'TipoRegistro': tipo,
+        'TipoDisplay': tipo.map(styles['display']),
+        'EpicNumber': epic_number,
+        'IndicadorAndamento': indicador,
+        'IndicadorDescricao': indicador.map(INDICADOR_DESCRICOES).fillna('Indefinido'),
+        'Color': color,
+        'Opacity': tipo.map(styles['opacity']).astype(float),
+        'Width': tipo.map(styles['width']).astype(np.int64)
+    })
+    return items.reset_index(drop=True)
+
+
+def gantt_date_range(items):
+    """Menor e maior data entre inícios e fins dos itens (None se não houver itens)"""
+    if items.empty:
+        return None, None
+    # Datas ISO: a ordem do texto é a ordem cronológica
+    datas = np.concatenate([items['Start'].to_numpy(), items['Finish'].to_numpy()])
+    return pd.Timestamp(datas.min()), pd.Timestamp(datas.max())
+
+
+# Campos do hover enviados em customdata (na ordem dos índices do hovertemplate)
+GANTT_HOVER_COLUMNS = ['Resource', 'Start', 'Finish', 'Complete', 'Status', 'IndicadorDescricao']
+
+
+def _hover_template(tipo_display):
+    return (
+        f"<b>{tipo_display}</b><br>"
+        "<b>%{y}</b><br>"
+        "Equipe: %{customdata[0]}<br>"
+        "Inicio: %{customdata[1]}<br>"
+        "Fim: %{customdata[2]}<br>"
+        "Progresso: %{customdata[3]}%<br>"
+        "Status: %{customdata[4]}<br>"
+        "Indicador: %{customdata[5]}<br>"
+        "<extra></extra>"
+    )
+
+
+def _segments(starts, ends):
+    """[início, fim, None] por barra: o None separa os segmentos dentro de um mesmo trace"""
+    out = np.empty(len(starts) * 3, dtype=object)
+    out[0::3] = starts
+    out[1::3] = ends
+    out[2::3] = None
+    return out.tolist()
+
+
+def build_gantt_traces(items, trace_type='scatter'):
+    """Traces do Gantt: um por tipo de registro e cor (não um por barra)
+
+    Cada barra é um segmento [início, fim] separado por None; o hover lê os
+    campos de customdata. trace_type 'scattergl' desenha com WebGL.
+    Retorna lista de dicts no formato de trace do Plotly.
+    """
+    traces = []
+    if items.empty:
+        return traces
+
+    for tipo, style in TIPO_REGISTRO_STYLE.items():
+        do_tipo = items[items['TipoRegistro'] == tipo]
+        if do_tipo.empty:
+            continue
+
+        show_legend = True
+        for color, grupo in do_tipo.groupby('Color', sort=False):
+            tasks = grupo['Task'].to_numpy(dtype=object)
+            hover = grupo[GANTT_HOVER_COLUMNS].to_numpy(dtype=object).tolist()
+
+            traces.append({
+                'type': trace_type,
+                'x': _segments(grupo['Start'].to_numpy(dtype=object), grupo['Finish'].to_numpy(dtype=object)),
+                'y': _segments(tasks, tasks),
+                'customdata': [value for row in hover for value in (row, row, None)],
+                'mode': 'lines',
+                'line': {'color': color, 'width': style['width']},
+                'opacity': style['opacity'],
+                'name': tipo,
+                'showlegend': show_legend,
+                'legendgroup': tipo.lower().replace(' ', '_').replace('.', ''),
+                'hovertemplate': _hover_template(style['display'])
+            })
+            # Legenda apenas uma vez por tipo
+            show_legend = False
+
+    return traces
+
+
+def build_gantt_layout(items, range_start, range_end, hoje):
+    """Layout do Gantt (eixos, legenda, linha de hoje) como dict simples do Plotly"""
+    x_range = [range_start.strftime('%Y-%m-%d'), range_end.strftime('%Y-%m-%d')]
+    return dict(
+        title={
+            'text': 'Roadmap de Epicos - Grafico de Gantt Agrupado<br><sub>Planejado PO | Planejado Time | Realizado (Indicadores por Cor)</sub>',
+            'x': 0.5,
+            'xanchor': 'center',
+            'font': {'size': 16}
+        },
+        
+        # Altura baseada no número de itens (considerando agrupamento)
+        height=max(800, len(items) * 30 + 200),
+        
+        # EIXO X PRINCIPAL (inferior)
+        xaxis=dict(
+            type='date',
+            tickformat='%d/%m/%Y',
+            dtick='M1',
+            tickmode='linear',
+            showgrid=True,
+            gridcolor='lightgray',
+            gridwidth=1,
+            tickangle=45,
+            tickfont=dict(size=11),
+            side='bottom',
+            showline=True,
+            linewidth=2,
+            linecolor='black',
+            title=dict(text='Data', font=dict(size=14)),
+            autorange=False,
+            range=x_range
+        ),
+        
+        # EIXO X SUPERIOR
+        xaxis2=dict(
+            type='date',
+            tickformat='%b/%Y',
+            dtick='M1',
+            tickmode='linear',
+            showgrid=False,
+            tickangle=0,
+            tickfont=dict(size=12, color='blue'),
+            side='top',
+            showline=True,
+            linewidth=2,
+            linecolor='blue',
+            overlaying='x',
+            matches='x',
+            title=dict(
+                text='Timeline Principal',
+                font=dict(size=14, color='blue')
+            ),
+            autorange=False,
+            range=x_range
+        ),
+        
+        # EIXO Y - Agrupado (ordem dos itens, independente da ordem dos traces)
+        yaxis=dict(
+            autorange='reversed',
+            categoryorder='array',
+            categoryarray=items['Task'].tolist(),
+            showgrid=True,
+            gridcolor='lightgray',
+            gridwidth=1,
+            tickfont=dict(size=9),  # Fonte menor para comportar mais itens
+            side='left',
+            showline=True,
+            linewidth=2,
+            linecolor='black',
+            title=dict(text='Epicos por Tipo', font=dict(size=14))
+        ),
+        
+        # MARGENS OTIMIZADAS para agrupamento
+        margin=dict(l=480, r=50, t=180, b=120),
+        
+        # CORES E FONTES
+        plot_bgcolor='white',
+        paper_bgcolor='white',
+        font=dict(family="Arial, sans-serif", size=11),
+        
+        # LEGENDA HORIZONTAL
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="center",
+            x=0.5,
+            bgcolor="rgba(255,255,255,0.95)",
+            bordercolor="gray",
+            borderwidth=2,
+            font=dict(size=12)
+        ),
+        
+        showlegend=True,
+        hovermode='closest',
+        autosize=True,
+
+        # Linha vertical e anotação "HOJE"
+        shapes=[dict(
+            type="line",
+            x0=hoje,
+            x1=hoje,
+            y0=0,
+            y1=1,
+            yref="paper",
+            line=dict(
+                color="red",
+                width=3,
+                dash="dash"
+            )
+        )],
+        annotations=[dict(
+            x=hoje,
+            y=1.05,
+            yref="paper",
+            text="<b>HOJE</b>",
+            showarrow=False,
+            font=dict(color="red", size=12, family="Arial Black"),
+            bgcolor="rgba(255,255,255,0.9)",
+            bordercolor="red",
+            borderwidth=2
+        )]
+    )
+
+
+def build_gantt_figure(items, range_start, range_end, hoje, trace_type='scatter'):
+    """Figura completa ({'data', 'layout'}) pronta para Plotly.newPlot, sem plotly no servidor"""
+    return {
+        'data': build_gantt_traces(items, trace_type),
+        'layout': build_gantt_layout(items, range_start, range_end, hoje)
+    }
+
+
+# Modo WebGL (scattergl): usado automaticamente a partir deste número de linhas
+GANTT_WEBGL_MIN_ROWS = int(os.environ.get('GANTT_WEBGL_MIN_ROWS', 2000))
+
+
+def gantt_trace_type(render, total_rows):
+    """Tipo de trace para o modo pedido: 'svg', 'webgl' ou 'auto' (WebGL acima de GANTT_WEBGL_MIN_ROWS)"""
+    if render == 'webgl' or (render == 'auto' and total_rows >= GANTT_WEBGL_MIN_ROWS):
+        return 'scattergl'
+    return 'scatter'
+
+
+# Gantt em janelas: altura fixa do gráfico e linhas visíveis na abertura
+GANTT_WINDOW_HEIGHT = 900
+GANTT_WINDOW_VISIBLE_ROWS = 25
+
+
+def clip_gantt_window(rows, janela_inicio=None, janela_fim=None):
+    """Barras de uma janela de linhas do Gantt (já paginada pela consulta)
+
+    A janela de datas (YYYY-MM-DD) só descarta barras fora do intervalo; as linhas
+    continuam na mesma posição. Retorna (itens com barras visíveis, nomes das linhas).
+    """
+    tasks = rows['Task'].tolist()
+
+    visible = np.ones(len(rows), dtype=bool)
+    if janela_inicio:
+        visible &= rows['Finish'].to_numpy(dtype=object) >= janela_inicio
+    if janela_fim:
+        visible &= rows['Start'].to_numpy(dtype=object) <= janela_fim
+    return rows[visible], tasks
+
+
+def build_gantt_window_figure(items, tasks, range_start, range_end, hoje, trace_type='scatter'):
+    """Figura de uma janela de linhas: altura fixa e eixo Y mostrando as primeiras linhas"""
+    figure = build_gantt_figure(items, range_start, range_end, hoje, trace_type)
+    layout = figure['layout']
+    layout['height'] = GANTT_WINDOW_HEIGHT
+    layout['dragmode'] = 'pan'
+    visible_rows = max(1, min(GANTT_WINDOW_VISIBLE_ROWS, len(tasks)))
+    layout['yaxis'].update(
+        categoryarray=tasks,
+        autorange=False,
+        range=[visible_rows - 0.5, -0.5]  # Invertido: primeira linha no topo
+    )
+    return figure
+
+
+# Nível de detalhe: acima deste número de épicos o Gantt abre com uma barra por equipe
+GANTT_LOD_MAX_EPICOS = 300
+
+# Gravidade do indicador (o resumo da equipe usa o pior)
+INDICADOR_GRAVIDADE = {'Verde': 0, 'Amarelo': 1, 'Vermelho': 2}
+INDICADOR_POR_GRAVIDADE = {gravidade: indicador for indicador, gravidade in INDICADOR_GRAVIDADE.items()}
+
+GANTT_TEAM_HOVER_COLUMNS = ['Resource', 'Start', 'Finish', 'Complete', 'Epicos', 'IndicadorDescricao']
+
+
+def build_gantt_team_summary(items):
+    """Uma barra por equipe: menor início, maior fim, progresso ponderado e pior indicador
+
+    O progresso de cada item é ponderado pela duração (dias) da barra.
+    """
+    if items.empty:
+        return pd.DataFrame(columns=['Task'] + GANTT_TEAM_HOVER_COLUMNS + ['IndicadorAndamento', 'Color'])
+
+    start = items['Start'].to_numpy(dtype='datetime64[D]')
+    finish = items['Finish'].to_numpy(dtype='datetime64[D]')
+    dias = np.maximum((finish - start).astype(np.int64) + 1, 1)
+
+    grouped = pd.DataFrame({
+        'Resource': items['Resource'].to_numpy(),
+        'Start': items['Start'].to_numpy(),
+        'Finish': items['Finish'].to_numpy(),
+        'Peso': dias,
+        'Progresso': items['Complete'].to_numpy(dtype=float) * dias,
+        'EpicNumber': items['EpicNumber'].to_numpy(),
+        'Gravidade': items['IndicadorAndamento'].map(INDICADOR_GRAVIDADE).fillna(-1).to_numpy(dtype=np.int64)
+    }).groupby('Resource', sort=True).agg(
+        Start=('Start', 'min'),
+        Finish=('Finish', 'max'),
+        Peso=('Peso', 'sum'),
+        Progresso=('Progresso', 'sum'),
+        Epicos=('EpicNumber', 'nunique'),
+        Gravidade=('Gravidade', 'max')
+    ).reset_index()
+
+    indicador = grouped['Gravidade'].map(INDICADOR_POR_GRAVIDADE).fillna('Indefinido')
+    grouped['Complete'] = (grouped['Progresso'] / grouped['Peso']).round(2)
+    grouped['IndicadorAndamento'] = indicador
+    grouped['IndicadorDescricao'] = indicador.map(INDICADOR_DESCRICOES).fillna('Indefinido')
+    grouped['Color'] = indicador.map(INDICADOR_COLORS).fillna(INDICADOR_COLOR_DEFAULT)
+    grouped['Task'] = '👥 ' + grouped['Resource'] + ' (' + grouped['Epicos'].astype(str) + ' épicos)'
+
+    return grouped[['Task'] + GANTT_TEAM_HOVER_COLUMNS + ['IndicadorAndamento', 'Color']]
+
+
+def build_gantt_team_traces(summary):
+    """Traces do resumo por equipe (um por cor do indicador); customdata[0] é a equipe"""
+    traces = []
+    for color, grupo in summary.groupby('Color', sort=False):
+        tasks = grupo['Task'].to_numpy(dtype=object)
+        hover = grupo[GANTT_TEAM_HOVER_COLUMNS].to_numpy(dtype=object).tolist()
+        traces.append({
+            'type': 'scatter',
+            'x': _segments(grupo['Start'].to_numpy(dtype=object), grupo['Finish'].to_numpy(dtype=object)),
+            'y': _segments(tasks, tasks),
+            'customdata': [value for row in hover for value in (row, row, None)],
+            'mode': 'lines',
+            'line': {'color': color, 'width': 30},
+            'name': 'Resumo da equipe',
+            'showlegend': False,
+            'hovertemplate': (
+                "<b>%{customdata[0]}</b><br>"
+                "Inicio: %{customdata[1]}<br>"
+                "Fim: %{customdata[2]}<br>"
+                "Progresso ponderado: %{customdata[3]}%<br>"
+                "Epicos: %{customdata[4]}<br>"
+                "Pior indicador: %{customdata[5]}<br>"
+                "<i>Clique para ver os épicos</i>"
+                "<extra></extra>"
+            )
+        })
+    return traces
+
+
+def build_gantt_team_figure(summary, range_start, range_end, hoje):
+    """Figura do Gantt resumido por equipe"""
+    layout = build_gantt_layout(summary, range_start, range_end, hoje)
+    layout['height'] = max(500, len(summary) * 45 + 300)
+    layout['title']['text'] = 'Roadmap por Equipe<br><sub>Barra resumo por equipe (cor = pior indicador) - clique para expandir</sub>'
+    layout['yaxis']['title']['text'] = 'Equipes'
+    layout['margin']['l'] = 300
+    return {
+        'data': build_gantt_team_traces(summary),
+        'layout': layout
+    }
@@ -0,0 +1,76 @@
+import json
+import base64
+import pandas as pd
+
+# Paginação por chave (keyset) das tabelas de épicos, subtasks e MANs: a próxima página
+# começa depois dos valores de ordenação do último registro, sem OFFSET.
+
+
+def encode_page_cursor(values):
+    """Cursor opaco da paginação por chave (valores de ordenação do último registro)"""
+    return base64.urlsafe_b64encode(json.dumps(values, default=str).encode('utf-8')).decode('ascii')
+
+
+def decode_page_cursor(cursor):
+    """Valores de ordenação a partir do cursor recebido (None se vazio/inválido)"""
+    if not cursor:
+        return None
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')).decode('utf-8'))
+        return values if isinstance(values, list) else None
+    except Exception:
+        return None
+
+
+def keyset_condition(order_columns, last_values):
+    """Condição SQL para os registros depois de last_values na ordenação informada
+
+    order_columns: lista de (coluna, 'ASC'|'DESC'). Segue a ordenação do SQL Server
+    (NULL primeiro em ASC, por último em DESC). Retorna (sql, params).
+    """
+    clauses = []
+    params = []
+    for i, (col, direction) in enumerate(order_columns):
+        parts = []
+        clause_params = []
+        for j, (prev_col, _) in enumerate(order_columns[:i]):
+            prev_value = last_values[j]
+            if prev_value is None:
+                parts.append(f"{prev_col} IS NULL")
+            else:
+                parts.append(f"{prev_col} = ?")
+                clause_params.append(prev_value)
+
+        value = last_values[i]
+        if direction == 'DESC':
+            if value is None:
+                continue  # Nada vem depois de NULL em ordem decrescente
+            parts.append(f"({col} < ? OR {col} IS NULL)")
+            clause_params.append(value)
+        elif value is None:
+            parts.append(f"{col} IS NOT NULL")
+        else:
+            parts.append(f"{col} > ?")
+            clause_params.append(value)
+
+        clauses.append('(' + ' AND '.join(parts) + ')')
+        params.extend(clause_params)
+
+    if not clauses:
+        return '1 = 0', []
+    return '(' + ' OR '.join(clauses) + ')', params
+
+
+def page_cursor_values(row, order_columns):
+    """Valores de ordenação do último registro da página, prontos para o cursor"""
+    values = []
+    for col, _ in order_columns:
+        value = row[col]
+        if pd.isna(value):
+            value = None
+        elif isinstance(value, pd.Timestamp):
+            value = value.strftime('%Y-%m-%dT%H:%M:%S.%f')[:-3]  # ISO 8601: independe do DATEFORMAT
+        elif hasattr(value, 'item'):
+            value = value.item()
+        values.append(value)
+    return values
@@ -0,0 +1,266 @@
+import numpy as np
+import pandas as pd
+from time_buckets import GRANULARIDADE_PADRAO, bucket_labels, bucket_start, fill_buckets
+
+# Colunas do conjunto de épicos usado por todos os indicadores do dashboard
+EPIC_KPI_COLUMNS = [
+    'EpicEquipe',
+    'EpicStatus',
+    'EpicInicioPlanejado',
+    'EpicDueDate',
+    'TasksPercentualMedia'
+]
+
+STATUS_CONCLUIDO = ['Done']
+STATUS_EM_ANDAMENTO = ['In Progress', 'Development', 'In Review']
+STATUS_FINALIZADO = ['Done', 'Closed']
+STATUS_REALIZADO_TIMELINE = ['Done', 'Closed', 'Concluído']
+
+DIAS_PROXIMO_PRAZO = 7
+DIAS_BAIXO_PROGRESSO = 15
+PERCENTUAL_BAIXO_PROGRESSO = 30
+
+
+def prepare_epic_frame(df):
+    """Normalizar tipos do conjunto de épicos (datas, percentual e status)"""
+    df = df.copy()
+    df['EpicInicioPlanejado'] = pd.to_datetime(df['EpicInicioPlanejado'], errors='coerce')
+    df['EpicDueDate'] = pd.to_datetime(df['EpicDueDate'], errors='coerce')
+    df['TasksPercentualMedia'] = pd.to_numeric(df['TasksPercentualMedia'], errors='coerce').fillna(0.0).astype(float)
+    return df
+
+
+def _epic_masks(df, now):
+    """Máscaras booleanas reutilizadas pelos indicadores (equivalentes aos CASE WHEN do SQL)"""
+    status = df['EpicStatus']
+    # NOT IN do SQL é falso para status NULL
+    nao_finalizado = status.notna() & ~status.isin(STATUS_FINALIZADO)
+    due = df['EpicDueDate']
+
+    return {
+        'concluido': status.isin(STATUS_CONCLUIDO).to_numpy(),
+        'em_andamento': status.isin(STATUS_EM_ANDAMENTO).to_numpy(),
+        'atrasado': ((due < now) & nao_finalizado).to_numpy(),
+        'proximo_prazo': ((due >= now) & (due <= now + pd.Timedelta(days=DIAS_PROXIMO_PRAZO)) & nao_finalizado).to_numpy(),
+        'baixo_progresso': (
+            (df['TasksPercentualMedia'].round(2) < PERCENTUAL_BAIXO_PROGRESSO)
+            & (df['EpicInicioPlanejado'] < now - pd.Timedelta(days=DIAS_BAIXO_PROGRESSO))
+            & nao_finalizado
+        ).to_numpy(),
+        'realizado_timeline': status.isin(STATUS_REALIZADO_TIMELINE).to_numpy()
+    }
+
+
+def compute_epic_stats(df, now=None, masks=None):
+    """Totais do dashboard (cards e alertas)"""
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    masks = _epic_masks(df, now) if masks is None else masks
+    total = int(len(df))
+
+    return {
+        'total_epicos': total,
+        'epicos_concluidos': int(masks['concluido'].sum()),
+        'epicos_em_andamento': int(masks['em_andamento'].sum()),
+        'epicos_atrasados': int(masks['atrasado'].sum()),
+        'percentual_medio': float(df['TasksPercentualMedia'].mean()) if total else 0,
+        'epicos_proximo_prazo': int(masks['proximo_prazo'].sum()),
+        'epicos_baixo_progresso': int(masks['baixo_progresso'].sum())
+    }
+
+
+def compute_epic_equipes(df, masks):
+    """Indicadores por equipe, ordenados pela quantidade de épicos"""
+    if df.empty:
+        return []
+
+    grouped = pd.DataFrame({
+        'EpicEquipe': df['EpicEquipe'].fillna('Sem Equipe').to_numpy(),
+        'quantidade': np.ones(len(df), dtype=np.int64),
+        'percentual_medio': df['TasksPercentualMedia'].to_numpy(),
+        'concluidos': masks['concluido'].astype(np.int64),
+        'atrasados': masks['atrasado'].astype(np.int64)
+    }).groupby('EpicEquipe', sort=False).agg(
+        quantidade=('quantidade', 'sum'),
+        percentual_medio=('percentual_medio', 'mean'),
+        concluidos=('concluidos', 'sum'),
+        atrasados=('atrasados', 'sum')
+    ).reset_index()
+
+    grouped = grouped.sort_values('quantidade', ascending=False, kind='stable')
+    return grouped.to_dict('records')
+
+
+def compute_status_distribution(df):
+    """Distribuição de épicos por status"""
+    if df.empty:
+        return []
+
+    counts = df['EpicStatus'].fillna('Indefinido').value_counts(sort=True)
+    return [{'status': status, 'quantidade': int(quantidade)} for status, quantidade in counts.items()]
+
+
+def compute_timeline(df, masks, granularidade=GRANULARIDADE_PADRAO, inicio=None, fim=None):
+    """Planejado x realizado por período de início planejado (períodos vazios com zero)"""
+    valid = df['EpicInicioPlanejado'].notna().to_numpy()
+    if not valid.any():
+        return {'meses': [], 'planejado': [], 'realizado': [], 'granularidade': granularidade}
+
+    timeline = fill_buckets(pd.DataFrame({
+        'Periodo': df['EpicInicioPlanejado'].to_numpy()[valid],
+        'Total': np.ones(int(valid.sum()), dtype=np.int64),
+        'Realizados': masks['realizado_timeline'][valid].astype(np.int64)
+    }), 'Periodo', granularidade, inicio, fim)
+
+    return {
+        'meses': bucket_labels(timeline.index, granularidade),
+        'planejado': timeline['Total'].astype(int).tolist(),
+        'realizado': timeline['Realizados'].astype(int).tolist(),
+        'granularidade': granularidade
+    }
+
+
+def compute_dashboard_kpis(df, now=None, granularidade=GRANULARIDADE_PADRAO, inicio=None, fim=None):
+    """Calcular todos os widgets do dashboard a partir de um único conjunto de épicos
+
+    granularidade, inicio e fim valem para a timeline (período exibido).
+    """
+    now = pd.Timestamp.now() if now is None else pd.Timestamp(now)
+    df = prepare_epic_frame(df)
+    masks = _epic_masks(df, now)
+
+    return {
+        'stats': compute_epic_stats(df, now, masks),
+        'equipes': compute_epic_equipes(df, masks),
+        'status_distribution': compute_status_distribution(df),
+        'timeline': compute_timeline(df, masks, granularidade, inicio, fim)
+    }
+
+
+# ===============================
+# MANs (BI_Jira_US, Project = 'MAN')
+# ===============================
+
+TOP_EQUIPES_MIN_MANS = 5
+TOP_EQUIPES_LIMIT = 5
+
+
+def _sql_sort_key(values):
+    # Ordenação de texto sem distinção de maiúsculas, como o collation do SQL Server
+    return values.str.lower()
+
+
+def _mans_equipe(df):
+    return df['Equipe'].astype(object).where(df['Equipe'].notna(), 'Sem Equipe')
+
+
+def _mans_masks(df, granularidade=GRANULARIDADE_PADRAO):
+    resolvida = df['ResolutionDate'].notna()
+    periodo_criacao = bucket_start(df['Created'], granularidade)
+    mesmo_periodo = resolvida.to_numpy() & (bucket_start(df['ResolutionDate'], granularidade) == periodo_criacao)
+    return resolvida, mesmo_periodo, periodo_criacao
+
+
+def compute_mans_backlog(df):
+    """Abertas, fechadas e saldo por equipe (mesmo resultado da consulta de backlog)"""
+    if df.empty:
+        return {'equipes': [], 'abertas': [], 'fechadas': [], 'saldo': []}
+
+    resolvida = df['ResolutionDate'].notna()
+    grouped = pd.DataFrame({
+        'Equipe': _mans_equipe(df).to_numpy(),
+        'TotalAbertas': np.ones(len(df), dtype=np.int64),
+        'TotalFechadas': resolvida.to_numpy().astype(np.int64)
+    }).groupby('Equipe', sort=False).sum().reset_index()
+    grouped = grouped.sort_values('Equipe', key=_sql_sort_key, kind='stable')
+
+    return {
+        'equipes': grouped['Equipe'].tolist(),
+        'abertas': grouped['TotalAbertas'].astype(int).tolist(),
+        'fechadas': grouped['TotalFechadas'].astype(int).tolist(),
+        'saldo': (grouped['TotalAbertas'] - grouped['TotalFechadas']).astype(int).tolist()
+    }
+
+
+def compute_mans_tendencia(df, granularidade=GRANULARIDADE_PADRAO, inicio=None, fim=None):
+    """Abertas x fechadas no mesmo período, por período de criação (períodos vazios com zero)"""
+    if df.empty:
+        return {'meses': [], 'abertas': [], 'fechadas': [], 'granularidade': granularidade}
+
+    _, mesmo_periodo, periodo_criacao = _mans_masks(df, granularidade)
+    grouped = fill_buckets(pd.DataFrame({
+        'Periodo': periodo_criacao,
+        'TotalAbertas': np.ones(len(df), dtype=np.int64),
+        'FechadasNoMesmo': mesmo_periodo.astype(np.int64)
+    }), 'Periodo', granularidade, inicio, fim)
+
+    return {
+        'meses': bucket_labels(grouped.index, granularidade),
+        'abertas': grouped['TotalAbertas'].astype(int).tolist(),
+        'fechadas': grouped['FechadasNoMesmo'].astype(int).tolist(),
+        'granularidade': granularidade
+    }
+
+
+def compute_mans_equipe_mes(df, granularidade=GRANULARIDADE_PADRAO):
+    """Registros por equipe e período de criação (gráfico detalhado)"""
+    if df.empty:
+        return []
+
+    resolvida, mesmo_periodo, periodo_criacao = _mans_masks(df, granularidade)
+    grouped = pd.DataFrame({
+        'Equipe': _mans_equipe(df).to_numpy(),
+        'MesAno': periodo_criacao,
+        'TotalAbertas': np.ones(len(df), dtype=np.int64),
+        'FechadasNoMesmo': mesmo_periodo.astype(np.int64),
+        'TotalFechadas': resolvida.to_numpy().astype(np.int64)
+    }).groupby(['Equipe', 'MesAno'], sort=False).sum().reset_index()
+    grouped = grouped.sort_values(['Equipe', 'MesAno'], key=lambda values: (
+        _sql_sort_key(values) if values.name == 'Equipe' else values), kind='stable')
+    grouped['MesAno'] = bucket_labels(grouped['MesAno'], granularidade)
+
+    return grouped.to_dict('records')
+
+
+def compute_mans_top_equipes(df, min_mans=TOP_EQUIPES_MIN_MANS, limit=TOP_EQUIPES_LIMIT):
+    """Equipes com maior taxa de resolução (desempate: menor tempo médio)"""
+    if df.empty:
+        return []
+
+    created = pd.to_datetime(df['Created'])
+    resolution = pd.to_datetime(df['ResolutionDate'])
+    # DATEDIFF(day, ...) conta viradas de dia
+    dias = (resolution.dt.normalize() - created.dt.normalize()).dt.days
+
+    grouped = pd.DataFrame({
+        'equipe': _mans_equipe(df).to_numpy(),
+        'total_mans': np.ones(len(df), dtype=np.int64),
+        'resolvidas': resolution.notna().to_numpy().astype(np.int64),
+        'dias': dias.to_numpy()
+    }).groupby('equipe', sort=False).agg(
+        total_mans=('total_mans', 'sum'),
+        resolvidas=('resolvidas', 'sum'),
+        tempo_medio=('dias', 'mean')
+    ).reset_index()
+
+    grouped = grouped[grouped['total_mans'] >= min_mans]
+    grouped['taxa_resolucao'] = grouped['resolvidas'] * 100.0 / grouped['total_mans']
+    # AVG de inteiros no SQL Server descarta a parte fracionária
+    grouped['tempo_medio'] = np.trunc(grouped['tempo_medio'])
+    grouped = grouped.sort_values(['taxa_resolucao', 'tempo_medio'], ascending=[False, True],
+                                  na_position='first', kind='stable').head(limit)
+
+    records = grouped[['equipe', 'total_mans', 'resolvidas', 'taxa_resolucao', 'tempo_medio']].to_dict('records')
+    for record in records:
+        if pd.isna(record['tempo_medio']):
+            record['tempo_medio'] = None
+    return records
+
+
+def compute_mans_periodo(df, periodo):
+    """Total e resolvidas de um período (uma linha da comparação atual x anterior)"""
+    total = int(len(df))
+    return {
+        'periodo': periodo,
+        'total_mans': total,
+        'resolvidas': int(df['ResolutionDate'].notna().sum())
+    }
@@ -0,0 +1,230 @@
+import os
+import re
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+from data_version import BI_TABLES
+from query_cache import TABLE_PATTERN
+
+try:
+    import duckdb  # Réplica local das tabelas BI (opcional)
+except ImportError:
+    duckdb = None
+
+# 'on': consultas das rotas leem a réplica local; 'off': sempre o SQL Server
+REPLICA_MODE = os.environ.get('BI_REPLICA', 'off').strip().lower()
+REPLICA_PATH = os.environ.get(
+    'BI_REPLICA_PATH',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'bi_replica.duckdb')
+)
+
+# Equivalentes DuckDB das funções T-SQL usadas pelas rotas
+REPLICA_MACROS = (
+    """CREATE OR REPLACE MACRO tsql_dateadd(part, n, d) AS CASE lower(part)
+        WHEN 'day' THEN d + to_days(CAST(n AS INTEGER))
+        WHEN 'week' THEN d + to_days(CAST(n AS INTEGER) * 7)
+        WHEN 'month' THEN d + to_months(CAST(n AS INTEGER))
+        WHEN 'year' THEN d + to_years(CAST(n AS INTEGER))
+    END""",
+)
+# Ordenação igual à do SQL Server (NULL é o menor valor) e divisão inteira entre inteiros
+REPLICA_SETTINGS = (
+    "SET default_null_order = 'nulls_first_on_asc_last_on_desc'",
+    "SET integer_division = true",
+)
+
+FORMAT_TOKENS = {'yyyy': '%Y', 'MM': '%m', 'dd': '%d', 'HH': '%H', 'mm': '%M', 'ss': '%S'}
+FORMAT_TOKEN_PATTERN = re.compile('|'.join(FORMAT_TOKENS))
+FORMAT_CALL_PATTERN = re.compile(r"\bFORMAT\(\s*([\w.]+)\s*,\s*'([^']*)'\s*\)", re.IGNORECASE)
+TOP_PATTERN = re.compile(r'^\s*SELECT\s+TOP\s*\(?\s*(\d+)\s*\)?', re.IGNORECASE)
+OFFSET_FETCH_PATTERN = re.compile(r'\bOFFSET\s+(\d+)\s+ROWS\s+FETCH\s+(?:NEXT|FIRST)\s+(\d+)\s+ROWS\s+ONLY\b',
+                                  re.IGNORECASE)
+DATE_PARAM_PATTERN = re.compile(r'^\d{4}-\d{2}-\d{2}([ T]\d{2}:\d{2}(:\d{2}(\.\d+)?)?)?$')
+
+
+class UnsupportedQuery(Exception):
+    """Consulta T-SQL sem tradução para a réplica (segue para o SQL Server)"""
+
+
+# Falhas da réplica em que a consulta segue para o SQL Server
+REPLICA_FALLBACK_ERRORS = (UnsupportedQuery, duckdb.Error) if duckdb is not None else (UnsupportedQuery,)
+
+
+def translate_tsql(query):
+    """Reescrever em SQL DuckDB os recursos T-SQL usados pelas consultas das rotas
+
+    Cobre ISNULL, GETDATE, DATEADD/DATEDIFF/DATEPART, DATEFROMPARTS, FORMAT de
+    datas, SELECT TOP no nível externo, OFFSET/FETCH e LIKE (sem distinção de
+    maiúsculas, como o collation do SQL Server). Qualquer outro uso de TOP
+    levanta UnsupportedQuery para a consulta seguir para o SQL Server.
+    """
+    sql = query.strip().rstrip(';')
+
+    limit = None
+    match = TOP_PATTERN.match(sql)
+    if match:
+        limit = int(match.group(1))
+        sql = 'SELECT ' + sql[match.end():].lstrip()
+    if re.search(r'\bTOP\b', sql, re.IGNORECASE):
+        raise UnsupportedQuery('TOP em subconsulta')
+
+    sql = re.sub(r'\bISNULL\s*\(', 'COALESCE(', sql, flags=re.IGNORECASE)
+    sql = re.sub(r'\bGETDATE\s*\(\s*\)', 'CAST(current_localtimestamp() AS TIMESTAMP)', sql, flags=re.IGNORECASE)
+    sql = re.sub(r'\bDATEDIFF\s*\(\s*(\w+)\s*,', r"date_diff('\1',", sql, flags=re.IGNORECASE)
+    sql = re.sub(r'\bDATEADD\s*\(\s*(\w+)\s*,', r"tsql_dateadd('\1',", sql, flags=re.IGNORECASE)
+    sql = re.sub(r'\bDATEPART\s*\(\s*(\w+)\s*,', r"date_part('\1',", sql, flags=re.IGNORECASE)
+    sql = re.sub(r'\bDATEFROMPARTS\s*\(', 'make_date(', sql, flags=re.IGNORECASE)
+    sql = FORMAT_CALL_PATTERN.sub(
+        lambda m: f"strftime({m.group(1)}, '{FORMAT_TOKEN_PATTERN.sub(lambda t: FORMAT_TOKENS[t.group(0)], m.group(2))}')",
+        sql
+    )
+    sql = OFFSET_FETCH_PATTERN.sub(r'LIMIT \2 OFFSET \1', sql)
+    sql = re.sub(r'\bLIKE\s+\?', r"ILIKE ? ESCAPE '\\'", sql, flags=re.IGNORECASE)
+
+    if limit is not None:
+        sql += f"\nLIMIT {limit}"
+    return sql
+
+
+def bind_param(value):
+    """Parâmetro pyodbc -> DuckDB: datas em texto viram datetime e padrões LIKE perdem os colchetes"""
+    if not isinstance(value, str):
+        return value
+    if DATE_PARAM_PATTERN.match(value):
+        return pd.Timestamp(value).to_pydatetime()
+    if len(value) > 1 and value.startswith('%') and value.endswith('%'):
+        # Padrão de sql_like_pattern: curingas escapados como [%], [_] e [[]
+        inner = value[1:-1].replace('\\', '\\\\')
+        inner = inner.replace('[%]', '\\%').replace('[_]', '\\_').replace('[[]', '[')
+        return f"%{inner}%"
+    return value
+
+
+class LocalReplica:
+    """Cópia local (DuckDB) das tabelas BI para leitura sem ida ao SQL Server
+
+    sync() lê as tabelas inteiras do SQL Server e troca o conteúdo local numa
+    única transação. read_sql() executa a consulta T-SQL traduzida contra a
+    cópia. Com BI_REPLICA=off, sem duckdb instalado ou antes da primeira
+    sincronização, serves() retorna False e tudo segue para o SQL Server.
+    """
+    def __init__(self, db_manager, path=REPLICA_PATH, mode=REPLICA_MODE):
+        self.db_manager = db_manager
+        self.path = path
+        self.enabled = mode == 'on' and duckdb is not None
+
+        self._con = None
+        self._tables = {}           # tabela -> (linhas, sincronizada_em)
+        self._lock = threading.Lock()
+
+        self.reads = 0
+        self.fallbacks = 0
+        self.last_error = None
+
+    def _connection(self):
+        if self._con is None:
+            self._con = duckdb.connect(self.path)
+            for statement in REPLICA_MACROS:
+                self._con.execute(statement)
+            existing = {row[0] for row in self._con.execute(
+                "SELECT table_name FROM information_schema.tables WHERE table_schema = 'main'").fetchall()}
+            for table in BI_TABLES:
+                if table in existing:
+                    rows = self._con.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    self._tables[table] = (rows, None)
+        return self._con
+
+    def open(self):
+        """Abrir a cópia já existente em disco (permite servir leituras antes da primeira sincronização)"""
+        if not self.enabled:
+            return False
+        with self._lock:
+            self._connection()
+        return bool(self._tables)
+
+    def sync(self, tables=None):
+        """Copiar as tabelas do SQL Server para a réplica (todas ou as informadas)"""
+        if not self.enabled:
+            return {}
+        tables = [table for table in (tables or BI_TABLES) if table in BI_TABLES]
+
+        started = time.monotonic()
+        frames = {}
+        with self.db_manager.connection() as conn:
+            for table in tables:
+                df = self.db_manager.fetch_columns(conn, f"SELECT * FROM {table}", table=table)
+                # Categóricos viram texto: o DuckDB os criaria como ENUM
+                categorical = [name for name, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+                if categorical:
+                    df[categorical] = df[categorical].astype(object)
+                frames[table] = df
+
+        with self._lock:
+            con = self._connection()
+            con.execute('BEGIN TRANSACTION')
+            try:
+                for table, df in frames.items():
+                    con.register('replica_snapshot', df)
+                    con.execute(f"CREATE OR REPLACE TABLE {table} AS SELECT * FROM replica_snapshot")
+                    con.unregister('replica_snapshot')
+                con.execute('COMMIT')
+            except Exception:
+                con.execute('ROLLBACK')
+                raise
+            synced_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            for table, df in frames.items():
+                self._tables[table] = (len(df), synced_at)
+
+        print(f"Réplica local sincronizada ({', '.join(tables)}) em {time.monotonic() - started:.1f}s")
+        return {table: len(df) for table, df in frames.items()}
+
+    def serves(self, query):
+        """True se a consulta pode ser lida da réplica (todas as tabelas citadas sincronizadas)"""
+        if not self.enabled or not self._tables:
+            return False
+        synced = {table.lower() for table in self._tables}
+        tables = {table.lower() for table in TABLE_PATTERN.findall(query)}
+        return bool(tables) and tables <= synced
+
+    def read_sql(self, query, params=None):
+        """Executar na réplica uma consulta escrita para o SQL Server; retorna DataFrame"""
+        sql = translate_tsql(query)
+        cursor = self._connection().cursor()
+        try:
+            for statement in REPLICA_SETTINGS:
+                cursor.execute(statement)
+            df = cursor.execute(sql, [bind_param(value) for value in (params or [])]).df()
+        finally:
+            cursor.close()
+        self.reads += 1
+        return df
+
+    def loader(self, fallback):
+        """Loader do QueryCache: réplica quando possível, senão a leitura original no SQL Server
+
+        Só consultas sem tradução e erros do DuckDB voltam para o SQL Server;
+        outras exceções (erros de programação) sobem para a rota.
+        """
+        def load(query, conn, params):
+            if self.serves(query):
+                try:
+                    return self.read_sql(query, params)
+                except REPLICA_FALLBACK_ERRORS as e:
+                    self.fallbacks += 1
+                    self.last_error = str(e)
+            return fallback(query, conn, params)
+        return load
+
+    def status(self):
+        """Resumo da réplica para logs/diagnóstico"""
+        return {
+            'ativa': self.enabled,
+            'duckdb_instalado': duckdb is not None,
+            'arquivo': self.path,
+            'tabelas': {table: {'linhas': rows, 'sincronizada_em': synced_at}
+                        for table, (rows, synced_at) in self._tables.items()},
+            'leituras': self.reads,
+            'fallbacks': self.fallbacks,
+            'ultimo_erro': self.last_error
+        }
@@ -0,0 +1,140 @@
+import os
+import threading
+import time
+from datetime import datetime
+import pandas as pd
+from sql_filters import SEM_EQUIPE
+
+MANS_TABLE = 'BI_Jira_US'
+MANS_WHERE = "Project = 'MAN'"
+MANS_STORE_KEY = 'ID'
+MANS_RECONCILE_INTERVAL = int(os.environ.get('MANS_RECONCILE_INTERVAL', 3600))  # Conferência de exclusões (s)
+MANS_ID_BATCH = 500  # IDs por consulta ao buscar linhas ausentes na conferência
+
+
+class MansStore:
+    """MANs em memória, mantidas em dia por sincronização incremental
+
+    A primeira sincronização lê todas as MANs; as seguintes trazem apenas as
+    linhas com Updated >= última marca d'água e as mesclam pela chave (ID).
+    Exclusões (e linhas sem Updated) são conferidas periodicamente comparando
+    os IDs do servidor com os locais, ou na hora se a contagem divergir.
+    O DataFrame nunca é alterado no lugar: cada sincronização publica um novo.
+    """
+    def __init__(self, db_manager, key=MANS_STORE_KEY, reconcile_interval=MANS_RECONCILE_INTERVAL):
+        self.db_manager = db_manager
+        self.key = key
+        self.reconcile_interval = reconcile_interval
+
+        self._df = None
+        self._watermark = None
+        self._reconciled_at = 0.0
+        self._lock = threading.Lock()
+
+        self.full_loads = 0
+        self.delta_rows = 0
+        self.deleted_rows = 0
+        self.last_sync = None
+
+    @property
+    def ready(self):
+        return self._df is not None
+
+    def _read(self, conn, where, params=None):
+        query = f"SELECT * FROM {MANS_TABLE} WHERE {where}"
+        df = self.db_manager.fetch_columns(conn, query, params, table=MANS_TABLE)
+        # Categóricos viram objeto: lotes lidos em momentos diferentes têm dicionários diferentes
+        categorical = [name for name, dtype in df.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)]
+        if categorical:
+            df[categorical] = df[categorical].astype(object)
+        return df
+
+    @staticmethod
+    def _scalar_list(conn, query):
+        cursor = conn.cursor()
+        try:
+            cursor.execute(query)
+            return [row[0] for row in cursor.fetchall()]
+        finally:
+            cursor.close()
+
+    def _merge(self, df, delta):
+        if delta.empty:
+            return df
+        keep = ~df[self.key].isin(delta[self.key])
+        return pd.concat([df[keep], delta], ignore_index=True)
+
+    def _reconcile(self, conn, df):
+        """Remover MANs que saíram do servidor e buscar as que faltam localmente"""
+        server_ids = set(self._scalar_list(conn, f"SELECT {self.key} FROM {MANS_TABLE} WHERE {MANS_WHERE}"))
+        local_ids = df[self.key]
+
+        removed = ~local_ids.isin(server_ids)
+        if removed.any():
+            self.deleted_rows += int(removed.sum())
+            df = df[~removed].reset_index(drop=True)
+
+        missing = list(server_ids - set(local_ids))
+        for start in range(0, len(missing), MANS_ID_BATCH):
+            batch = missing[start:start + MANS_ID_BATCH]
+            placeholders = ', '.join('?' * len(batch))
+            df = self._merge(df, self._read(conn, f"{MANS_WHERE} AND {self.key} IN ({placeholders})", batch))
+
+        self._reconciled_at = time.monotonic()
+        return df
+
+    def sync(self):
+        """Carga inicial ou incremental; retorna a quantidade de linhas lidas do servidor"""
+        with self._lock:
+            with self.db_manager.connection() as conn:
+                if self._df is None:
+                    df = self._read(conn, MANS_WHERE)
+                    read_rows = len(df)
+                    self._reconciled_at = time.monotonic()
+                    self.full_loads += 1
+                else:
+                    delta = self._read(conn, f"{MANS_WHERE} AND Updated >= ?", [self._watermark])
+                    read_rows = len(delta)
+                    self.delta_rows += read_rows
+                    df = self._merge(self._df, delta)
+
+                    total = self._scalar_list(conn, f"SELECT COUNT(*) FROM {MANS_TABLE} WHERE {MANS_WHERE}")[0]
+                    if total != len(df) or time.monotonic() - self._reconciled_at >= self.reconcile_interval:
+                        df = self._reconcile(conn, df)
+
+            watermark = df['Updated'].max() if not df.empty else pd.NaT
+            if pd.notna(watermark):
+                self._watermark = pd.Timestamp(watermark).to_pydatetime()
+            elif self._watermark is None:
+                self._watermark = datetime(1900, 1, 1)
+
+            self._df = df
+            self.last_sync = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            return read_rows
+
+    def frame(self):
+        """Todas as MANs (cópia)"""
+        return self._df.copy()
+
+    def select(self, data_inicio, data_fim, equipe=None):
+        """MANs criadas entre as datas (Created BETWEEN), opcionalmente de uma equipe"""
+        df = self._df
+        created = df['Created']
+        mask = (created >= pd.Timestamp(data_inicio)) & (created <= pd.Timestamp(data_fim))
+        if equipe:
+            equipes = df['Equipe'].fillna('')
+            # Mesmo critério de SqlFilters.equals: o rótulo 'Sem Equipe' também seleciona as sem equipe
+            mask &= (equipes == equipe) | ((equipes == '') if equipe == SEM_EQUIPE else False)
+        return df[mask]
+
+    def status(self):
+        """Resumo do armazenamento para logs/diagnóstico"""
+        return {
+            'pronto': self.ready,
+            'linhas': 0 if self._df is None else int(len(self._df)),
+            'marca_dagua': self._watermark.strftime('%Y-%m-%d %H:%M:%S') if self._watermark else None,
+            'cargas_completas': self.full_loads,
+            'linhas_incrementais': self.delta_rows,
+            'linhas_excluidas': self.deleted_rows,
+            'ultima_sincronizacao': self.last_sync
+        }
@@ -0,0 +1,173 @@
+import os
+import json
+import threading
+import time
+from datetime import datetime
+
+PRECOMPUTE_INTERVAL = int(os.environ.get('PRECOMPUTE_INTERVAL', 900))  # Segundos entre ciclos completos
+
+# Respostas de erro (ex.: banco indisponível) não são guardadas
+ERROR_BODY_PREFIX = b'{"error"'
+
+
+class PrecomputedResult:
+    """Corpo JSON pronto + versão dos dados e dia em que foi calculado"""
+    def __init__(self, body, version, dia):
+        self.body = body
+        self.version = version
+        self.dia = dia
+
+
+class PrecomputeScheduler:
+    """Pré-cálculo em segundo plano das APIs de dashboard
+
+    routes: dict caminho -> tupla de (parâmetro, padrão) lidos pela rota; só
+    esses parâmetros formam a chave, então parâmetros ignorados pela rota não
+    impedem o aproveitamento.
+    combinations: função (scheduler) -> iterável de (caminho, dict de parâmetros)
+    com os filtros a pré-calcular, os mais usados primeiro.
+
+    Um resultado só é servido se a versão dos dados e o dia ainda forem os do
+    cálculo; caso contrário a requisição segue para a rota normalmente.
+    """
+    def __init__(self, app, data_versions, routes, combinations, interval=PRECOMPUTE_INTERVAL):
+        self.app = app
+        self.data_versions = data_versions
+        self.routes = routes
+        self.combinations = combinations
+        self.interval = interval
+
+        self._results = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._cycle_listeners = []
+
+        self.cycles = 0
+        self.last_cycle = None
+        self.last_duration = None
+        self.served = 0
+
+        data_versions.on_publish(self._on_data_changed)
+
+    @property
+    def running(self):
+        return self._thread is not None
+
+    def on_cycle(self, callback):
+        """Registrar função callback(versao) chamada ao fim de cada ciclo"""
+        self._cycle_listeners.append(callback)
+
+    def make_key(self, path, args):
+        """Chave do resultado (None se a rota não é pré-calculada)"""
+        params = self.routes.get(path)
+        if params is None:
+            return None
+        return (path,) + tuple((args.get(name) or default).strip() for name, default in params)
+
+    def render(self, path, args):
+        """Executar a rota fora de uma requisição real: (status, corpo)"""
+        adapter = self.app.url_map.bind('localhost')
+        endpoint, view_args = adapter.match(path)
+        with self.app.test_request_context(path, query_string=args):
+            response = self.app.make_response(self.app.view_functions[endpoint](**view_args))
+            return response.status_code, response.get_data()
+
+    def fetch_json(self, path, args=None):
+        """Resultado JSON de uma rota (ex.: listas de filtros usadas nas combinações)"""
+        status, body = self.render(path, args or {})
+        if status != 200:
+            return {}
+        return json.loads(body)
+
+    def lookup(self, path, args):
+        """Corpo pré-calculado para a requisição (None se ausente ou desatualizado)"""
+        key = self.make_key(path, args)
+        if key is None:
+            return None
+        result = self._results.get(key)
+        if result is None:
+            return None
+        if result.dia != datetime.now().strftime('%Y-%m-%d'):
+            return None
+        if result.version != self.data_versions.version():
+            return None
+        self.served += 1
+        return result.body
+
+    def run_cycle(self):
+        """Recalcular todas as combinações (as obsoletas são descartadas ao final)"""
+        version = self.data_versions.version()
+        if version is None:
+            return 0  # Banco indisponível: mantém o que já existe sem servir (versão não confere)
+
+        started = time.monotonic()
+        dia = datetime.now().strftime('%Y-%m-%d')
+        keys = set()
+        for path, args in self.combinations(self):
+            key = self.make_key(path, args)
+            if key is None or key in keys:
+                continue
+            keys.add(key)
+            try:
+                status, body = self.render(path, args)
+            except Exception as e:
+                print(f"Erro ao pré-calcular {path} {args}: {str(e)}")
+                continue
+            if status != 200 or body.lstrip().startswith(ERROR_BODY_PREFIX):
+                continue
+            with self._lock:
+                self._results[key] = PrecomputedResult(body, version, dia)
+
+        with self._lock:
+            for key in [key for key in self._results if key not in keys]:
+                del self._results[key]
+
+        self.cycles += 1
+        self.last_cycle = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        self.last_duration = round(time.monotonic() - started, 2)
+
+        for callback in list(self._cycle_listeners):
+            try:
+                callback(version)
+            except Exception as e:
+                print(f"Erro ao notificar fim do pré-cálculo: {str(e)}")
+        return len(keys)
+
+    def wake(self):
+        """Antecipar o próximo ciclo"""
+        self._wake.set()
+
+    def _on_data_changed(self, tabelas, versoes):
+        # Nova carga do ETL publicada (caches já sincronizados): recalcular já, sem esperar o próximo ciclo
+        self.wake()
+
+    def start(self):
+        """Iniciar thread que recalcula a cada interval segundos e após mudanças nos dados"""
+        if self._thread is not None:
+            return
+
+        def run():
+            while True:
+                try:
+                    self.run_cycle()
+                except Exception as e:
+                    print(f"Erro no pré-cálculo das APIs: {str(e)}")
+                self._wake.wait(self.interval)
+                self._wake.clear()
+
+        self._thread = threading.Thread(target=run, name='precompute-scheduler', daemon=True)
+        self._thread.start()
+
+    def status(self):
+        """Resumo do pré-cálculo para logs/diagnóstico"""
+        with self._lock:
+            resultados = len(self._results)
+        return {
+            'resultados': resultados,
+            'ciclos': self.cycles,
+            'ultimo_ciclo': self.last_cycle,
+            'duracao_ultimo_ciclo': self.last_duration,
+            'servidos': self.served,
+            'ativo': self.running
+        }
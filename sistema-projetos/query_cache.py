@@ -0,0 +1,152 @@
+import re
+import time
+import threading
+from collections import OrderedDict
+import pandas as pd
+
+# Configuração padrão do cache de resultados
+CACHE_DEFAULT_TTL = 300               # Segundos que um resultado permanece válido
+CACHE_MAX_BYTES = 256 * 1024 * 1024   # Orçamento de memória (LRU acima disso)
+CACHE_GETDATE_QUANTUM = 60            # Janela (s) das chaves de consultas com GETDATE()
+
+# Tabelas BI citadas em uma consulta (usadas na invalidação por tabela)
+TABLE_PATTERN = re.compile(r'\bBI_\w+', re.IGNORECASE)
+
+
+class CacheEntry:
+    """Resultado armazenado com expiração, tamanho estimado e tabelas de origem"""
+    def __init__(self, df, expires_at, size, tables):
+        self.df = df
+        self.expires_at = expires_at
+        self.size = size
+        self.tables = tables
+
+
+class QueryCache:
+    """Cache compartilhado de DataFrames por SQL normalizado + parâmetros
+
+    - TTL por consulta (ttl=) com padrão CACHE_DEFAULT_TTL
+    - Limite de memória com descarte LRU
+    - Chaves de consultas com GETDATE() quantizadas em janelas de tempo
+    - Invalidação explícita total ou por tabela
+    """
+    def __init__(self, max_bytes=CACHE_MAX_BYTES, default_ttl=CACHE_DEFAULT_TTL,
+                 getdate_quantum=CACHE_GETDATE_QUANTUM):
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.getdate_quantum = getdate_quantum
+
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def normalize_sql(query):
+        """Remover diferenças de espaçamento/indentação entre consultas iguais"""
+        return re.sub(r'\s+', ' ', query).strip()
+
+    def make_key(self, query, params=None, variant=None):
+        """Chave do cache: SQL normalizado + parâmetros (+ janela de tempo se usar GETDATE())
+
+        variant separa resultados da mesma consulta lidos de formas diferentes
+        (ex.: leitura tipada x pd.read_sql).
+        """
+        sql = self.normalize_sql(query)
+        bucket = None
+        if 'GETDATE()' in sql.upper():
+            bucket = int(time.time() // self.getdate_quantum)
+        return sql, tuple(params or ()), bucket, variant
+
+    @staticmethod
+    def _estimate_size(df):
+        try:
+            return int(df.memory_usage(index=True, deep=True).sum())
+        except Exception:
+            return 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def get(self, key):
+        """Retornar cópia do resultado armazenado (ou None se ausente/expirado)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            df = entry.df
+        # Cópia: as rotas alteram colunas (ex.: formatação de datas) no DataFrame recebido
+        return df.copy()
+
+    def put(self, key, df, ttl=None):
+        """Armazenar resultado, descartando os menos usados se exceder o orçamento"""
+        size = self._estimate_size(df)
+        if size > self.max_bytes:
+            return
+
+        ttl = self.default_ttl if ttl is None else ttl
+        tables = frozenset(name.lower() for name in TABLE_PATTERN.findall(key[0]))
+        entry = CacheEntry(df.copy(), time.monotonic() + ttl, size, tables)
+
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._bytes > self.max_bytes and self._entries:
+                oldest_key = next(iter(self._entries))
+                self._remove(oldest_key)
+                self.evictions += 1
+
+    def read_sql(self, query, conn, params=None, ttl=None, loader=None, variant=None):
+        """pd.read_sql com cache
+
+        loader: função (query, conn, params) -> DataFrame usada no lugar do pd.read_sql.
+        """
+        key = self.make_key(query, params, variant)
+        df = self.get(key)
+        if df is None:
+            if loader is None:
+                df = pd.read_sql(query, conn, params=params)
+            else:
+                df = loader(query, conn, params)
+            self.put(key, df, ttl)
+        return df
+
+    def invalidate(self, table=None):
+        """Invalidar todas as entradas ou apenas as que consultam a tabela informada"""
+        with self._lock:
+            if table is None:
+                removed = len(self._entries)
+                self._entries.clear()
+                self._bytes = 0
+                return removed
+
+            table = table.lower()
+            keys = [key for key, entry in self._entries.items() if table in entry.tables]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def status(self):
+        """Resumo do cache para logs/diagnóstico"""
+        with self._lock:
+            return {
+                'entradas': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,93 @@
+# Compilador de filtros das consultas de relatório
+#
+# Gera predicados sargáveis (a coluna aparece sozinha de um lado da comparação),
+# que permitem index seek no SQL Server:
+#   ISNULL(col, '') = ?       ->  col = ?   (o filtro só é aplicado com valor preenchido)
+#   rótulo de nulo ('Sem Equipe', exibido no lugar de NULL)
+#                             ->  (col = ? OR col IS NULL OR col = '')
+#   período sobreposto (três ramos com OR) -> uma única condição de intervalo
+
+# Rótulos exibidos nas listas de filtros no lugar de valores nulos
+SEM_EQUIPE = 'Sem Equipe'
+SEM_PRODUTO = 'Sem Produto'
+STATUS_INDEFINIDO = 'Indefinido'
+
+def sql_like_pattern(text):
+    """Padrão LIKE '%texto%' tratando curingas digitados pelo usuário como literais"""
+    escaped = text.replace('[', '[[]').replace('%', '[%]').replace('_', '[_]')
+    return f"%{escaped}%"
+
+
+class SqlFilters:
+    """Condições WHERE e parâmetros montados a partir dos filtros da requisição
+
+    Uso:
+        filters = SqlFilters(["EpicInicioPlanejado IS NOT NULL"])
+        filters.equals('EpicEquipe', equipe_filter, null_label='Sem Equipe')
+        filters.overlaps('EpicInicioPlanejado', 'EpicDueDate', data_inicio, data_fim)
+        query = f"SELECT ... FROM tabela WHERE {filters.sql()}"
+        df = cached_read_sql(query, conn, params=filters.params)
+
+    Filtros com valor vazio são ignorados, como nas rotas.
+    """
+    def __init__(self, conditions=None, params=None):
+        self.conditions = list(conditions or [])
+        self.params = list(params or [])
+
+    def add(self, condition, *params):
+        """Condição escrita à mão (já sargável) com seus parâmetros"""
+        self.conditions.append(condition)
+        self.params.extend(params)
+        return self
+
+    def equals(self, column, value, null_label=None):
+        """column = valor; o rótulo de nulo também seleciona as linhas sem valor"""
+        if not value:
+            return self
+        if null_label is not None and value == null_label:
+            return self.add(f"({column} = ? OR {column} IS NULL OR {column} = '')", value)
+        return self.add(f"{column} = ?", value)
+
+    def between(self, column, inicio=None, fim=None):
+        """column dentro do período (limites opcionais, inclusivos)"""
+        if inicio and fim:
+            return self.add(f"{column} BETWEEN ? AND ?", inicio, fim)
+        if inicio:
+            return self.add(f"{column} >= ?", inicio)
+        if fim:
+            return self.add(f"{column} <= ?", fim)
+        return self
+
+    def overlaps(self, start_column, end_column, inicio, fim, nullable=True):
+        """Registros cujo intervalo [início, fim] toca o período
+
+        Equivale a "começa, termina ou atravessa o período". Com nullable=True,
+        registros sem uma das datas entram se a data existente cair no período;
+        use nullable=False quando a consulta já exige as duas datas.
+        """
+        if not (inicio and fim):
+            return self
+        if not nullable:
+            return self.add(f"({start_column} <= ? AND {end_column} >= ?)", fim, inicio)
+        return self.add(
+            f"(({start_column} <= ? AND {end_column} >= ?)"
+            f" OR ({end_column} IS NULL AND {start_column} BETWEEN ? AND ?)"
+            f" OR ({start_column} IS NULL AND {end_column} BETWEEN ? AND ?))",
+            fim, inicio, inicio, fim, inicio, fim
+        )
+
+    def search(self, columns, text):
+        """Busca textual (LIKE '%texto%') em qualquer uma das colunas"""
+        if not text:
+            return self
+        pattern = sql_like_pattern(text)
+        return self.add('(' + ' OR '.join(f"{column} LIKE ?" for column in columns) + ')',
+                        *([pattern] * len(columns)))
+
+    def sql(self):
+        """Condições unidas por AND ('1 = 1' se não houver nenhuma)"""
+        return ' AND '.join(self.conditions) if self.conditions else '1 = 1'
+
+    def and_sql(self):
+        """Condições prefixadas por ' AND ' para anexar a um WHERE existente"""
+        return ''.join(f" AND {condition}" for condition in self.conditions)
@@ -0,0 +1,81 @@
+# Manifestos de esquema das tabelas BI usados na leitura tipada (DatabaseManager.fetch_columns)
+#
+# Tipos suportados:
+#   'datetime' -> datetime64[ns] (NULL vira NaT)
+#   'int32'    -> int32 (Int32 anulável se houver NULL)
+#   'int64'    -> int64 (Int64 anulável se houver NULL)
+#   'float'    -> float64 (NULL vira NaN)
+#   'category' -> categórico com dicionário montado durante a leitura
+#   'object'   -> objetos Python (texto livre)
+# Colunas fora do manifesto têm o tipo inferido da descrição do cursor.
+
+EPICOS_SCHEMA = {
+    'EpicNumber': 'object',
+    'EpicSummary': 'object',
+    'EpicProjectKey': 'category',
+    'EpicAssignee': 'category',
+    'EpicClass': 'category',
+    'EpicEquipe': 'category',
+    'EpicStatus': 'category',
+    'EpicProduto': 'category',
+    'EpicInicioPlanejado': 'datetime',
+    'EpicDueDate': 'datetime',
+    'EpicQtdeUSEstimadas': 'int32',
+    'TasksDataInicial': 'datetime',
+    'TasksDataFim': 'datetime',
+    'TasksPercentualMedia': 'float',
+    'TipoRegistroCalculo': 'category',
+    'IndicadorAndamentoEpico': 'category'
+}
+
+SUBTASKS_SCHEMA = {
+    'TaskNumberId': 'object',
+    'TaskSummary': 'object',
+    'TaskProjectKey': 'category',
+    'TaskAssignee': 'category',
+    'TaskEquipe': 'category',
+    'TaskStatus': 'category',
+    'TaskType': 'category',
+    'TaskSubTipo': 'category',
+    'TaskInicioPlanejado': 'datetime',
+    'TaskFimPlanejado': 'datetime',
+    'TaskInicioRealizado': 'datetime',
+    'TaskFimRealizado': 'datetime',
+    'TaskDuracaoPlanejadoDias': 'int32',
+    'TaskDuracaoRealizadoDias': 'int32',
+    'TaskPercentualConcluido': 'float',
+    'TaskPercentualPlanejado': 'float',
+    'TaskPercentualRealizado': 'float',
+    'TaskTimeSpends': 'float'
+}
+
+MANS_SCHEMA = {
+    'Number': 'object',
+    'Summary': 'object',
+    'Project': 'category',
+    'ProjectKey': 'category',
+    'IssueType': 'category',
+    'Produto': 'category',
+    'ParentEpicNumber': 'category',
+    'Equipe': 'category',
+    'Assignee': 'category',
+    'Status': 'category',
+    'Created': 'datetime',
+    'Updated': 'datetime',
+    'ResolutionDate': 'datetime',
+    'OrigemAbertura': 'category',
+    'ServicePackLiberacao': 'category',
+    'PatchLiberacao': 'category',
+    'QtdeVinculos': 'int32'
+}
+
+TABLE_SCHEMAS = {
+    'BI_Jira_Epico_Datas_Grafico': EPICOS_SCHEMA,
+    'BI_Jira_SubTasks_Datas_Grafico': SUBTASKS_SCHEMA,
+    'BI_Jira_US': MANS_SCHEMA
+}
+
+
+def get_table_schema(table):
+    """Manifesto da tabela (ou dicionário vazio se não houver)"""
+    return TABLE_SCHEMAS.get(table, {})
@@ -0,0 +1,290 @@
+"""
+Testes das funções puras usadas pelas rotas (sem Flask nem SQL Server)
+Execute: python -m pytest -q (na pasta sistema-projetos)
+
+As condições SQL são executadas num SQLite em memória, que ordena NULL como o
+SQL Server (primeiro em ASC, por último em DESC).
+"""
+
+import os
+import sys
+import sqlite3
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from gantt_builder import GANTT_ITEM_COLUMNS, INDICADOR_COLORS, TIPO_REGISTRO_STYLE, build_gantt_items
+from keyset_pagination import decode_page_cursor, encode_page_cursor, keyset_condition, page_cursor_values
+from query_cache import QueryCache
+from sql_filters import SEM_EQUIPE, SqlFilters
+from time_buckets import bucket_labels, bucket_start, fill_buckets
+
+
+# ===============================
+# PAGINAÇÃO POR CHAVE
+# ===============================
+
+KEYSET_ROWS = [
+    # (id, equipe, prioridade) com NULLs e empates nas duas colunas
+    (1, 'B', 2), (2, None, 1), (3, 'A', None), (4, 'B', 2), (5, 'A', 3),
+    (6, None, None), (7, 'B', None), (8, 'A', 3), (9, None, 1), (10, 'C', 0),
+    (11, 'A', None), (12, 'B', 5), (13, None, 5), (14, 'C', 0)
+]
+
+
+@pytest.fixture
+def keyset_db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE registros (id INTEGER, equipe TEXT, prioridade INTEGER)")
+    conn.executemany("INSERT INTO registros VALUES (?, ?, ?)", KEYSET_ROWS)
+    yield conn
+    conn.close()
+
+
+@pytest.mark.parametrize('order_columns', [
+    [('equipe', 'ASC'), ('prioridade', 'ASC'), ('id', 'ASC')],
+    [('equipe', 'ASC'), ('prioridade', 'DESC'), ('id', 'ASC')],
+    [('prioridade', 'DESC'), ('equipe', 'DESC'), ('id', 'DESC')],
+])
+@pytest.mark.parametrize('page_size', [1, 3, 5])
+def test_keyset_pages_match_full_sort(keyset_db, order_columns, page_size):
+    order_sql = ', '.join(f"{col} {direction}" for col, direction in order_columns)
+    expected = [row[0] for row in keyset_db.execute(f"SELECT id FROM registros ORDER BY {order_sql}")]
+
+    paged = []
+    cursor = None
+    while True:
+        sql, params = "SELECT * FROM registros", []
+        last_values = decode_page_cursor(cursor)
+        if last_values is not None:
+            condition, params = keyset_condition(order_columns, last_values)
+            sql += f" WHERE {condition}"
+        df = pd.read_sql(f"{sql} ORDER BY {order_sql} LIMIT {page_size + 1}", keyset_db, params=params)
+
+        paged.extend(df['id'].iloc[:page_size].tolist())
+        if len(df) <= page_size:
+            break
+        cursor = encode_page_cursor(page_cursor_values(df.iloc[page_size - 1], order_columns))
+
+    assert paged == expected
+
+
+def test_keyset_condition_after_null_in_desc_order_is_empty():
+    condition, params = keyset_condition([('prioridade', 'DESC')], [None])
+    assert (condition, params) == ('1 = 0', [])
+
+
+def test_page_cursor_values_are_json_ready():
+    row = pd.Series({'data': pd.Timestamp('2024-03-05 10:20:30.123456'), 'n': np.int64(7), 'x': np.nan})
+    values = page_cursor_values(row, [('data', 'ASC'), ('n', 'ASC'), ('x', 'ASC')])
+    assert values == ['2024-03-05T10:20:30.123', 7, None]
+    assert decode_page_cursor(encode_page_cursor(values)) == values
+
+
+def test_decode_page_cursor_rejects_invalid_input():
+    assert decode_page_cursor('') is None
+    assert decode_page_cursor('não é base64') is None
+    assert decode_page_cursor(encode_page_cursor({'a': 1})) is None
+
+
+# ===============================
+# FILTROS SARGÁVEIS
+# ===============================
+
+@pytest.fixture
+def epicos_db():
+    conn = sqlite3.connect(':memory:')
+    conn.execute("CREATE TABLE epicos (id INTEGER, equipe TEXT, inicio TEXT, fim TEXT)")
+    conn.executemany("INSERT INTO epicos VALUES (?, ?, ?, ?)", [
+        (1, 'Alpha', '2024-01-10', '2024-02-10'),
+        (2, None, '2024-03-01', '2024-03-31'),
+        (3, '', '2023-12-01', '2024-06-30'),
+        (4, 'Beta', '2024-05-01', None),
+        (5, 'Beta', None, '2024-01-20'),
+        (6, 'Alpha', '2023-01-01', '2023-12-31'),
+        (7, SEM_EQUIPE, None, None)
+    ])
+    yield conn
+    conn.close()
+
+
+def selected_ids(conn, filters):
+    sql = f"SELECT id FROM epicos WHERE {filters.sql()} ORDER BY id"
+    return [row[0] for row in conn.execute(sql, filters.params)]
+
+
+def test_equals_null_label_selects_rows_without_value(epicos_db):
+    assert selected_ids(epicos_db, SqlFilters().equals('equipe', SEM_EQUIPE, null_label=SEM_EQUIPE)) == [2, 3, 7]
+    assert selected_ids(epicos_db, SqlFilters().equals('equipe', 'Alpha', null_label=SEM_EQUIPE)) == [1, 6]
+    assert selected_ids(epicos_db, SqlFilters().equals('equipe', '')) == [1, 2, 3, 4, 5, 6, 7]
+
+
+@pytest.mark.parametrize('inicio, fim', [
+    ('2024-01-01', '2024-01-31'),
+    ('2024-02-10', '2024-03-01'),
+    ('2024-04-01', '2024-04-30'),
+    ('2024-05-01', '2024-12-31'),
+    ('2022-01-01', '2022-12-31'),
+])
+def test_overlaps_matches_original_three_branch_predicate(epicos_db, inicio, fim):
+    original = [row[0] for row in epicos_db.execute("""
+        SELECT id FROM epicos WHERE
+            (fim >= ? AND fim <= ?) OR
+            (inicio >= ? AND inicio <= ?) OR
+            (inicio < ? AND fim > ?)
+        ORDER BY id
+    """, [inicio, fim, inicio, fim, inicio, fim])]
+
+    assert selected_ids(epicos_db, SqlFilters().overlaps('inicio', 'fim', inicio, fim)) == original
+
+
+def test_empty_filters_select_everything():
+    filters = SqlFilters().equals('equipe', '').between('inicio').overlaps('inicio', 'fim', '', '')
+    assert filters.sql() == '1 = 1'
+    assert filters.and_sql() == ''
+    assert filters.params == []
+
+
+# ===============================
+# PERÍODOS DAS SÉRIES TEMPORAIS
+# ===============================
+
+def tsql_bucket(data, granularidade):
+    """Mesmo cálculo das expressões de BUCKET_SQL, em Python"""
+    if granularidade == 'dia':
+        return data
+    if granularidade == 'semana':
+        return data - timedelta(days=(data - date(1900, 1, 1)).days % 7)
+    if granularidade == 'mes':
+        return date(data.year, data.month, 1)
+    trimestre = (data.month - 1) // 3 + 1
+    return date(data.year, (trimestre - 1) * 3 + 1, 1)
+
+
+@pytest.mark.parametrize('granularidade', ['dia', 'semana', 'mes', 'trimestre'])
+def test_bucket_start_matches_bucket_sql(granularidade):
+    datas = [date(2023, 12, 25) + timedelta(days=n) for n in range(0, 400, 3)]
+    esperado = [pd.Timestamp(tsql_bucket(data, granularidade)) for data in datas]
+
+    assert list(pd.DatetimeIndex(bucket_start(datas, granularidade))) == esperado
+
+
+def test_weeks_start_on_monday_and_nat_is_kept():
+    inicios = pd.DatetimeIndex(bucket_start([pd.Timestamp('2024-03-03'), pd.Timestamp('2024-03-04'), None, pd.Timestamp('2024-03-10 23:59')], 'semana'))
+    assert inicios[0] == pd.Timestamp('2024-02-26')
+    assert inicios[1] == pd.Timestamp('2024-03-04')
+    assert pd.isna(inicios[2])
+    assert inicios[3] == pd.Timestamp('2024-03-04')
+    assert all(inicio.weekday() == 0 for inicio in inicios.dropna())
+
+
+def test_bucket_labels():
+    inicios = pd.DatetimeIndex(['2024-01-01', '2024-04-01'])
+    assert bucket_labels(inicios, 'mes') == ['2024-01', '2024-04']
+    assert bucket_labels(inicios, 'trimestre') == ['2024-T1', '2024-T2']
+    assert bucket_labels(inicios, 'semana') == ['2024-01-01', '2024-04-01']
+
+
+def test_fill_buckets_adds_empty_periods_with_zero():
+    frame = pd.DataFrame({
+        'Created': pd.to_datetime(['2024-01-15', '2024-01-20', '2024-04-02']),
+        'Total': [1, 2, 5]
+    })
+    result = fill_buckets(frame, 'Created', 'mes', inicio='2023-12-01')
+
+    assert bucket_labels(result.index, 'mes') == ['2023-12', '2024-01', '2024-02', '2024-03', '2024-04']
+    assert result['Total'].tolist() == [0, 3, 0, 0, 5]
+
+
+# ===============================
+# CACHE DE CONSULTAS
+# ===============================
+
+def cache_frame(value):
+    return pd.DataFrame({'valor': np.full(100, value, dtype=np.int64)})
+
+
+def test_query_cache_evicts_least_recently_used_at_byte_budget():
+    size = QueryCache._estimate_size(cache_frame(0))
+    cache = QueryCache(max_bytes=int(size * 2.5))
+    keys = [cache.make_key(f"SELECT {n} FROM BI_Teste") for n in range(4)]
+
+    cache.put(keys[0], cache_frame(0))
+    cache.put(keys[1], cache_frame(1))
+    assert cache.get(keys[0]) is not None  # keys[0] passa a ser o mais recente
+
+    cache.put(keys[2], cache_frame(2))
+    assert cache.get(keys[1]) is None
+    assert cache.get(keys[0]) is not None
+    assert cache.get(keys[2]) is not None
+    assert cache.evictions == 1
+    assert cache.status()['bytes'] <= cache.max_bytes
+
+    cache.put(keys[3], cache_frame(3))
+    assert cache.get(keys[0]) is None  # keys[2] foi lido depois de keys[0]
+    assert cache.evictions == 2
+
+
+def test_query_cache_ttl_and_table_invalidation():
+    cache = QueryCache()
+    expirada = cache.make_key("SELECT * FROM BI_Jira_US")
+    epicos = cache.make_key("SELECT * FROM BI_Jira_Epico_Datas_Grafico")
+    cache.put(expirada, cache_frame(0), ttl=0)
+    cache.put(epicos, cache_frame(1))
+
+    assert cache.get(expirada) is None
+    assert cache.invalidate('bi_jira_us') == 0
+    assert cache.invalidate('BI_Jira_Epico_Datas_Grafico') == 1
+    assert cache.get(epicos) is None
+
+
+def test_query_cache_returns_copies():
+    cache = QueryCache()
+    key = cache.make_key("SELECT  *\n  FROM BI_Teste")
+    cache.put(key, cache_frame(1))
+    df = cache.get(key)
+    df['valor'] = 0
+
+    assert cache.make_key("SELECT * FROM BI_Teste") == key
+    assert cache.get(key)['valor'].tolist() == [1] * 100
+
+
+# ===============================
+# ITENS DO GANTT
+# ===============================
+
+def test_build_gantt_items_filters_and_styles_records():
+    df = pd.DataFrame({
+        'EpicNumber': ['E-1', 'E-1', 'E-2', 'E-3', None],
+        'EpicSummary': ['Primeiro', 'Primeiro', 'Texto "com" aspas\nquebrado', 'Sem datas', 'Sem número'],
+        'EpicEquipe': ['Alpha', 'Alpha', None, 'Beta', 'Beta'],
+        'EpicStatus': ['Done', 'Done', 'In Progress', 'To Do', None],
+        'TasksDataInicial': pd.to_datetime(['2024-01-01', '2024-01-05', '2024-02-01', None, '2024-03-01']),
+        'TasksDataFim': pd.to_datetime(['2024-01-31 00:00', '2024-02-10 18:00', '2024-02-20 00:00', None, '2024-03-15 00:00']),
+        'TasksPercentualMedia': [100, 80.5, None, 0, 10],
+        'TipoRegistroCalculo': ['Planejado P.O.', 'Realizado Time', 'Realizado Time', 'Planejado Time', 'Outro'],
+        'IndicadorAndamentoEpico': ['Verde', 'Vermelho', None, 'Verde', 'Verde']
+    })
+    items = build_gantt_items(df)
+
+    assert list(items.columns) == GANTT_ITEM_COLUMNS
+    assert items['EpicNumber'].tolist() == ['E-1', 'E-1', 'E-2']  # Sem datas e tipo desconhecido ficam de fora
+    assert items['Task'].iloc[0] == '  📋 PO: E-1 - Primeiro'
+    assert items['Task'].iloc[2] == "  ✅ Real: E-2 - Texto 'com' aspas quebrado"
+    assert items['Finish'].tolist() == ['2024-01-31', '2024-02-10', '2024-02-20']
+    assert items['Resource'].tolist() == ['Alpha', 'Alpha', 'Sem Equipe']
+    assert items['Complete'].tolist() == [100.0, 80.5, 0.0]
+    # Realizado usa a cor do indicador; os planejados, a do tipo
+    assert items['Color'].tolist() == [
+        TIPO_REGISTRO_STYLE['Planejado P.O.']['color'], INDICADOR_COLORS['Vermelho'], INDICADOR_COLORS['Verde']
+    ]
+
+
+def test_build_gantt_items_empty_frame():
+    items = build_gantt_items(pd.DataFrame(columns=['TipoRegistroCalculo', 'TasksDataInicial', 'TasksDataFim']))
+    assert items.empty
+    assert list(items.columns) == GANTT_ITEM_COLUMNS
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Granularidades das séries temporais (timeline do dashboard, tendência das MANs)
+GRANULARIDADES = ('dia', 'semana', 'mes', 'trimestre')
+GRANULARIDADE_PADRAO = 'mes'
+
+# Início do período de cada data em T-SQL. Substitui FORMAT(col, 'yyyy-MM'), que
+# converte cada linha em texto: o resultado é uma data, agrupada e comparada como tal.
+# Semanas começam na segunda-feira (1900-01-01 foi uma segunda), independente de SET DATEFIRST.
+BUCKET_SQL = {
+    'dia': "CAST({column} AS DATE)",
+    'semana': "DATEADD(day, -(DATEDIFF(day, CAST('1900-01-01' AS DATE), {column}) % 7), CAST({column} AS DATE))",
+    'mes': "DATEFROMPARTS(YEAR({column}), MONTH({column}), 1)",
+    'trimestre': "DATEFROMPARTS(YEAR({column}), (DATEPART(quarter, {column}) - 1) * 3 + 1, 1)"
+}
+
+
+def parse_granularidade(value):
+    """Granularidade pedida na requisição (inválida ou vazia -> padrão)"""
+    value = (value or '').strip().lower()
+    return value if value in GRANULARIDADES else GRANULARIDADE_PADRAO
+
+
+def bucket_sql(column, granularidade=GRANULARIDADE_PADRAO):
+    """Expressão T-SQL com o início do período de column"""
+    return BUCKET_SQL[granularidade].format(column=column)
+
+
+def bucket_start(values, granularidade=GRANULARIDADE_PADRAO):
+    """Início do período de cada data (mesmo critério de bucket_sql); NaT é preservado"""
+    datas = np.asarray(pd.to_datetime(pd.Series(values), errors='coerce'), dtype='datetime64[ns]')
+    nat = np.isnat(datas)
+
+    if granularidade in ('mes', 'trimestre'):
+        meses = datas.astype('datetime64[M]').astype(np.int64)
+        if granularidade == 'trimestre':
+            meses = meses - meses % 3  # 1970-01 inicia um trimestre
+        inicio = meses.astype('datetime64[M]')
+    else:
+        dias = datas.astype('datetime64[D]').astype(np.int64)
+        if granularidade == 'semana':
+            dias = dias - (dias + 3) % 7  # 1970-01-01 foi uma quinta-feira
+        inicio = dias.astype('datetime64[D]')
+
+    inicio = inicio.astype('datetime64[ns]')
+    inicio[nat] = np.datetime64('NaT')
+    return inicio
+
+
+def bucket_labels(starts, granularidade=GRANULARIDADE_PADRAO):
+    """Rótulos dos períodos para os gráficos ('2024-03', '2024-T1', '2024-03-04')"""
+    index = pd.DatetimeIndex(starts)
+    if granularidade == 'mes':
+        return index.strftime('%Y-%m').tolist()
+    if granularidade == 'trimestre':
+        return [f"{data.year}-T{(data.month - 1) // 3 + 1}" for data in index]
+    return index.strftime('%Y-%m-%d').tolist()
+
+
+def bucket_range(inicio, fim, granularidade=GRANULARIDADE_PADRAO):
+    """Inícios de todos os períodos entre as datas (inclusive)"""
+    primeiro, ultimo = bucket_start([inicio, fim], granularidade)
+    if granularidade in ('mes', 'trimestre'):
+        step = 3 if granularidade == 'trimestre' else 1
+        starts = np.arange(primeiro.astype('datetime64[M]'), ultimo.astype('datetime64[M]') + 1, step)
+    else:
+        step = 7 if granularidade == 'semana' else 1
+        starts = np.arange(primeiro.astype('datetime64[D]'), ultimo.astype('datetime64[D]') + 1, step)
+    return pd.DatetimeIndex(starts.astype('datetime64[ns]'))
+
+
+def fill_buckets(frame, column, granularidade=GRANULARIDADE_PADRAO, inicio=None, fim=None):
+    """Somar as colunas numéricas por período e incluir os períodos vazios com zero
+
+    frame tem em column o início do período de cada linha (ou a própria data).
+    A série cobre do primeiro ao último período com dados, estendida até inicio
+    e fim quando informados; períodos futuros sem dados não são criados.
+    Retorna DataFrame indexado pelo início do período, em ordem cronológica.
+    """
+    frame = frame.copy()
+    frame[column] = bucket_start(frame[column], granularidade)
+    grouped = frame.groupby(column, sort=True).sum(numeric_only=True)
+    if grouped.empty:
+        return grouped
+
+    primeiro, ultimo = grouped.index.min(), grouped.index.max()
+    if inicio:
+        primeiro = min(primeiro, pd.Timestamp(inicio))
+    if fim:
+        ultimo = max(ultimo, min(pd.Timestamp(fim), pd.Timestamp.now()))
+
+    return grouped.reindex(bucket_range(primeiro, ultimo, granularidade), fill_value=0)